@@ -0,0 +1,92 @@
+"""
+Compares the thread-pool and asyncio logo fetch engines against a local stand-in CDN.
+
+Domains are pre-seeded in the domain cache so no web search happens; every
+company is a cache miss in the (empty) backup store, so each one costs one
+CDN request. The stand-in adds a fixed latency per request to mimic the
+network round trip and reports how many TCP connections each engine opened.
+
+Usage:
+    python -m benchmarks.bench_fetch [--companies 500] [--latency 0.05]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from benchmarks.fakes import FakeLogoCDN, unthrottle
+from src import logos
+from src.domain_cache import get_domain_cache
+from src.fetch_async import pull_logos_async
+from src.logos import pull_logos_threaded
+
+
+def run_engine(name, fetch, companies, cdn):
+    """
+    Runs one engine against fresh backup/session folders and prints its timings.
+
+    Args:
+        name (str): Engine label for the report.
+        fetch (callable): Called as `fetch(companies, backup_path, session_path)`.
+        companies (list[str]): Company names to fetch.
+        cdn (FakeLogoCDN): Running stand-in CDN.
+    """
+    with tempfile.TemporaryDirectory() as root:
+        backup = os.path.join(root, "backup")
+        session = os.path.join(root, "session")
+        os.makedirs(backup)
+        os.makedirs(session)
+
+        domain_cache = get_domain_cache(backup)
+        for company in companies:
+            domain_cache.override(company, f"{company}.example")
+
+        connections, requests = cdn.connections, cdn.requests
+        start = time.perf_counter()
+        failed = fetch(companies, backup, session)
+        elapsed = time.perf_counter() - start
+
+        print(
+            f"{name:>8} {elapsed:>9.2f} {len(companies) / elapsed:>9.1f} "
+            f"{cdn.requests - requests:>9} {cdn.connections - connections:>12} {len(failed):>7}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--companies", type=int, default=500)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--concurrency", type=int, default=64)
+    args = parser.parse_args()
+
+    os.environ.setdefault("BRANDFETCH_API_KEY", "benchmark")
+    companies = [f"company{i:05d}" for i in range(args.companies)]
+
+    with FakeLogoCDN(latency=args.latency) as cdn:
+        logos.BRANDFETCH_CDN_URL = cdn.base_url
+        unthrottle()
+
+        print(f"{args.companies} companies, {args.latency * 1000:.0f} ms CDN latency")
+        print(
+            f"{'engine':>8} {'seconds':>9} {'logos/s':>9} {'requests':>9} {'connections':>12} {'failed':>7}"
+        )
+        run_engine(
+            "threads",
+            lambda c, b, s: pull_logos_threaded(c, b, s, max_workers=args.threads),
+            companies,
+            cdn,
+        )
+        run_engine(
+            "async",
+            lambda c, b, s: pull_logos_async(
+                c, b, s, concurrency=args.concurrency, per_host_limit=args.concurrency
+            ),
+            companies,
+            cdn,
+        )
+
+
+if __name__ == "__main__":
+    main()
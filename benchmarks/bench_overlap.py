@@ -0,0 +1,110 @@
+"""
+End-to-end benchmark: two-phase fetch-then-process vs the pipelined flow.
+
+Runs against local stand-ins (see `benchmarks/fakes.py`):
+
+    two-phase  pull_logos_async into the session folder, then process_logo_batch
+    pipelined  fetch_and_process_logos, processing each logo as soon as it lands
+
+Both flows start from an empty backup store and process without the processed
+logo cache, so each run pays for every download and every image.
+
+Usage:
+    python -m benchmarks.bench_overlap [--companies 200] [--search-latency 0.05]
+        [--cdn-latency 0.05] [--workers N] [--runs 3]
+"""
+
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+from benchmarks.bench_pipeline import load_seed_companies, make_batch
+from benchmarks.fakes import FakeLogoCDN, FakeSearch, unthrottle
+
+
+def fresh_folders(root):
+    backup = os.path.join(root, "backup")
+    session = os.path.join(root, "session")
+    os.makedirs(backup)
+    os.makedirs(session)
+    return backup, session
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--companies", type=int, default=200)
+    parser.add_argument("--search-latency", type=float, default=0.05)
+    parser.add_argument("--cdn-latency", type=float, default=0.05)
+    parser.add_argument("--search-concurrency", type=int, default=8)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    companies = make_batch(load_seed_companies(), args.companies, miss_rate=0.0)
+
+    with FakeSearch(latency=args.search_latency) as search, FakeLogoCDN(
+        latency=args.cdn_latency
+    ) as cdn:
+        os.environ["BRANDFETCH_API_KEY"] = "benchmark"
+
+        from src import fetch_async, logos, output, pipeline
+
+        logos.BRANDFETCH_CDN_URL = cdn.base_url
+        unthrottle()
+        logos.search = search.search_function()
+        params = output.configure_ppt_settings((5, 5), (10.0, 7.5))
+        size = (params["logo_height"], params["max_logo_width"])
+
+        def two_phase(backup, session):
+            fetch_async.pull_logos_async(
+                companies,
+                backup,
+                session,
+                search_concurrency=args.search_concurrency,
+            )
+            processed, _ = output.process_logo_batch(
+                session,
+                output.list_logo_files(session),
+                *size,
+                max_workers=args.workers,
+                use_cache=False,
+            )
+            return processed
+
+        def pipelined(backup, session):
+            processed, _, _ = pipeline.fetch_and_process_logos(
+                companies,
+                backup,
+                session,
+                *size,
+                search_concurrency=args.search_concurrency,
+                max_workers=args.workers,
+                use_cache=False,
+            )
+            return processed
+
+        results = {"two-phase": [], "pipelined": []}
+        for _ in range(args.runs):
+            for flow, run in (("two-phase", two_phase), ("pipelined", pipelined)):
+                with tempfile.TemporaryDirectory() as root:
+                    start = time.perf_counter()
+                    processed = run(*fresh_folders(root))
+                    results[flow].append((time.perf_counter() - start, len(processed)))
+
+    print(
+        f"{args.companies} companies, search {args.search_latency * 1000:.0f} ms, "
+        f"CDN {args.cdn_latency * 1000:.0f} ms, {args.workers or os.cpu_count()} workers"
+    )
+    print(f"{'flow':>10} {'seconds':>9} {'logos':>6} {'speedup':>8}")
+    baseline = statistics.median(r[0] for r in results["two-phase"])
+    for flow, runs in results.items():
+        elapsed = statistics.median(r[0] for r in runs)
+        print(
+            f"{flow:>10} {elapsed:>9.2f} {runs[-1][1]:>6} {baseline / elapsed:>7.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
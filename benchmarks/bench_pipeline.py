@@ -0,0 +1,362 @@
+"""
+Offline end-to-end benchmark of the LogoBot pipeline.
+
+Runs every stage against local stand-ins (see `benchmarks/fakes.py`) with
+configurable latency and error rates, using `src/companies.csv` as the seed
+dataset:
+
+    llm      get_company_list_from_prompt against a fake chat completions API
+    fetch    pull_logos_threaded / pull_logos_async into an empty backup store
+      search   each get_company_website call (fake search server)
+      download each logo download (fake Brandfetch CDN)
+    process  load_and_process_logos (clean, crop, resize, encode)
+    deck     create_powerpoint with pagination
+
+For each batch size it reports wall time, throughput, latency percentiles and
+peak memory, and writes everything to a JSON file so runs can be compared
+across commits.
+
+Usage:
+    python -m benchmarks.bench_pipeline [--sizes 10 100 1000 5000] [--engine async]
+        [--search-latency 0.05] [--cdn-latency 0.05] [--llm-latency 0.5]
+        [--error-rate 0.0] [--miss-rate 0.05] [--output pipeline_results.json]
+"""
+
+import argparse
+import csv
+import functools
+import json
+import os
+import platform
+import resource
+import subprocess
+import tempfile
+import threading
+import time
+import tracemalloc
+from collections import defaultdict
+
+from benchmarks.fakes import FakeLogoCDN, FakeOpenAI, FakeSearch, unthrottle
+
+SEED_CSV = os.path.join(os.path.dirname(__file__), "..", "src", "companies.csv")
+
+
+# ---------------------- #
+#      Measurement       #
+# ---------------------- #
+
+
+class LatencyRecorder:
+    """
+    Collects per-call latencies for named stages from wrapped functions.
+    """
+
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self._lock = threading.Lock()
+
+    def _record(self, stage, elapsed):
+        with self._lock:
+            self.latencies[stage].append(elapsed)
+
+    def wrap(self, stage, fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                self._record(stage, time.perf_counter() - start)
+
+        return wrapper
+
+    def wrap_async(self, stage, fn):
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return await fn(*args, **kwargs)
+            finally:
+                self._record(stage, time.perf_counter() - start)
+
+        return wrapper
+
+    def take(self, stage):
+        with self._lock:
+            return self.latencies.pop(stage, [])
+
+
+def percentile(values, pct):
+    """
+    Nearest-rank percentile.
+
+    Args:
+        values (list[float]): Samples.
+        pct (float): Percentile in [0, 100].
+
+    Returns:
+        float or None: The percentile, or None for no samples.
+    """
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered)) - 1))
+    return ordered[rank]
+
+
+def peak_rss_mb():
+    """
+    Returns the process's peak resident set size so far, in MB.
+    """
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    return peak / 1024 if platform.system() != "Darwin" else peak / (1024 * 1024)
+
+
+def stage_report(items, wall, latencies=None, heap_peak=None):
+    """
+    Builds the JSON report for one stage.
+
+    Args:
+        items (int): Number of items the stage handled.
+        wall (float): Stage wall time in seconds.
+        latencies (list[float], optional): Per-call latencies in seconds.
+        heap_peak (int, optional): Peak traced Python heap in bytes.
+
+    Returns:
+        dict: Stage metrics.
+    """
+    report = {
+        "items": items,
+        "wall_s": round(wall, 4),
+        "throughput_per_s": round(items / wall, 2) if wall else None,
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+    }
+    if latencies is not None:
+        report["calls"] = len(latencies)
+        report["latency_ms"] = {
+            name: round(percentile(latencies, pct) * 1000, 2) if latencies else None
+            for name, pct in (("p50", 50), ("p90", 90), ("p99", 99), ("max", 100))
+        }
+    if heap_peak is not None:
+        report["heap_peak_mb"] = round(heap_peak / (1024 * 1024), 1)
+    return report
+
+
+def timed(fn, trace_memory):
+    """
+    Runs `fn()` and returns (result, wall seconds, traced heap peak or None).
+    """
+    if trace_memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        result = fn()
+    finally:
+        wall = time.perf_counter() - start
+        heap_peak = None
+        if trace_memory:
+            heap_peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+    return result, wall, heap_peak
+
+
+# ---------------------- #
+#       Workload         #
+# ---------------------- #
+
+
+def load_seed_companies():
+    with open(SEED_CSV, newline="", encoding="utf-8") as f:
+        return [row["Company"].strip() for row in csv.DictReader(f) if row["Company"]]
+
+
+def make_batch(seed, size, miss_rate):
+    """
+    Expands the seed list into `size` unique company names.
+
+    A `miss_rate` fraction are named "Unknown ..." so the fake search finds nothing.
+
+    Args:
+        seed (list[str]): Seed company names.
+        size (int): Batch size.
+        miss_rate (float): Fraction of companies the search should not resolve.
+
+    Returns:
+        list[str]: Company names.
+    """
+    misses = int(size * miss_rate)
+    batch = []
+    for i in range(size - misses):
+        name = seed[i % len(seed)]
+        batch.append(name if i < len(seed) else f"{name} {i // len(seed)}")
+    batch.extend(f"Unknown Company {i}" for i in range(misses))
+    return batch
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"],
+            text=True,
+            stderr=subprocess.DEVNULL,
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+# ---------------------- #
+#       Benchmark        #
+# ---------------------- #
+
+
+def run_batch(companies, args, recorder, modules):
+    """
+    Runs fetch, process and deck stages for one batch in fresh folders.
+
+    Returns:
+        dict: Stage name -> stage report.
+    """
+    logos, fetch_async, output = modules
+    stages = {}
+
+    with tempfile.TemporaryDirectory() as root:
+        backup = os.path.join(root, "backup")
+        session = os.path.join(root, "session")
+        os.makedirs(backup)
+        os.makedirs(session)
+
+        def fetch():
+            if args.engine == "async":
+                return fetch_async.pull_logos_async(
+                    companies,
+                    backup,
+                    session,
+                    search_concurrency=args.search_concurrency,
+                )
+            return logos.pull_logos_threaded(
+                companies, backup, session, max_workers=args.search_concurrency
+            )
+
+        failed, wall, heap = timed(fetch, args.trace_memory)
+        stages["fetch"] = stage_report(len(companies), wall, heap_peak=heap)
+        stages["fetch"]["failed"] = len(failed)
+        for stage in ("search", "download"):
+            calls = recorder.take(stage)
+            stages[stage] = stage_report(len(calls), wall, calls)
+
+        params = output.configure_ppt_settings((5, 5), (10.0, 7.5))
+        processed, wall, heap = timed(
+            lambda: output.load_and_process_logos(
+                session, max_workers=args.process_workers, use_cache=False, **params
+            ),
+            args.trace_memory,
+        )
+        stages["process"] = stage_report(
+            len(processed), wall, recorder.take("process") or None, heap
+        )
+
+        deck, wall, heap = timed(
+            lambda: output.create_powerpoint(processed, paginate=True, **params),
+            args.trace_memory,
+        )
+        stages["deck"] = stage_report(len(processed), wall, heap_peak=heap)
+        stages["deck"]["bytes"] = len(deck)
+
+    return stages
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000, 5000])
+    parser.add_argument("--engine", choices=["async", "threads"], default="async")
+    parser.add_argument("--search-latency", type=float, default=0.05)
+    parser.add_argument("--cdn-latency", type=float, default=0.05)
+    parser.add_argument("--llm-latency", type=float, default=0.5)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--miss-rate", type=float, default=0.05)
+    parser.add_argument("--search-concurrency", type=int, default=8)
+    parser.add_argument(
+        "--process-workers",
+        type=int,
+        default=1,
+        help="Worker processes for the process stage (per-logo latencies need 1)",
+    )
+    parser.add_argument("--llm-calls", type=int, default=5)
+    parser.add_argument(
+        "--trace-memory",
+        action="store_true",
+        help="Also record per-stage Python heap peaks (slows every stage down)",
+    )
+    parser.add_argument("--output", default="pipeline_results.json")
+    args = parser.parse_args()
+
+    seed = load_seed_companies()
+    recorder = LatencyRecorder()
+
+    with FakeSearch(
+        latency=args.search_latency, error_rate=args.error_rate
+    ) as search, FakeLogoCDN(
+        latency=args.cdn_latency, error_rate=args.error_rate
+    ) as cdn, FakeOpenAI(
+        seed, latency=args.llm_latency, error_rate=args.error_rate
+    ) as llm:
+        # Secrets and endpoints come from the environment, so no Streamlit secrets are needed
+        os.environ["BRANDFETCH_API_KEY"] = "benchmark"
+        os.environ["OPENAI_API_KEY"] = "benchmark"
+        os.environ["OPENAI_BASE_URL"] = f"{llm.base_url}/v1"
+
+        from src import chatbot, fetch_async, logos, output
+
+        logos.BRANDFETCH_CDN_URL = cdn.base_url
+        unthrottle()
+        logos.search = recorder.wrap("search", search.search_function())
+        logos.download_logo = recorder.wrap("download", logos.download_logo)
+        fetch_async.download_logo_async = recorder.wrap_async(
+            "download", fetch_async.download_logo_async
+        )
+        output.process_logo_file = recorder.wrap("process", output.process_logo_file)
+
+        llm_calls = []
+        for _ in range(args.llm_calls):
+            chatbot._response_cache.clear()  # Time the API call, not a cache hit
+            start = time.perf_counter()
+            chatbot.get_company_list_from_prompt("the largest US companies")
+            llm_calls.append(time.perf_counter() - start)
+        results = {
+            "meta": {
+                "commit": git_commit(),
+                "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+                "python": platform.python_version(),
+                "cpus": os.cpu_count(),
+                "config": vars(args),
+            },
+            "llm": stage_report(len(llm_calls), sum(llm_calls), llm_calls),
+            "batches": [],
+        }
+
+        header = f"{'size':>6} {'stage':>9} {'items':>6} {'wall s':>8} {'items/s':>9} {'p50 ms':>8} {'p99 ms':>8} {'rss MB':>7}"
+        print(header)
+        for size in args.sizes:
+            stages = run_batch(
+                make_batch(seed, size, args.miss_rate),
+                args,
+                recorder,
+                (logos, fetch_async, output),
+            )
+            results["batches"].append({"size": size, "stages": stages})
+            for name, report in stages.items():
+                latency = report.get("latency_ms") or {}
+                print(
+                    f"{size:>6} {name:>9} {report['items']:>6} {report['wall_s']:>8.2f} "
+                    f"{report['throughput_per_s'] or 0:>9.1f} {latency.get('p50') or 0:>8.1f} "
+                    f"{latency.get('p99') or 0:>8.1f} {report['peak_rss_mb']:>7.0f}"
+                )
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+Deck build benchmark for paginated `create_powerpoint`.
+
+Builds decks of 100, 1,000 and 5,000 logos on a 5x5 grid and reports build
+time, slide count and file size. Every logo is a distinct image by default, so
+each insert adds a new image part; ``--unique N`` draws logos from a pool of N
+images instead to exercise image de-duplication. ``--naive`` also times
+python-pptx's own `add_picture` for comparison.
+
+Usage:
+    python -m benchmarks.bench_pptx [--sizes 100 1000 5000] [--unique N] [--naive]
+"""
+
+import argparse
+import io
+import time
+
+from pptx import Presentation
+from pptx.util import Inches
+
+from benchmarks.bench_reformat import make_logo
+from src.output import configure_ppt_settings, create_powerpoint
+from src.reformat import clean_and_crop, fit_to_box
+
+
+def make_processed_logos(count, unique, params):
+    """
+    Builds `count` processed logo tuples cycling through `unique` distinct images.
+
+    Args:
+        count (int): Number of logos in the deck.
+        unique (int, optional): Number of distinct images; None makes every
+            logo distinct.
+        params (dict): Settings from `configure_ppt_settings`.
+
+    Returns:
+        list of tuples: (logo name, PNG bytes, width px, height px)
+    """
+    pool = []
+    for i in range(count if unique is None else min(unique, count)):
+        img = fit_to_box(
+            clean_and_crop(make_logo(512, 94, seed=i)),
+            params["logo_height"],
+            params["max_logo_width"],
+        )
+        buffer = io.BytesIO()
+        img.save(buffer, format="PNG")
+        pool.append((buffer.getvalue(), img.width, img.height))
+
+    return [(f"logo_{i:05d}.png", *pool[i % len(pool)]) for i in range(count)]
+
+
+def naive_powerpoint(processed_logos, params):
+    """
+    Paginated deck built with python-pptx's `add_picture` (package-wide SHA-1 scan).
+
+    Args:
+        processed_logos (list): Logo tuples from `make_processed_logos`.
+        params (dict): Settings from `configure_ppt_settings`.
+
+    Returns:
+        bytes: The .pptx file contents.
+    """
+    prs = Presentation()
+    per_slide = params["num_cols"] * params["num_rows"]
+    for idx, (_, data, width_px, height_px) in enumerate(processed_logos):
+        if idx % per_slide == 0:
+            slide = prs.slides.add_slide(prs.slide_layouts[5])
+        cell = idx % per_slide
+        col, row = cell % params["num_cols"], cell // params["num_cols"]
+        width_in, height_in = Inches(width_px / 96), Inches(height_px / 96)
+        x = params["column_centers"][col] - width_in / 2
+        y = (row + 1) * params["row_spacing"] - height_in / 2
+        slide.shapes.add_picture(io.BytesIO(data), x, y, width_in, height_in)
+    output = io.BytesIO()
+    prs.save(output)
+    return output.getvalue()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 5000])
+    parser.add_argument("--unique", type=int, default=None)
+    parser.add_argument("--naive", action="store_true")
+    args = parser.parse_args()
+
+    params = configure_ppt_settings((5, 5), (10.0, 7.5))
+    builders = [
+        ("paginated", lambda logos: create_powerpoint(logos, paginate=True, **params))
+    ]
+    if args.naive:
+        builders.append(("naive", lambda logos: naive_powerpoint(logos, params)))
+
+    print(f"{'builder':>10} {'logos':>6} {'slides':>7} {'seconds':>9} {'size MB':>8}")
+    for size in args.sizes:
+        logos = make_processed_logos(size, args.unique, params)
+        for name, build in builders:
+            start = time.perf_counter()
+            deck = build(logos)
+            elapsed = time.perf_counter() - start
+            slides = len(Presentation(io.BytesIO(deck)).slides)
+            print(
+                f"{name:>10} {size:>6} {slides:>7} {elapsed:>9.2f} {len(deck) / 1e6:>8.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Scaling benchmark for `load_and_process_logos` across worker-process counts.
+
+Writes synthetic logos into a temporary session folder and times the full
+clean/crop/resize/encode pass with 1, 2, 4, ... workers up to the CPU count.
+
+Usage:
+    python -m benchmarks.bench_processing [--logos 200] [--width 512] [--height 94]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from benchmarks.bench_reformat import make_logo
+from src.output import configure_ppt_settings, load_and_process_logos
+
+
+def worker_counts():
+    """
+    Returns the worker counts to benchmark: powers of two up to the CPU count.
+
+    Returns:
+        list[int]: Worker counts, always including 1 and the CPU count.
+    """
+    cpus = os.cpu_count() or 1
+    counts, n = [], 1
+    while n < cpus:
+        counts.append(n)
+        n *= 2
+    counts.append(cpus)
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--logos", type=int, default=200)
+    parser.add_argument("--width", type=int, default=512)
+    parser.add_argument("--height", type=int, default=94)
+    args = parser.parse_args()
+
+    params = configure_ppt_settings((5, 5), (10.0, 7.5))
+
+    with tempfile.TemporaryDirectory() as session:
+        names = [f"company_{i:05d}.png" for i in range(args.logos)]
+        for i, name in enumerate(names):
+            make_logo(args.width, args.height, seed=i).save(os.path.join(session, name))
+
+        print(f"{args.logos} logos at {args.width}x{args.height}")
+        print(f"{'workers':>8} {'seconds':>9} {'logos/s':>9} {'speedup':>8}")
+        baseline = None
+        for workers in worker_counts():
+            start = time.perf_counter()
+            processed = load_and_process_logos(
+                session, max_workers=workers, use_cache=False, **params
+            )
+            elapsed = time.perf_counter() - start
+
+            assert [name for name, _, _, _ in processed] == sorted(names)
+            baseline = baseline or elapsed
+            print(
+                f"{workers:>8} {elapsed:>9.3f} {args.logos / elapsed:>9.1f} {baseline / elapsed:>7.2f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Fairness benchmark for the process-wide upstream rate limiter.
+
+One "bulk" session queues a large batch of requests, then several small
+sessions arrive with a few requests each, all on worker threads sharing one
+limiter. With round-robin queuing the small sessions finish after a few token
+intervals instead of waiting behind the whole bulk batch, while the combined
+rate stays at the configured limit.
+
+Usage:
+    python -m benchmarks.bench_rate_limit [--rate 20] [--burst 5] [--bulk 200]
+        [--small-sessions 4] [--small-requests 5]
+"""
+
+import argparse
+import contextvars
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from src.rate_limit import configure_rate_limiter, rate_session
+
+
+def run_session(limiter, session_id, requests, start, finished):
+    """
+    Makes `requests` limited calls from one session, each on its own thread.
+    """
+    with rate_session(session_id):
+        with ThreadPoolExecutor(max_workers=requests) as executor:
+            for _ in range(requests):
+                executor.submit(contextvars.copy_context().run, limiter.acquire)
+    finished[session_id] = time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--rate", type=float, default=20.0)
+    parser.add_argument("--burst", type=int, default=5)
+    parser.add_argument("--bulk", type=int, default=200)
+    parser.add_argument("--small-sessions", type=int, default=4)
+    parser.add_argument("--small-requests", type=int, default=5)
+    args = parser.parse_args()
+
+    limiter = configure_rate_limiter("search", args.rate, args.burst, 8)
+    finished = {}
+    start = time.perf_counter()
+
+    sessions = [("bulk", args.bulk)] + [
+        (f"small-{i}", args.small_requests) for i in range(args.small_sessions)
+    ]
+    threads = []
+    for session_id, requests in sessions:
+        thread = threading.Thread(
+            target=run_session,
+            args=(limiter, session_id, requests, start, finished),
+        )
+        thread.start()
+        threads.append(thread)
+        time.sleep(0.5 if session_id == "bulk" else 0)  # Bulk batch queues first
+    for thread in threads:
+        thread.join()
+
+    total = sum(requests for _, requests in sessions)
+    elapsed = max(finished.values())
+    print(
+        f"rate {args.rate:.0f}/s, burst {args.burst}; {total} requests in "
+        f"{elapsed:.2f} s ({total / elapsed:.1f}/s)"
+    )
+    print(f"{'session':>10} {'requests':>9} {'done after s':>13}")
+    for session_id, requests in sessions:
+        print(f"{session_id:>10} {requests:>9} {finished[session_id]:>13.2f}")
+
+    metrics = limiter.metrics()
+    print(
+        f"wait p50 {metrics['wait_p50_s']:.2f} s, p95 {metrics['wait_p95_s']:.2f} s, "
+        f"max {metrics['wait_max_s']:.2f} s"
+    )
+
+
+if __name__ == "__main__":
+    main()
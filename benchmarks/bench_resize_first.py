@@ -0,0 +1,88 @@
+"""
+Benchmark for the resize-first decode path in `src/reformat.py`.
+
+Processes synthetic logos of several source sizes, as PNG and JPEG, both at full
+resolution and with `resize_first`, and reports the time of each, whether the
+output sizes match and the mean per-channel difference between the outputs.
+Sources are `make_logo` images as generated, noisy near-white background
+included, so the differences are what real scanned or compressed logos would
+show. The "canvas" source is a small logo on a large white canvas, which
+exercises mapping the crop box back to the decoded image.
+
+Usage:
+    python -m benchmarks.bench_resize_first [--logo-height 48]
+        [--max-logo-width 96] [--repeat 3]
+"""
+
+import argparse
+import io
+import os
+import tempfile
+import time
+
+import numpy as np
+from PIL import Image
+
+from benchmarks.bench_reformat import make_logo
+from src.reformat import process_logo_file
+
+
+def make_sources():
+    canvas = Image.new("RGB", (4000, 4000), "white")
+    canvas.paste(make_logo(800, 200), (1600, 1900))
+    return {
+        "512x94": make_logo(512, 94),
+        "2000x600": make_logo(2000, 600),
+        "4000x1200": make_logo(4000, 1200),
+        "canvas 4000x4000": canvas,
+    }
+
+
+def run(path, repeat, **kwargs):
+    """
+    Returns the best time of `repeat` calls and the decoded output.
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        data, _, _ = process_logo_file(path, **kwargs)
+        best = min(best, time.perf_counter() - start)
+    with Image.open(io.BytesIO(data)) as img:
+        return best, np.asarray(img.convert("RGBA"), dtype=np.int16)
+
+
+def shape(pixels):
+    return f"{pixels.shape[1]}x{pixels.shape[0]}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--logo-height", type=int, default=48)
+    parser.add_argument("--max-logo-width", type=int, default=96)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    size = {"logo_height": args.logo_height, "max_logo_width": args.max_logo_width}
+
+    print(f"Target {args.max_logo_width}x{args.logo_height}")
+    print(
+        f"{'source':>18} {'format':>6} {'full ms':>9} {'reduced ms':>11} "
+        f"{'speedup':>8} {'full size':>10} {'reduced size':>13} {'mean diff':>10}"
+    )
+    with tempfile.TemporaryDirectory() as root:
+        for name, image in make_sources().items():
+            for fmt in ("PNG", "JPEG"):
+                path = os.path.join(root, f"logo.{fmt.lower()}")
+                image.save(path, fmt)
+                full_time, full = run(path, args.repeat, resize_first=False, **size)
+                fast_time, fast = run(path, args.repeat, resize_first=True, **size)
+                same = full.shape == fast.shape
+                diff = f"{np.abs(full - fast).mean():.2f}" if same else "-"
+                print(
+                    f"{name:>18} {fmt:>6} {full_time * 1000:>9.1f} "
+                    f"{fast_time * 1000:>11.1f} {full_time / fast_time:>7.1f}x "
+                    f"{shape(full):>10} {shape(fast):>13} {diff:>10}"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+"""
+Start-up benchmark for the Streamlit app.
+
+Runs `main.py` once in fresh interpreters (Streamlit's bare mode, no server) and
+reports:
+
+    paint    wall time from interpreter start until the first script run has
+             finished, i.e. the work done before the first page can be painted
+    imports  `python -X importtime` cumulative time of Streamlit itself and of
+             the app's own imports (the modules `main.py` pulls in directly)
+    loaded   which heavy optional modules were imported by the first run
+
+Exits with status 1 if the median time to first paint exceeds `--budget-ms`.
+
+Usage:
+    python -m benchmarks.bench_startup [--runs 5] [--budget-ms 800] [--top 12]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+# Modules that should load only when the feature needing them is used
+HEAVY_MODULES = [
+    "pandas",
+    "openai",
+    "pptx",
+    "PIL",
+    "numpy",
+    "googlesearch",
+    "aiohttp",
+]
+
+# Runs the app script once and reports which heavy modules it loaded. Streamlit
+# is imported first so its cost is reported apart from the app's own imports.
+CHILD_SCRIPT = f"""
+import json, sys
+import streamlit
+import main
+print(json.dumps([m for m in {HEAVY_MODULES!r} if m in sys.modules]))
+"""
+
+
+def child_env():
+    env = dict(os.environ)
+    env["PYTHONPATH"] = REPO_ROOT + os.pathsep + env.get("PYTHONPATH", "")
+    # Dummy keys, so a module that reads secrets eagerly fails loudly here
+    env.setdefault("OPENAI_API_KEY", "benchmark")
+    env.setdefault("BRANDFETCH_API_KEY", "benchmark")
+    env["PYTHONDONTWRITEBYTECODE"] = "1"
+    return env
+
+
+def run_app(cwd, importtime=False):
+    """
+    Runs the app's first script run in a fresh interpreter.
+
+    Args:
+        cwd (str): Working directory (the app creates its cache folders there).
+        importtime (bool): Run with `-X importtime`.
+
+    Returns:
+        tuple: (wall seconds, loaded heavy modules, stderr text)
+    """
+    command = [sys.executable]
+    if importtime:
+        command += ["-X", "importtime"]
+    command += ["-c", CHILD_SCRIPT]
+
+    start = time.perf_counter()
+    result = subprocess.run(
+        command, cwd=cwd, env=child_env(), capture_output=True, text=True
+    )
+    wall = time.perf_counter() - start
+    if result.returncode != 0:
+        raise RuntimeError(f"App start-up failed:\n{result.stderr[-2000:]}")
+    loaded = json.loads(result.stdout.strip().splitlines()[-1])
+    return wall, loaded, result.stderr
+
+
+def parse_importtime(importtime_output):
+    """
+    Parses `-X importtime` output into top-level modules and the app's imports.
+
+    Args:
+        importtime_output (str): stderr of a `-X importtime` run.
+
+    Returns:
+        tuple: (top-level modules, modules imported directly by `main`), each a
+        list of (cumulative ms, module name), heaviest first.
+    """
+    top_level, app_imports, pending = [], [], []
+    for line in importtime_output.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line.split("|")
+        if len(parts) != 3 or not parts[1].strip().isdigit():
+            continue  # Header row
+        name = parts[2][1:]
+        depth = (len(name) - len(name.lstrip(" "))) // 2
+        entry = (int(parts[1]) / 1000, name.strip())
+
+        # A module's own imports are printed before it, so collect them until it appears
+        if depth == 1:
+            pending.append(entry)
+        elif depth == 0:
+            top_level.append(entry)
+            if entry[1] == "main":
+                app_imports = pending
+            pending = []
+    return sorted(top_level, reverse=True), sorted(app_imports, reverse=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=800)
+    parser.add_argument("--top", type=int, default=12)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as cwd:
+        run_app(cwd)  # Warm the OS file cache so runs are comparable
+        walls = []
+        for _ in range(args.runs):
+            wall, loaded, _ = run_app(cwd)
+            walls.append(wall)
+        _, _, importtime_output = run_app(cwd, importtime=True)
+
+    top_level, app_imports = parse_importtime(importtime_output)
+    print(f"{'top-level import':<40} {'cumulative ms':>13}")
+    for ms, name in top_level[:3]:
+        print(f"{name:<40} {ms:>13.1f}")
+    print(f"\n{'imported by main.py':<40} {'cumulative ms':>13}")
+    for ms, name in app_imports[: args.top]:
+        print(f"{name:<40} {ms:>13.1f}")
+
+    median_ms = statistics.median(walls) * 1000
+    print(f"\nHeavy modules loaded by the first run: {', '.join(loaded) or 'none'}")
+    print(
+        f"Time to first paint: median {median_ms:.0f} ms, "
+        f"min {min(walls) * 1000:.0f} ms over {args.runs} runs "
+        f"(budget {args.budget_ms:.0f} ms)"
+    )
+    if median_ms > args.budget_ms:
+        print("❌ Over budget")
+        sys.exit(1)
+    print("✅ Within budget")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+Time-to-first-logo benchmark: streamed LLM generation vs generate-then-fetch.
+
+Runs against local stand-ins (see `benchmarks/fakes.py`):
+
+    two-phase  get_company_list_from_prompt, then pull_logos_async over the list
+    streamed   pull_logos_async(stream_company_names(...)), fetching each name as
+               soon as its line of the completion arrives
+    cached     the streamed flow again with an already answered prompt
+
+Reports the median time until the first logo is fetched and until all are done.
+
+Usage:
+    python -m benchmarks.bench_streaming [--companies 30] [--llm-latency 0.5]
+        [--line-interval 0.05] [--search-latency 0.05] [--cdn-latency 0.05] [--runs 3]
+"""
+
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+from benchmarks.bench_pipeline import load_seed_companies
+from benchmarks.fakes import FakeLogoCDN, FakeOpenAI, FakeSearch, unthrottle
+
+
+def timed_fetch(companies, fetch_async):
+    """
+    Fetches logos for `companies` (a list or iterator) into fresh folders.
+
+    Returns:
+        tuple: (seconds to the first completed logo, seconds to completion, failures)
+    """
+    with tempfile.TemporaryDirectory() as root:
+        backup = os.path.join(root, "backup")
+        session = os.path.join(root, "session")
+        os.makedirs(backup)
+        os.makedirs(session)
+
+        start = time.perf_counter()
+        first = []
+
+        def on_progress(done, total, company):
+            if not first:
+                first.append(time.perf_counter() - start)
+
+        failed = fetch_async.pull_logos_async(
+            companies() if callable(companies) else companies,
+            backup,
+            session,
+            on_progress=on_progress,
+        )
+        return first[0] if first else None, time.perf_counter() - start, len(failed)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--companies", type=int, default=30)
+    parser.add_argument("--llm-latency", type=float, default=0.5)
+    parser.add_argument("--line-interval", type=float, default=0.05)
+    parser.add_argument("--search-latency", type=float, default=0.05)
+    parser.add_argument("--cdn-latency", type=float, default=0.05)
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    seed = load_seed_companies()
+    names = [
+        seed[i % len(seed)] + ("" if i < len(seed) else f" {i}")
+        for i in range(args.companies)
+    ]
+
+    with FakeSearch(latency=args.search_latency) as search, FakeLogoCDN(
+        latency=args.cdn_latency
+    ) as cdn, FakeOpenAI(
+        names, latency=args.llm_latency, line_interval=args.line_interval
+    ) as llm:
+        os.environ["BRANDFETCH_API_KEY"] = "benchmark"
+        os.environ["OPENAI_API_KEY"] = "benchmark"
+        os.environ["OPENAI_BASE_URL"] = f"{llm.base_url}/v1"
+
+        from src import chatbot, fetch_async, logos
+
+        logos.BRANDFETCH_CDN_URL = cdn.base_url
+        unthrottle()
+        logos.search = search.search_function()
+
+        results = {"two-phase": [], "streamed": [], "cached": []}
+        for run in range(args.runs):
+            # A fresh prompt per flow and run, so only "cached" hits the response cache
+            prompt = f"the largest US companies (run {run})"
+
+            def two_phase():
+                df = chatbot.get_company_list_from_prompt(prompt + " two-phase")
+                return list(df["Company"])
+
+            results["two-phase"].append(timed_fetch(two_phase, fetch_async))
+            results["streamed"].append(
+                timed_fetch(
+                    lambda: chatbot.stream_company_names(prompt + " streamed"),
+                    fetch_async,
+                )
+            )
+            results["cached"].append(
+                timed_fetch(
+                    lambda: chatbot.stream_company_names(prompt + " streamed"),
+                    fetch_async,
+                )
+            )
+
+    print(
+        f"{args.companies} companies, LLM {args.llm_latency * 1000:.0f} ms to first "
+        f"token + {args.line_interval * 1000:.0f} ms/line, search "
+        f"{args.search_latency * 1000:.0f} ms, CDN {args.cdn_latency * 1000:.0f} ms"
+    )
+    print(f"{'flow':>10} {'first logo s':>13} {'all logos s':>12} {'failed':>7}")
+    for flow, runs in results.items():
+        print(
+            f"{flow:>10} {statistics.median(r[0] for r in runs):>13.2f} "
+            f"{statistics.median(r[1] for r in runs):>12.2f} {runs[-1][2]:>7}"
+        )
+
+
+if __name__ == "__main__":
+    main()
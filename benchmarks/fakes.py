@@ -0,0 +1,299 @@
+"""
+Local stand-ins for upstream services used by the benchmarks.
+
+Each server runs on 127.0.0.1 in a background thread, speaks HTTP/1.1 with
+keep-alive and can inject latency and errors, so pipeline stages can be timed
+without network access or API keys.
+"""
+
+import io
+import json
+import random
+import re
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import requests
+
+from benchmarks.bench_reformat import make_logo
+
+# Logo sizes served by the stand-in CDN: Brandfetch's 512px width at assorted aspect ratios
+LOGO_SIZES = [(512, 94), (512, 128), (512, 200), (400, 94), (256, 94), (512, 512)]
+
+
+class _FakeHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # Keep connections alive between requests
+
+    def setup(self):
+        super().setup()
+        with self.server.stats_lock:
+            self.server.connections += 1
+
+    def log_message(self, format, *args):
+        pass  # Keep benchmark output clean
+
+    def send_body(self, status, content_type, body, headers=None):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_json(self, payload, status=200):
+        self.send_body(status, "application/json", json.dumps(payload).encode("utf-8"))
+
+    def _handle(self, method):
+        server = self.server
+        with server.stats_lock:
+            server.requests += 1
+        if server.latency:
+            time.sleep(server.latency)
+        if server.rng.random() < server.error_rate:
+            self.send_body(503, "text/plain", b"unavailable", {"Retry-After": "0"})
+            return
+        getattr(server, f"handle_{method}")(self)
+
+    def do_GET(self):
+        self._handle("get")
+
+    def do_POST(self):
+        self._handle("post")
+
+
+class FakeServer(ThreadingHTTPServer):
+    """
+    Threaded local HTTP server with configurable latency and error rate.
+
+    Subclasses implement `handle_get(handler)` and/or `handle_post(handler)`.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, latency=0.0, error_rate=0.0, seed=0):
+        """
+        Args:
+            latency (float): Seconds to sleep before answering each request.
+            error_rate (float): Fraction of requests answered with HTTP 503.
+            seed (int): Seed for the error injection.
+        """
+        super().__init__(("127.0.0.1", 0), _FakeHandler)
+        self.latency = latency
+        self.error_rate = error_rate
+        self.rng = random.Random(seed)
+        self.stats_lock = threading.Lock()
+        self.connections = 0
+        self.requests = 0
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def handle_get(self, handler):
+        handler.send_body(405, "text/plain", b"method not allowed")
+
+    def handle_post(self, handler):
+        handler.send_body(405, "text/plain", b"method not allowed")
+
+    def handle_error(self, request, client_address):
+        pass  # Clients closing pooled connections at shutdown is expected
+
+    def __enter__(self):
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
+        self.server_close()
+
+
+class FakeLogoCDN(FakeServer):
+    """
+    Stand-in for cdn.brandfetch.io: `GET /<domain>/...` returns a synthetic PNG logo.
+
+    Each domain maps to one of `LOGO_SIZES` (and a matching pre-rendered image), so
+    a batch sees a realistic mix of logo sizes. Domains starting with "missing"
+    return 404, like logos Brandfetch doesn't have.
+    """
+
+    def __init__(self, sizes=None, **kwargs):
+        """
+        Args:
+            sizes (list, optional): (width, height) pairs to serve. Defaults to LOGO_SIZES.
+            **kwargs: Latency and error settings passed to FakeServer.
+        """
+        super().__init__(**kwargs)
+        self.logos = []
+        for i, (width, height) in enumerate(sizes or LOGO_SIZES):
+            buffer = io.BytesIO()
+            make_logo(width, height, seed=i).save(buffer, format="PNG")
+            self.logos.append(buffer.getvalue())
+        self.logo_bytes = self.logos[0]
+
+    def handle_get(self, handler):
+        domain = handler.path.lstrip("/").split("/", 1)[0]
+        if domain.startswith("missing"):
+            handler.send_body(404, "text/html", b"not found")
+            return
+        logo = self.logos[zlib.crc32(domain.encode("utf-8")) % len(self.logos)]
+        handler.send_body(200, "image/png", logo)
+
+
+def slugify(name):
+    """
+    Turns a company name into the fake domain label the stand-ins agree on.
+
+    Args:
+        name (str): Company name.
+
+    Returns:
+        str: Lower-case alphanumeric label.
+    """
+    return re.sub(r"[^a-z0-9]+", "", name.lower()) or "company"
+
+
+class FakeSearch(FakeServer):
+    """
+    Stand-in for the web search: `GET /search?q=<company> official site` returns
+    `{"results": [...]}` with a Wikipedia link followed by the company's site.
+
+    Queries for companies whose name starts with "Unknown" return no results.
+    """
+
+    def handle_get(self, handler):
+        query = parse_qs(urlparse(handler.path).query).get("q", [""])[0]
+        company = query.replace(" official site", "")
+        if company.startswith("Unknown"):
+            handler.send_json({"results": []})
+            return
+        slug = slugify(company)
+        handler.send_json(
+            {
+                "results": [
+                    f"https://en.wikipedia.org/wiki/{slug}",
+                    f"https://www.{slug}.com/",
+                ]
+            }
+        )
+
+    def search_function(self):
+        """
+        Returns a drop-in replacement for `googlesearch.search` backed by this server.
+
+        Returns:
+            callable: `search(query)` returning a list of result URLs.
+        """
+        session = requests.Session()
+        url = f"{self.base_url}/search"
+
+        def search(query):
+            response = session.get(url, params={"q": query}, timeout=30)
+            response.raise_for_status()
+            return response.json()["results"]
+
+        return search
+
+
+class FakeOpenAI(FakeServer):
+    """
+    Stand-in for the OpenAI chat completions API (`POST /v1/chat/completions`).
+
+    Answers every prompt with the configured company names, one per line.
+    `latency` plays the part of time to first token; with `"stream": true` the
+    names arrive as server-sent events, one line every `line_interval` seconds.
+    Point the client at it with `OPENAI_BASE_URL=<base_url>/v1`.
+    """
+
+    def __init__(self, companies, line_interval=0.0, **kwargs):
+        """
+        Args:
+            companies (list[str]): Company names returned in each completion.
+            line_interval (float): Seconds to generate each line of the answer.
+            **kwargs: Latency and error settings passed to FakeServer.
+        """
+        super().__init__(**kwargs)
+        self.companies = companies
+        self.line_interval = line_interval
+
+    def stream_completion(self, handler, model):
+        handler.send_response(200)
+        handler.send_header("Content-Type", "text/event-stream")
+        handler.send_header("Transfer-Encoding", "chunked")
+        handler.end_headers()
+
+        def send_event(data):
+            body = f"data: {data}\n\n".encode("utf-8")
+            handler.wfile.write(f"{len(body):x}\r\n".encode("ascii") + body + b"\r\n")
+            handler.wfile.flush()
+
+        def chunk(delta, finish_reason=None):
+            return json.dumps(
+                {
+                    "id": "chatcmpl-benchmark",
+                    "object": "chat.completion.chunk",
+                    "created": int(time.time()),
+                    "model": model,
+                    "choices": [
+                        {"index": 0, "delta": delta, "finish_reason": finish_reason}
+                    ],
+                }
+            )
+
+        send_event(chunk({"role": "assistant", "content": ""}))
+        for name in self.companies:
+            time.sleep(self.line_interval)
+            send_event(chunk({"content": f"{name}\n"}))
+        send_event(chunk({}, finish_reason="stop"))
+        send_event("[DONE]")
+        handler.wfile.write(b"0\r\n\r\n")
+
+    def handle_post(self, handler):
+        length = int(handler.headers.get("Content-Length", 0))
+        request = json.loads(handler.rfile.read(length) or b"{}")
+        model = request.get("model", "gpt-3.5-turbo")
+        if request.get("stream"):
+            self.stream_completion(handler, model)
+            return
+
+        time.sleep(self.line_interval * len(self.companies))
+        content = "\n".join(self.companies)
+        handler.send_json(
+            {
+                "id": "chatcmpl-benchmark",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [
+                    {
+                        "index": 0,
+                        "message": {"role": "assistant", "content": content},
+                        "finish_reason": "stop",
+                    }
+                ],
+                "usage": {
+                    "prompt_tokens": 0,
+                    "completion_tokens": 0,
+                    "total_tokens": 0,
+                },
+            }
+        )
+
+
+def unthrottle():
+    """
+    Lifts the process-wide upstream rate limits, which would otherwise pace the
+    benchmarks at the real services' sustainable rates.
+    """
+    from src.rate_limit import DEFAULT_LIMITS, configure_rate_limiter
+
+    for upstream, limits in DEFAULT_LIMITS.items():
+        configure_rate_limiter(
+            upstream, 1e9, 1e9, max_concurrency=limits["max_concurrency"]
+        )
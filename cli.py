@@ -0,0 +1,344 @@
+"""
+Headless LogoBot: turns a CSV of company names into a logo grid PowerPoint.
+
+Runs the same sourcing, processing and deck generation as the Streamlit app
+without importing Streamlit. Progress is streamed to stdout, and companies are
+fetched and processed in fixed-size batches so memory stays flat on large jobs.
+Within a batch, each logo is processed as soon as it is downloaded; `--two-phase`
+fetches everything first instead.
+
+Secrets are read from the environment, then from `--secrets` (by default
+`.streamlit/secrets.toml` if it exists).
+
+Usage:
+    python cli.py src/companies.csv -o logo_array.pptx [--rows 5] [--cols 5]
+        [--width 5.0] [--height 5.0] [--engine async] [--concurrency 64]
+        [--search-concurrency 8] [--workers N] [--batch-size 500] [--two-phase]
+"""
+
+import argparse
+import csv
+import os
+import shutil
+import sys
+import tempfile
+
+from src.fetch_async import (
+    DEFAULT_CONCURRENCY,
+    DEFAULT_PER_HOST_LIMIT,
+    pull_logos_async,
+)
+from src.logos import pull_logos_threaded, report_fetch_summary
+from src.output import (
+    build_presentation,
+    configure_ppt_settings,
+    iter_processed_logos,
+    report_processing_failures,
+)
+from src.pipeline import fetch_and_process_logos
+from src.rate_limit import DEFAULT_LIMITS, configure_rate_limiter
+from src.reporting import ConsoleReporter, set_reporter
+from src.session_gc import get_session_sweeper, report_sweeper_metrics
+from src.settings import environment_secrets, set_secret_sources, toml_secrets
+from src.tracing import Tracer, activate
+
+# Same storage as the app, so both share the backup store and caches
+cache_path = "logo_cache"
+backup_path = "logo_backup"
+DEFAULT_SECRETS_FILE = os.path.join(".streamlit", "secrets.toml")
+
+
+def read_companies(csv_path, column):
+    """
+    Reads company names from one column of a CSV file.
+
+    Args:
+        csv_path (str): Path of the CSV file.
+        column (str): Header of the column holding company names.
+
+    Returns:
+        list[str]: Non-empty, stripped company names in file order.
+    """
+    with open(csv_path, newline="", encoding="utf-8-sig") as f:
+        reader = csv.DictReader(f)
+        if column not in (reader.fieldnames or []):
+            raise SystemExit(f"{csv_path} has no '{column}' column")
+        return [row[column].strip() for row in reader if (row[column] or "").strip()]
+
+
+def fetch_logos(companies, session_path, args, reporter):
+    """
+    Fetches logos batch by batch into the session folder.
+
+    Returns:
+        dict: Company name -> failure cause for logos that could not be fetched.
+    """
+    sweeper = get_session_sweeper(cache_path)
+    bar = reporter.progress(f"Fetching logos for {len(companies)} companies...")
+    failed_logos = {}
+
+    for start in range(0, len(companies), args.batch_size):
+        batch = companies[start : start + args.batch_size]
+        sweeper.touch(session_path)  # Keep the sweeper off this folder mid-run
+
+        def on_progress(done, _, company):
+            bar.update(start + done, len(companies), f"Fetched {company}")
+
+        if args.engine == "async":
+            failed_logos.update(
+                pull_logos_async(
+                    batch,
+                    backup_path,
+                    session_path,
+                    concurrency=args.concurrency,
+                    per_host_limit=args.per_host_limit,
+                    search_concurrency=args.search_concurrency,
+                    on_progress=on_progress,
+                )
+            )
+        else:
+            failed_logos.update(
+                pull_logos_threaded(
+                    batch,
+                    backup_path,
+                    session_path,
+                    max_workers=args.search_concurrency,
+                    on_progress=on_progress,
+                )
+            )
+
+    bar.close()
+    return failed_logos
+
+
+def fetch_and_process(companies, session_path, params, args, reporter):
+    """
+    Fetches logos batch by batch, processing each one as soon as it is downloaded.
+
+    Logos are yielded in name order within each batch.
+
+    Yields:
+        tuple: (logo name, PNG bytes, resized width in px, resized height in px)
+    """
+    sweeper = get_session_sweeper(cache_path)
+    bar = reporter.progress(f"Fetching logos for {len(companies)} companies...")
+    failed_logos = {}
+
+    for start in range(0, len(companies), args.batch_size):
+        batch = companies[start : start + args.batch_size]
+        sweeper.touch(session_path)  # Keep the sweeper off this folder mid-run
+
+        def on_progress(done, _, company):
+            bar.update(start + done, len(companies), f"Fetched {company}")
+
+        processed_logos, failed_fetches, failed_processing = fetch_and_process_logos(
+            batch,
+            backup_path,
+            session_path,
+            params["logo_height"],
+            params["max_logo_width"],
+            engine=args.engine,
+            search_concurrency=args.search_concurrency,
+            concurrency=args.concurrency,
+            per_host_limit=args.per_host_limit,
+            max_workers=args.workers,
+            on_progress=on_progress,
+            resize_first=args.resize_first,
+        )
+        failed_logos.update(failed_fetches)
+        report_processing_failures(failed_processing)
+        yield from processed_logos
+
+    bar.close()
+    report_fetch_summary(failed_logos, backup_path)
+
+
+def build_deck(processed, params, args, reporter):
+    """
+    Lays out processed logos and writes the deck to `args.output`.
+
+    Returns:
+        int: Number of logos placed in the deck.
+    """
+    placed = 0
+
+    def counted(logos):
+        nonlocal placed
+        for logo in logos:
+            placed += 1
+            yield logo
+
+    prs = build_presentation(counted(processed), paginate=not args.one_slide, **params)
+    prs.save(args.output)
+    reporter.success(
+        f"✅ Wrote {placed} logos on {len(prs.slides)} slides to {args.output}"
+    )
+    return placed
+
+
+def processed_after_fetch(session_path, params, args, reporter):
+    """
+    Processes the already fetched logos batch by batch, in name order.
+
+    Yields:
+        tuple: (logo name, PNG bytes, resized width in px, resized height in px)
+    """
+
+    def on_progress(done, total):
+        reporter.write(f"Processed {done}/{total} logos")
+
+    yield from iter_processed_logos(
+        session_path,
+        params["logo_height"],
+        params["max_logo_width"],
+        batch_size=args.batch_size,
+        max_workers=args.workers,
+        on_progress=on_progress,
+        resize_first=args.resize_first,
+    )
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("csv", help="CSV file with a column of company names")
+    parser.add_argument("-o", "--output", default="logo_array.pptx")
+    parser.add_argument("--column", default="Company", help="Company name column")
+    parser.add_argument("--rows", type=int, default=5)
+    parser.add_argument("--cols", type=int, default=5)
+    parser.add_argument("--width", type=float, default=5.0, help="Slide width (in)")
+    parser.add_argument("--height", type=float, default=5.0, help="Slide height (in)")
+    parser.add_argument(
+        "--one-slide",
+        action="store_true",
+        help="Fill a single slide and drop logos beyond the grid",
+    )
+    parser.add_argument("--engine", choices=["async", "threads"], default="async")
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=DEFAULT_CONCURRENCY,
+        help="Companies in flight at once (async engine)",
+    )
+    parser.add_argument(
+        "--per-host-limit",
+        type=int,
+        default=DEFAULT_PER_HOST_LIMIT,
+        help="Concurrent requests per host (async engine)",
+    )
+    parser.add_argument(
+        "--search-concurrency",
+        type=int,
+        default=8,
+        help="Concurrent web searches (threads for the threads engine)",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Image processing processes (default: CPU count)",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=500,
+        help="Companies fetched and logos processed per batch; bounds memory use",
+    )
+    parser.add_argument(
+        "--resize-first",
+        action="store_true",
+        help="Clean and crop logos near their final size: faster on large images, "
+        "but crops of noisy backgrounds can differ from full resolution",
+    )
+    parser.add_argument(
+        "--two-phase",
+        action="store_true",
+        help="Fetch every logo before processing any, in name order across batches",
+    )
+    parser.add_argument(
+        "--search-rate",
+        type=float,
+        default=DEFAULT_LIMITS["search"]["rate"],
+        help="Web searches per second across all workers",
+    )
+    parser.add_argument(
+        "--cdn-rate",
+        type=float,
+        default=DEFAULT_LIMITS["brandfetch"]["rate"],
+        help="Logo CDN requests per second across all workers",
+    )
+    parser.add_argument("--secrets", help="TOML secrets file")
+    parser.add_argument(
+        "--keep-logos",
+        action="store_true",
+        help="Keep the run's logo folder under logo_cache/ instead of deleting it",
+    )
+    parser.add_argument("--trace", help="Write per-stage timings as JSON to this file")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    reporter = ConsoleReporter()
+    set_reporter(reporter)
+
+    sources = [environment_secrets]
+    secrets_file = args.secrets or (
+        DEFAULT_SECRETS_FILE if os.path.exists(DEFAULT_SECRETS_FILE) else None
+    )
+    if secrets_file:
+        sources.append(toml_secrets(secrets_file))
+    set_secret_sources(sources)
+
+    # Scale each upstream's burst with its rate
+    rates = {"search": args.search_rate, "brandfetch": args.cdn_rate}
+    for upstream, rate in rates.items():
+        limits = DEFAULT_LIMITS[upstream]
+        burst = max(1, round(rate * limits["burst"] / limits["rate"]))
+        configure_rate_limiter(upstream, rate, burst, limits["max_concurrency"])
+
+    companies = read_companies(args.csv, args.column)
+    if not companies:
+        reporter.error(f"⚠️ No companies found in {args.csv}")
+        return 1
+
+    os.makedirs(cache_path, exist_ok=True)
+    os.makedirs(backup_path, exist_ok=True)
+    session_path = tempfile.mkdtemp(prefix="cli-", dir=cache_path)
+    tracer = Tracer() if args.trace else None
+    running = True
+    # Long processing phases don't touch the folder; keep it for the whole run
+    get_session_sweeper(cache_path).hold(session_path, lambda: running)
+
+    try:
+        params = configure_ppt_settings(
+            (args.cols, args.rows), (args.width, args.height)
+        )
+        with activate(tracer):
+            if args.two_phase:
+                failed_logos = fetch_logos(companies, session_path, args, reporter)
+                report_fetch_summary(failed_logos, backup_path)
+                processed = processed_after_fetch(session_path, params, args, reporter)
+            else:
+                processed = fetch_and_process(
+                    companies, session_path, params, args, reporter
+                )
+            placed = build_deck(processed, params, args, reporter)
+        report_sweeper_metrics(cache_path)
+    finally:
+        running = False
+        if args.keep_logos:
+            reporter.write(f"Logos kept in {session_path}")
+        else:
+            shutil.rmtree(session_path, ignore_errors=True)
+
+    if tracer is not None:
+        with open(args.trace, "w", encoding="utf-8") as f:
+            f.write(tracer.to_json())
+        reporter.write(f"Stage timings written to {args.trace}")
+
+    return 0 if placed else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
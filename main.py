@@ -1,59 +1,204 @@
 import streamlit as st
-import pandas as pd
 import os
 import uuid
 
-from src.chatbot import get_company_list_from_prompt
-from src.logos import pull_logos_parallel
-from src.output import (
-    load_and_process_logos,
-    create_powerpoint,
-    configure_ppt_settings,
-    clear_folder,
-)
+from src.domain_cache import get_domain_cache
+from src.jobs import RESUMABLE_STATES, get_job_runner
+from src.rate_limit import rate_session
+from src.session_gc import get_session_sweeper, report_sweeper_metrics
+from src.tracing import Tracer, activate
+
+# Heavier modules (pandas, openai, python-pptx, Pillow, the search and fetch
+# clients) are imported inside the handlers that need them. The first paint
+# then only pays for Streamlit itself; Python caches each module after its
+# first import, so later reruns reuse it.
 
 # ---------------- Configuration ----------------
 cache_path = "logo_cache"
 backup_path = "logo_backup"
 
+
+def session_id_from_url():
+    """
+    Returns the session ID kept in the page URL, if it is a valid one.
+
+    A browser refresh starts a new Streamlit session; the ID in the URL lets it
+    pick up the same logo folder and background fetch job.
+    """
+    session_id = st.query_params.get("session", "")
+    try:
+        return str(uuid.UUID(session_id))  # Also keeps it a safe folder name
+    except ValueError:
+        return None
+
+
 # Generate and store a unique session ID for the current user
 if "session_id" not in st.session_state:
-    st.session_state.session_id = str(uuid.uuid4())
+    st.session_state.session_id = session_id_from_url() or str(uuid.uuid4())
+    st.query_params["session"] = st.session_state.session_id
 
-# Create a session-specific logo cache directory
+# Create a session-specific logo cache directory and mark it as recently used,
+# so the background sweeper only evicts folders of sessions that have gone away
 session_cache_path = os.path.join(cache_path, st.session_state.session_id)
-os.makedirs(session_cache_path, exist_ok=True)
+get_session_sweeper(cache_path).touch(session_cache_path)
+
+
+def streamlit_session_open(streamlit_session_id):
+    """
+    Returns a check that stays True while a Streamlit session (browser tab) is open.
+    """
+    from streamlit import runtime
+
+    def is_open():
+        return runtime.exists() and runtime.get_instance().is_active_session(
+            streamlit_session_id
+        )
+
+    return is_open
+
+
+# An open tab may sit idle past the sweeper's live window; hold its folder until
+# the tab goes away, so its next download still has somewhere to land
+if "sweeper_hold" not in st.session_state:
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+    ctx = get_script_run_ctx()
+    if ctx is not None:
+        get_session_sweeper(cache_path).hold(
+            session_cache_path, streamlit_session_open(ctx.session_id)
+        )
+    st.session_state.sweeper_hold = True
+
+# Run fetches in a background job, so reruns and refreshes don't interrupt them.
+# After a refresh the session's latest job is picked up again.
+job_runner = get_job_runner(cache_path, backup_path)
+if "job_id" not in st.session_state:
+    latest_job = job_runner.latest_for_session(st.session_state.session_id)
+    st.session_state.job_id = latest_job["id"] if latest_job else None
+    st.session_state.job_applied = latest_job["id"] if latest_job else None
+    if latest_job and not st.session_state.get("manual_input"):
+        st.session_state.manual_input = "\n".join(latest_job["session_companies"])
+
+
+# ---------------- Cached Results ----------------
+# Clients, the HTTP session and the backup/domain indexes are process-wide
+# singletons in src/ and already survive reruns. ChatGPT answers are cached in
+# `chatbot` and processed logos on disk in `output.processed_cache`, so only
+# finished decks are cached here.
+
+
+def generate_company_list(prompt):
+    """
+    Asks ChatGPT for companies matching a prompt (answers are cached in `chatbot`).
+
+    Args:
+        prompt (str): Description of the companies.
+
+    Returns:
+        pd.DataFrame: Single 'Company' column.
+
+    Raises:
+        LookupError: If no companies were returned.
+    """
+    from src.chatbot import get_company_list_from_prompt
+
+    df = get_company_list_from_prompt(prompt)
+    if df.empty:
+        raise LookupError(prompt)
+    return df
+
+
+# Decks of thousands of logos run to tens of MB each, so keep only a few
+@st.cache_data(max_entries=4, ttl=3600, show_spinner=False)
+def deck_bytes(folder, fingerprint, columns, rows, width, height, paginate):
+    """
+    Builds the PowerPoint for a session's logos and layout settings.
+
+    Depends only on the folder contents (via `fingerprint`, see
+    `session_sync.folder_fingerprint`) and the layout. Logos are cleaned and
+    resized through `output.processed_cache`, which is bounded by bytes on disk,
+    so a new layout with the same logo size reprocesses nothing.
+
+    Returns:
+        tuple: (.pptx bytes, names of logos that could not be processed)
+    """
+    from src.output import (
+        configure_ppt_settings,
+        create_powerpoint,
+        list_logo_files,
+        process_logo_batch,
+    )
+
+    params = configure_ppt_settings((columns, rows), (width, height))
+    processed, failed_logos = process_logo_batch(
+        folder,
+        list_logo_files(folder),
+        params["logo_height"],
+        params["max_logo_width"],
+    )
+    return create_powerpoint(processed, paginate=paginate, **params), failed_logos
 
 
 # ---------------- Utility Functions ----------------
-def preview_images(folder):
+def stop_fetch_job():
+    """
+    Cancels this session's background fetch and waits for it to stop.
+
+    Call before anything that changes the session folder, so the job cannot
+    write logos (or its record of them) into it afterwards.
+    """
+    with st.spinner("Stopping the running fetch..."):
+        job_runner.cancel_session(st.session_state.session_id)
+
+
+def preview_images(folder, cols_per_row=5, rows_per_page=10):
     """
-    Displays a grid preview of all logo images stored in a given folder.
+    Displays one page of small, cached thumbnails of the logos in a folder.
+
+    Only the rows on the selected page are sent to the browser, either as
+    separate thumbnails or composited server-side into one contact sheet.
 
     Args:
         folder (str): Path to the folder containing logo image files.
+        cols_per_row (int): Thumbnails per row.
+        rows_per_page (int): Rows shown per page.
     """
+    from src.preview import caption_for, contact_sheet, get_thumbnail, page_of
+
     logo_files = [
         f
         for f in os.listdir(folder)
         if f.lower().endswith((".png", ".jpg", ".jpeg", ".webp"))
     ]
     logo_files.sort()
-    cols_per_row = 5
-    rows = [
-        logo_files[i : i + cols_per_row]
-        for i in range(0, len(logo_files), cols_per_row)
-    ]
+    if not logo_files:
+        st.info("No saved logos yet.")
+        return
 
-    for row in rows:
+    c1, c2 = st.columns(2)
+    sheet_mode = c1.toggle("🗂️ Contact sheet", value=len(logo_files) > 50)
+    per_page = cols_per_row * rows_per_page
+    _, pages = page_of(logo_files, 1, per_page)
+    page = c2.number_input(
+        f"Page (of {pages})", min_value=1, max_value=pages, value=1, step=1
+    )
+    page_files, _ = page_of(logo_files, page, per_page)
+    st.caption(f"{len(logo_files)} logos")
+
+    if sheet_mode:
+        st.image(contact_sheet(folder, page_files, cols_per_row))
+        return
+
+    for start in range(0, len(page_files), cols_per_row):
         cols = st.columns(cols_per_row)
-        for idx, logo_file in enumerate(row):
+        for idx, logo_file in enumerate(page_files[start : start + cols_per_row]):
             with cols[idx]:
-                st.image(
-                    os.path.join(folder, logo_file),
-                    use_container_width=True,
-                    caption=logo_file.split(".")[0].title(),
-                )
+                try:
+                    thumbnail = get_thumbnail(os.path.join(folder, logo_file))
+                except OSError:
+                    st.caption(f"⚠️ {caption_for(logo_file)}")
+                    continue
+                st.image(thumbnail, caption=caption_for(logo_file))
 
 
 # ---------------- App Header ----------------
@@ -69,6 +214,15 @@ st.markdown(
     "<h3 style='color:#1f77b4;'>🏁 Step 1: Source Logos</h3>", unsafe_allow_html=True
 )
 
+# Timings cover both the streamed generate-and-fetch flow and Run
+trace_enabled = st.checkbox(
+    "⏱️ Record stage timings",
+    help="Time each stage (search, download, processing, slides) per company.",
+)
+if trace_enabled and st.session_state.get("tracer") is None:
+    st.session_state.tracer = Tracer()
+tracer = st.session_state.get("tracer") if trace_enabled else None
+
 # Initialize manual input state if not already done
 if "manual_input" not in st.session_state:
     st.session_state.manual_input = ""
@@ -82,12 +236,49 @@ ai_prompt = st.text_input(
 
 if st.button("🤖 Generate with ChatGPT"):
     if ai_prompt.strip():
-        with st.spinner("Contacting ChatGPT..."):
-            df_generated = get_company_list_from_prompt(ai_prompt.strip())
-        if not df_generated.empty:
+        try:
+            with st.spinner("Contacting ChatGPT..."):
+                df_generated = generate_company_list(ai_prompt.strip())
+        except LookupError:
+            st.error("❌ No companies returned. Try a different prompt.")
+        else:
             generated_text = "\n".join(df_generated["Company"])
             st.session_state.manual_input = generated_text
             st.rerun()
+    else:
+        st.warning("⚠️ Please enter a description.")
+
+if st.button("⚡ Generate and fetch logos"):
+    if ai_prompt.strip():
+        from src.chatbot import stream_company_names
+        from src.logos import pull_logos_parallel
+        from src.output import clear_folder
+
+        # Each name is fetched as soon as its line of the answer arrives
+        streamed = []
+
+        def record(names):
+            for name in names:
+                streamed.append(name)
+                yield name
+
+        stop_fetch_job()
+        clear_folder(session_cache_path)
+        if trace_enabled:
+            tracer = st.session_state.tracer = Tracer()  # Fresh timings per run
+        # Upstream rate limits are shared fairly with other sessions
+        with activate(tracer), rate_session(st.session_state.session_id):
+            pull_logos_parallel(
+                record(stream_company_names(ai_prompt.strip())),
+                backup_path,
+                session_cache_path,
+            )
+        if streamed:
+            from src.session_sync import record_session_companies
+
+            # Lets a later Run fetch only the edits to this list
+            record_session_companies(streamed, backup_path, session_cache_path)
+            st.session_state.manual_input = "\n".join(streamed)
         else:
             st.error("❌ No companies returned. Try a different prompt.")
     else:
@@ -105,33 +296,121 @@ company_input = st.text_area(
 # Keep input synced in session state
 st.session_state.manual_input = company_input
 
+# --- Optional: pin companies to known domains instead of searching ---
+with st.expander("🌐 Domain overrides"):
+    overrides_input = st.text_area(
+        "One `Company, domain` pair per line (leave the domain empty to mark as not found)",
+        key="domain_overrides",
+    )
+    if st.button("💾 Save overrides"):
+        domain_cache = get_domain_cache(backup_path)
+        saved = 0
+        for line in overrides_input.strip().split("\n"):
+            company, _, domain = line.partition(",")
+            if company.strip():
+                domain_cache.override(company.strip(), domain.strip() or None)
+                saved += 1
+        st.success(f"✅ Saved {saved} domain overrides.")
+
 st.divider()
 
 # ---------------- Run and Clear Controls ----------------
+incremental = st.checkbox(
+    "♻️ Only fetch changes",
+    value=True,
+    help="Keep logos of companies already fetched; fetch added ones, drop removed ones.",
+)
+
 c1, c2 = st.columns(2)
 
 with c1:
     if st.button("🚀 Run"):
         if st.session_state.manual_input.strip():
+            from src.output import clear_folder
+            from src.session_sync import plan_session_refresh, record_session_companies
+
             company_list = [
                 name.strip()
                 for name in st.session_state.manual_input.strip().split("\n")
                 if name.strip()
             ]
-            df = pd.DataFrame(company_list, columns=["Company"])
-            clear_folder(session_cache_path)  # Clean folder before pulling
-            pull_logos_parallel(df, backup_path, session_cache_path)
+            stop_fetch_job()  # The new list supersedes it
+            if not incremental:
+                clear_folder(session_cache_path)  # Clean folder before pulling
+            delta = plan_session_refresh(company_list, session_cache_path)
+            st.caption(
+                f"➕ {len(delta['added'])} added, ➖ {len(delta['removed'])} removed, "
+                f"♻️ {len(delta['kept'])} kept"
+            )
+            if delta["fetched"]:
+                if trace_enabled:
+                    tracer = st.session_state.tracer = Tracer()  # Fresh timings per run
+                st.session_state.job_id = job_runner.submit(
+                    st.session_state.session_id,
+                    session_cache_path,
+                    delta["fetched"],
+                    session_companies=delta["companies"],
+                    tracer=tracer,
+                )
+            else:
+                record_session_companies(
+                    delta["companies"], backup_path, session_cache_path
+                )
         else:
             st.warning("⚠️ Please enter at least one company name.")
 
 with c2:
     if st.button("🗑️ Delete all saved logos"):
+        from src.output import clear_folder
+
+        stop_fetch_job()
         clear_folder(session_cache_path)
         st.success("🧹 Logo folder cleared.")
 
+# ---------------- Background Fetch Job ----------------
+@st.fragment(run_every=1.0)
+def job_progress(job_id):
+    """
+    Polls a running fetch job, rerunning the whole page once it has stopped.
+    """
+    job = job_runner.get(job_id)
+    if job is None or job["status"] not in ("pending", "running"):
+        st.rerun()
+    attempted = len(job["done"]) + len(job["failed"])
+    total = len(job["companies"])
+    st.progress(attempted / total, text=f"Fetched {attempted} of {total} logos...")
+    if st.button("⏹️ Cancel"):
+        job_runner.cancel(job_id, wait=False)  # The next poll shows it stopped
+        st.caption("Stopping after the current batch of companies...")
+
+
+job = job_runner.get(st.session_state.job_id) if st.session_state.job_id else None
+if job is not None:
+    if job["status"] in ("pending", "running"):
+        job_progress(job["id"])
+    elif st.session_state.job_applied != job["id"]:
+        from src.logos import report_fetch_summary
+
+        # Reported once; cached logo sets and decks follow the folder contents
+        st.session_state.job_applied = job["id"]
+        if job["status"] == "done":
+            st.success("✅ Logos processed")
+        report_fetch_summary(job["failed"], backup_path)
+
+    if job["status"] in RESUMABLE_STATES and job["pending"]:
+        st.warning(
+            f"⚠️ Fetch {job['status']} with {len(job['pending'])} of "
+            f"{len(job['companies'])} companies left"
+            + (f": {job['error']}" if job["error"] else ".")
+        )
+        if st.button("▶️ Resume"):
+            job_runner.resume(job["id"], tracer=tracer)
+            st.rerun()
+
 # Preview logos
 st.markdown("###### 👁️ Preview saved logos:")
-if st.button("Preview logos"):
+# A toggle rather than a button, so paging through the preview keeps it open
+if st.toggle("Preview logos"):
     preview_images(session_cache_path)
 
 st.divider()
@@ -148,12 +427,35 @@ rows = col1.number_input("🔢 Rows", min_value=1, value=5, step=1)
 columns = col1.number_input("🔢 Columns", min_value=1, value=5, step=1)
 height = col2.number_input("📏 Height (inches)", min_value=0.5, value=5.0)
 width = col2.number_input("📐 Width (inches)", min_value=0.5, value=5.0, step=1.0)
+paginate = st.checkbox(
+    "📑 Add slides as needed (otherwise logos beyond one grid are dropped)", value=True
+)
 
 if st.button("📸 Generate PPT"):
-    params = configure_ppt_settings((columns, rows), (width, height))
-    processed = load_and_process_logos(session_cache_path, **params)
-    create_powerpoint(processed, **params)
+    from src.output import processed_cache, report_processing_failures
+    from src.session_sync import folder_fingerprint
+
+    # Only the work depending on a changed input is redone: the logo set is reused
+    # while the folder contents and the logo size (rows/height, columns/width) are
+    # unchanged; unchanged logos still come from the processed logo cache
+    with activate(tracer):
+        st.session_state.pptx_bytes, failed_logos = deck_bytes(
+            session_cache_path,
+            folder_fingerprint(session_cache_path),
+            columns,
+            rows,
+            width,
+            height,
+            paginate,
+        )
+    report_processing_failures(failed_logos)
     st.success("🎉 PowerPoint created successfully!")
+    cache_stats = processed_cache.stats()
+    st.caption(
+        f"♻️ Processed logo cache: {cache_stats['hits']} hits, "
+        f"{cache_stats['misses']} misses ({cache_stats['hit_rate']:.0%} hit rate)"
+    )
+    report_sweeper_metrics(cache_path)
 
 st.divider()
 
@@ -162,14 +464,34 @@ st.markdown(
     "<h3 style='color:#e67e22;'>📥 Step 3: Download PPT</h3>", unsafe_allow_html=True
 )
 
-file_name = "logos_presentation.pptx"
-if os.path.exists(file_name):
-    with open(file_name, "rb") as f:
-        st.download_button(
-            label="⬇️ Download PowerPoint",
-            data=f,
-            file_name="logo_array.pptx",
-            mime="application/vnd.openxmlformats-officedocument.presentationml.presentation",
-        )
+# The deck lives in this session's state, so concurrent users never share a file
+if st.session_state.get("pptx_bytes"):
+    st.download_button(
+        label="⬇️ Download PowerPoint",
+        data=st.session_state.pptx_bytes,
+        file_name="logo_array.pptx",
+        mime="application/vnd.openxmlformats-officedocument.presentationml.presentation",
+    )
 else:
     st.warning("⚠️ Generate the presentation before downloading.")
+
+# ---------------- Stage Timings ----------------
+if tracer is not None and tracer.records:
+    st.divider()
+    with st.expander("⏱️ Stage timings", expanded=True):
+        import pandas as pd
+
+        st.dataframe(pd.DataFrame(tracer.summary()), hide_index=True)
+        e1, e2 = st.columns(2)
+        e1.download_button(
+            label="⬇️ Export JSON",
+            data=tracer.to_json(),
+            file_name="logobot_trace.json",
+            mime="application/json",
+        )
+        e2.download_button(
+            label="⬇️ Export Prometheus",
+            data=tracer.to_prometheus(),
+            file_name="logobot_trace.prom",
+            mime="text/plain",
+        )
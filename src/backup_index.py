@@ -0,0 +1,231 @@
+import hashlib
+import mimetypes
+import os
+import threading
+import time
+
+from src.canonical import canonical_company_name
+from src.journal import JsonJournal
+
+# Manifest file persisted alongside the logos in the backup folder
+MANIFEST_NAME = "manifest.json"
+
+# Metadata and temporary files kept in the backup folder that are never logos
+NON_LOGO_EXTENSIONS = (".json", ".journal", ".tmp")
+
+
+def normalize_company_name(name):
+    """
+    Normalizes a company name for index lookups.
+
+    Variants of one company ("Apple Inc.", "apple", aliases such as "Google" for
+    "Alphabet") share a key, so each entity is fetched and stored once.
+
+    Args:
+        name (str): Company name as entered by the user.
+
+    Returns:
+        str: Normalized lookup key.
+    """
+    return canonical_company_name(name)
+
+
+def session_file_name(company, entry):
+    """
+    Names a backed-up logo in a session folder after the company as entered.
+
+    The backup file is named after whichever variant was fetched first; the
+    session copy keeps the user's own spelling for previews and ordering.
+
+    Args:
+        company (str): Company name as entered by the user.
+        entry (dict): Backup index entry for the company.
+
+    Returns:
+        str: File name within the session folder.
+    """
+    return company + os.path.splitext(entry["file"])[1]
+
+
+class BackupIndex:
+    """
+    In-memory index of the persistent logo backup folder.
+
+    Maps normalized company names to the stored logo file and its metadata
+    (domain, content type, fetch time, SHA-256). The index is loaded once,
+    updated whenever a logo is written and persisted as a JSON manifest in the
+    backup folder, with each update appended to a journal next to it (see
+    `journal.JsonJournal`) rather than rewriting the manifest. Folders created
+    before the manifest existed are indexed from their file names on first load.
+    """
+
+    def __init__(self, backup_path):
+        """
+        Args:
+            backup_path (str): Folder holding the backed-up logo files.
+        """
+        self.backup_path = backup_path
+        self.manifest_path = os.path.join(backup_path, MANIFEST_NAME)
+        self._lock = threading.Lock()
+        self._journal = JsonJournal(self.manifest_path)
+        self._entries = {}
+        self._load()
+
+    # ---------------------- #
+    #     Persistence        #
+    # ---------------------- #
+
+    def _load(self):
+        """
+        Loads the manifest and its journal, or builds the index from the folder
+        contents if the manifest is missing, and compacts the journal.
+        """
+        # Re-keyed on load so changes to the normalization rules apply to old manifests
+        entries, records = self._journal.load(normalize_company_name)
+        scanned = entries is None
+        if scanned:
+            entries = self._scan_folder()
+        self._journal.replay(entries, records, normalize_company_name)
+        self._entries = entries
+        if records or (scanned and entries):
+            self._journal.compact(self._entries.values())
+
+    def _scan_folder(self):
+        """
+        Indexes existing logo files named `<company>.<extension>`.
+
+        Returns:
+            dict: Normalized company name -> entry metadata.
+        """
+        entries = {}
+        if not os.path.isdir(self.backup_path):
+            return entries
+
+        for file_name in sorted(os.listdir(self.backup_path)):
+            file_path = os.path.join(self.backup_path, file_name)
+            company, ext = os.path.splitext(file_name)
+            if file_name.startswith(".") or not ext or not os.path.isfile(file_path):
+                continue
+            if ext.lower() in NON_LOGO_EXTENSIONS:
+                continue
+
+            with open(file_path, "rb") as f:
+                sha256 = hashlib.sha256(f.read()).hexdigest()
+            entries.setdefault(
+                normalize_company_name(company),
+                {
+                    "company": company,
+                    "file": file_name,
+                    "domain": None,
+                    "content_type": mimetypes.guess_type(file_name)[0],
+                    "fetched_at": os.path.getmtime(file_path),
+                    "sha256": sha256,
+                },
+            )
+        return entries
+
+    def _compact_if_due(self):
+        """
+        Folds the journal into the manifest once it has outgrown the index.
+        Must be called with the lock held.
+        """
+        if self._journal.compaction_due(len(self._entries)):
+            self._journal.compact(self._entries.values())
+
+    # ---------------------- #
+    #    Lookup / Update     #
+    # ---------------------- #
+
+    def lookup(self, company):
+        """
+        Finds the backed-up logo for a company by exact normalized name.
+
+        Entries whose file has been removed from disk are dropped.
+
+        Args:
+            company (str): Company name.
+
+        Returns:
+            dict or None: Entry metadata (company, file, domain, content_type,
+            fetched_at, sha256), or None if the company has no stored logo.
+        """
+        key = normalize_company_name(company)
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        if not os.path.exists(os.path.join(self.backup_path, entry["file"])):
+            with self._lock:
+                if self._entries.pop(key, None) is not None:
+                    self._journal.drop(entry["company"])
+                    self._compact_if_due()
+            return None
+        return entry
+
+    def path_for(self, entry):
+        """
+        Returns the absolute path of an entry's logo file.
+
+        Args:
+            entry (dict): Entry returned by `lookup()`.
+
+        Returns:
+            str: Path of the logo inside the backup folder.
+        """
+        return os.path.join(self.backup_path, entry["file"])
+
+    def record(self, company, file_name, content, domain=None, content_type=None):
+        """
+        Adds or replaces the entry for a company after its logo has been written.
+
+        Args:
+            company (str): Company name the logo was fetched for.
+            file_name (str): Name of the logo file inside the backup folder.
+            content (bytes): Logo bytes, used for the content hash.
+            domain (str, optional): Domain the logo was fetched from.
+            content_type (str, optional): Response content type.
+
+        Returns:
+            dict: The stored entry.
+        """
+        entry = {
+            "company": company,
+            "file": file_name,
+            "domain": domain,
+            "content_type": content_type,
+            "fetched_at": time.time(),
+            "sha256": hashlib.sha256(content).hexdigest(),
+        }
+        with self._lock:
+            self._entries[normalize_company_name(company)] = entry
+            self._journal.put(entry)
+            self._compact_if_due()
+        return entry
+
+    def __len__(self):
+        return len(self._entries)
+
+
+# ---------------------- #
+#   Shared Instances     #
+# ---------------------- #
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def get_backup_index(backup_path):
+    """
+    Returns the process-wide index for a backup folder, loading it on first use.
+
+    Args:
+        backup_path (str): Folder holding the backed-up logo files.
+
+    Returns:
+        BackupIndex: Shared index instance.
+    """
+    key = os.path.abspath(backup_path)
+    with _indexes_lock:
+        if key not in _indexes:
+            _indexes[key] = BackupIndex(backup_path)
+        return _indexes[key]
@@ -0,0 +1,104 @@
+import csv
+import os
+import re
+import threading
+
+# Alias table shipped with the app: one `Alias,Company` pair per row
+ALIASES_CSV = os.path.join(os.path.dirname(__file__), "company_aliases.csv")
+
+# Legal-form suffixes dropped from the end of a name (compared after punctuation
+# is removed, so "Inc." and "inc" both match)
+LEGAL_SUFFIXES = frozenset(
+    {
+        "ag", "bv", "co", "com", "company", "corp", "corporation", "gmbh",
+        "inc", "incorporated", "limited", "llc", "llp", "lp", "ltd", "nv",
+        "plc", "sa", "sas", "se", "spa",
+    }
+)  # fmt: skip
+
+# Words left dangling once a suffix is gone (e.g. "Eli Lilly and Co.")
+_TRAILING = LEGAL_SUFFIXES | {"and", "the"}
+
+_PUNCTUATION = re.compile(r"[^\w\s]")
+
+_aliases = None
+_aliases_lock = threading.Lock()
+
+
+def _strip_name(name):
+    """
+    Case-folds a name, drops punctuation and trailing legal suffixes.
+
+    Args:
+        name (str): Company name as entered by the user.
+
+    Returns:
+        str: Space-separated tokens, e.g. "Amazon.com Inc." -> "amazon".
+    """
+    tokens = _PUNCTUATION.sub(" ", name.casefold().replace("&", " and ")).split()
+    # Always keep the first token, so a name made only of suffix words survives
+    while len(tokens) > 1 and tokens[-1] in _TRAILING:
+        tokens.pop()
+    return " ".join(tokens)
+
+
+def load_aliases(path=ALIASES_CSV):
+    """
+    Reads an alias table mapping alternative names to one canonical company.
+
+    Args:
+        path (str): CSV file with `Alias` and `Company` columns.
+
+    Returns:
+        dict: Stripped alias -> stripped company name.
+    """
+    try:
+        with open(path, newline="", encoding="utf-8") as f:
+            return {
+                _strip_name(row["Alias"]): _strip_name(row["Company"])
+                for row in csv.DictReader(f)
+                if row.get("Alias") and row.get("Company")
+            }
+    except FileNotFoundError:
+        return {}
+
+
+def set_aliases(aliases):
+    """
+    Replaces the alias table, e.g. with one loaded from another file.
+
+    Args:
+        aliases (dict): Alias -> company name; both are canonicalized here.
+    """
+    global _aliases
+    with _aliases_lock:
+        _aliases = {_strip_name(k): _strip_name(v) for k, v in aliases.items()}
+
+
+def _get_aliases():
+    global _aliases
+    if _aliases is None:
+        with _aliases_lock:
+            if _aliases is None:
+                _aliases = load_aliases()
+    return _aliases
+
+
+def canonical_company_name(name):
+    """
+    Maps a company name to a key shared by all its variants.
+
+    Case, punctuation and legal suffixes are ignored ("Apple Inc." and "apple"
+    match), then the alias table maps other names of the same entity onto one
+    ("Google" -> "alphabet").
+
+    Args:
+        name (str): Company name as entered by the user.
+
+    Returns:
+        str: Canonical key.
+    """
+    stripped = _strip_name(name)
+    if not stripped:
+        return " ".join(name.split()).casefold()  # Punctuation-only names
+    return _get_aliases().get(stripped, stripped)
@@ -1,10 +1,40 @@
-import pandas as pd
-from openai import OpenAI
 import re
-import streamlit as st
+import threading
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Iterator
+from src.settings import get_secret
 
-# Initialize the OpenAI client using the API key stored securely in Streamlit secrets
-client = OpenAI(api_key=st.secrets["OPENAI_API_KEY"])
+if TYPE_CHECKING:
+    import pandas as pd
+
+# The OpenAI client (and the openai/pandas packages) load on first use, so app
+# start-up does not pay for them until the AI option is actually used
+_client = None
+_client_lock = threading.Lock()
+
+# Completed answers keyed on (normalized prompt, model, max_tokens), oldest first
+RESPONSE_CACHE_SIZE = 128
+_response_cache = OrderedDict()
+_response_cache_lock = threading.Lock()
+
+
+def get_client():
+    """
+    Returns the shared OpenAI client, building it on first use.
+
+    The client is kept for the life of the process, so Streamlit reruns and
+    sessions reuse its connection pool.
+
+    Returns:
+        openai.OpenAI: Client authenticated from the environment or Streamlit secrets.
+    """
+    global _client
+    with _client_lock:
+        if _client is None:
+            from openai import OpenAI
+
+            _client = OpenAI(api_key=get_secret("OPENAI_API_KEY"))
+        return _client
 
 
 def clean_lines(text: str) -> list[str]:
@@ -28,12 +58,61 @@ def clean_lines(text: str) -> list[str]:
     return cleaned
 
 
+def normalize_prompt(prompt: str) -> str:
+    """
+    Normalizes a prompt for cache lookups: case-folded, whitespace collapsed.
+
+    Args:
+        prompt (str): User-defined request.
+
+    Returns:
+        str: Normalized prompt.
+    """
+    return " ".join(prompt.casefold().split())
+
+
+def _cached_response(key):
+    with _response_cache_lock:
+        names = _response_cache.get(key)
+        if names is not None:
+            _response_cache.move_to_end(key)
+        return names
+
+
+def _store_response(key, names):
+    if not names:
+        return  # Never cache failures or empty answers
+    with _response_cache_lock:
+        _response_cache[key] = list(names)
+        _response_cache.move_to_end(key)
+        while len(_response_cache) > RESPONSE_CACHE_SIZE:
+            _response_cache.popitem(last=False)
+
+
+def _build_messages(prompt: str) -> list[dict]:
+    full_prompt = (
+        f"Please list the names of {prompt}. "
+        "Only provide company names, each on a new line. Do not include numbers, bullet points, or explanations."
+    )
+    return [
+        {
+            "role": "system",
+            "content": "You are a helpful assistant that returns clean lists of companies.",
+        },
+        {"role": "user", "content": full_prompt},
+    ]
+
+
 def get_company_list_from_prompt(
     prompt: str, model: str = "gpt-3.5-turbo", max_tokens: int = 1000
-) -> pd.DataFrame:
+) -> "pd.DataFrame":
     """
     Queries the OpenAI API to generate a list of company names from a natural language prompt.
 
+    Repeated names are dropped, as in `stream_company_names`, and answers are
+    cached per normalized prompt and model (shared with it, so either returns the
+    same names), so repeated prompts return instantly.
+
     Args:
         prompt (str): User-defined request, e.g., "the top 50 tech startups in Europe".
         model (str): OpenAI language model to use (default is "gpt-3.5-turbo").
@@ -42,29 +121,26 @@ def get_company_list_from_prompt(
     Returns:
         pd.DataFrame: DataFrame with a single 'Company' column listing extracted company names.
     """
-    full_prompt = (
-        f"Please list the names of {prompt}. "
-        "Only provide company names, each on a new line. Do not include numbers, bullet points, or explanations."
-    )
+    import pandas as pd
+
+    key = (normalize_prompt(prompt), model, max_tokens)
+    cached = _cached_response(key)
+    if cached is not None:
+        return pd.DataFrame(cached, columns=["Company"])
 
     try:
         # Send request to OpenAI chat API
-        response = client.chat.completions.create(
+        response = get_client().chat.completions.create(
             model=model,
-            messages=[
-                {
-                    "role": "system",
-                    "content": "You are a helpful assistant that returns clean lists of companies.",
-                },
-                {"role": "user", "content": full_prompt},
-            ],
+            messages=_build_messages(prompt),
             max_tokens=max_tokens,
             temperature=0.3,
         )
 
         # Extract and clean the response text
         raw_text = response.choices[0].message.content.strip()
-        cleaned_companies = clean_lines(raw_text)
+        cleaned_companies = list(dict.fromkeys(clean_lines(raw_text)))
+        _store_response(key, cleaned_companies)
 
         return pd.DataFrame(cleaned_companies, columns=["Company"])
 
@@ -72,3 +148,64 @@ def get_company_list_from_prompt(
         # Log the error and return an empty DataFrame
         print(f"OpenAI API error: {e}")
         return pd.DataFrame(columns=["Company"])
+
+
+def stream_company_names(
+    prompt: str, model: str = "gpt-3.5-turbo", max_tokens: int = 1000
+) -> Iterator[str]:
+    """
+    Streams company names from the OpenAI API as soon as each line is complete.
+
+    Lines are cleaned with the same rules as `clean_lines`, and repeated names are
+    skipped, so each name can go straight into the logo fetch queue. A fully
+    received answer is cached like `get_company_list_from_prompt`'s; cached answers
+    are yielded immediately.
+
+    Args:
+        prompt (str): User-defined request, e.g., "the top 50 tech startups in Europe".
+        model (str): OpenAI language model to use (default is "gpt-3.5-turbo").
+        max_tokens (int): Maximum token length for the API response.
+
+    Yields:
+        str: Cleaned company names in the order the model produces them.
+    """
+    key = (normalize_prompt(prompt), model, max_tokens)
+    cached = _cached_response(key)
+    if cached is not None:
+        yield from cached
+        return
+
+    names = []
+
+    def new_names(text):
+        for name in clean_lines(text):
+            if name not in names:
+                names.append(name)
+                yield name
+
+    try:
+        stream = get_client().chat.completions.create(
+            model=model,
+            messages=_build_messages(prompt),
+            max_tokens=max_tokens,
+            temperature=0.3,
+            stream=True,
+        )
+
+        # Emit each line as soon as its newline arrives; keep the partial tail
+        buffer = ""
+        for chunk in stream:
+            if not chunk.choices:
+                continue
+            buffer += chunk.choices[0].delta.content or ""
+            if "\n" in buffer:
+                complete, buffer = buffer.rsplit("\n", 1)
+                yield from new_names(complete)
+        yield from new_names(buffer)
+
+    except Exception as e:
+        # Log the error and stop; names already yielded stand
+        print(f"OpenAI API error: {e}")
+        return
+
+    _store_response(key, names)
@@ -0,0 +1,191 @@
+import csv
+import os
+import threading
+import time
+
+from src.backup_index import normalize_company_name
+from src.journal import JsonJournal
+
+# Cache file persisted alongside the logos in the backup folder
+DOMAIN_CACHE_NAME = "domains.json"
+
+# How long resolved and "not found" results stay valid (seconds)
+DEFAULT_TTL = 30 * 24 * 3600
+DEFAULT_NEGATIVE_TTL = 24 * 3600
+
+# Returned by `get()` when the company has no valid cached result
+MISS = object()
+
+
+class DomainCache:
+    """
+    Durable company name -> domain cache in front of the web search.
+
+    Successful resolutions expire after `ttl` seconds and "not found" results
+    after `negative_ttl`, so a company the search could not resolve is not
+    searched again on every run. Manual overrides never expire and always win
+    over search results. The cache is shared by every session in the process
+    and persisted as JSON in the backup folder, each update appended to a
+    journal (see `journal.JsonJournal`) rather than rewriting the file.
+    """
+
+    def __init__(self, path, ttl=DEFAULT_TTL, negative_ttl=DEFAULT_NEGATIVE_TTL):
+        """
+        Args:
+            path (str): JSON file the cache is persisted to.
+            ttl (float): Lifetime of resolved domains in seconds.
+            negative_ttl (float): Lifetime of "not found" results in seconds.
+        """
+        self.path = path
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._journal = JsonJournal(path)
+        self._entries = self._load()
+
+    # ---------------------- #
+    #     Persistence        #
+    # ---------------------- #
+
+    def _load(self):
+        """
+        Loads the cache file, replays its journal and compacts the journal.
+        """
+        entries, records = self._journal.load(normalize_company_name)
+        entries = entries or {}
+        self._journal.replay(entries, records, normalize_company_name)
+        if records:
+            self._journal.compact(entries.values())
+        return entries
+
+    # ---------------------- #
+    #    Lookup / Update     #
+    # ---------------------- #
+
+    def _is_fresh(self, entry, now):
+        if entry["source"] == "manual":
+            return True
+        ttl = self.ttl if entry["domain"] else self.negative_ttl
+        return now - entry["resolved_at"] < ttl
+
+    def get(self, company):
+        """
+        Looks up the cached domain for a company.
+
+        Args:
+            company (str): Company name.
+
+        Returns:
+            str, None or MISS: The cached domain, None for a cached "not found"
+            result, or `MISS` if there is no fresh entry.
+        """
+        entry = self._entries.get(normalize_company_name(company))
+        with self._lock:
+            if entry is None or not self._is_fresh(entry, time.time()):
+                self.misses += 1
+                return MISS
+            if entry["domain"]:
+                self.hits += 1
+            else:
+                self.negative_hits += 1
+            return entry["domain"]
+
+    def set(self, company, domain, source="search"):
+        """
+        Stores a resolution result.
+
+        Args:
+            company (str): Company name.
+            domain (str or None): Resolved domain, or None if none was found.
+            source (str): "search" for search results, "manual" for overrides.
+        """
+        entry = {
+            "company": company,
+            "domain": domain,
+            "resolved_at": time.time(),
+            "source": source,
+        }
+        with self._lock:
+            current = self._entries.get(normalize_company_name(company))
+            if source != "manual" and current and current["source"] == "manual":
+                return  # Never let a search result replace a manual override
+            self._entries[normalize_company_name(company)] = entry
+            self._journal.put(entry)
+            if self._journal.compaction_due(len(self._entries)):
+                self._journal.compact(self._entries.values())
+
+    def override(self, company, domain):
+        """
+        Pins a company to a domain (or to "not found" with None). Overrides never expire.
+
+        Args:
+            company (str): Company name.
+            domain (str or None): Domain to use for the company.
+        """
+        self.set(company, domain, source="manual")
+
+    def import_csv(self, csv_path):
+        """
+        Imports manual overrides from a CSV file with `Company` and `Domain` columns.
+
+        Args:
+            csv_path (str): Path to the CSV file.
+
+        Returns:
+            int: Number of overrides imported.
+        """
+        count = 0
+        with open(csv_path, newline="", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                company = (row.get("Company") or "").strip()
+                if company:
+                    self.override(company, (row.get("Domain") or "").strip() or None)
+                    count += 1
+        return count
+
+    def stats(self):
+        """
+        Returns hit-rate counters for sizing the cache.
+
+        Returns:
+            dict: hits, negative_hits, misses, hit_rate and entry count.
+        """
+        with self._lock:
+            lookups = self.hits + self.negative_hits + self.misses
+            return {
+                "hits": self.hits,
+                "negative_hits": self.negative_hits,
+                "misses": self.misses,
+                "hit_rate": (
+                    (self.hits + self.negative_hits) / lookups if lookups else 0.0
+                ),
+                "entries": len(self._entries),
+            }
+
+
+# ---------------------- #
+#   Shared Instances     #
+# ---------------------- #
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def get_domain_cache(backup_path):
+    """
+    Returns the process-wide domain cache stored in a backup folder.
+
+    Args:
+        backup_path (str): Backup folder the cache file lives in.
+
+    Returns:
+        DomainCache: Shared cache instance.
+    """
+    path = os.path.abspath(os.path.join(backup_path, DOMAIN_CACHE_NAME))
+    with _caches_lock:
+        if path not in _caches:
+            _caches[path] = DomainCache(path)
+        return _caches[path]
@@ -0,0 +1,293 @@
+import asyncio
+from urllib.parse import urlparse
+
+import aiohttp
+
+from src.logos import (
+    brandfetch_logo_url,
+    link_shared_logo,
+    logo_flight_key,
+    logo_flights,
+    materialize_backup_logo,
+    download_retry_policy,
+    logo_request_headers,
+    resolve_domain,
+    save_logo,
+    spread_failures,
+    unique_companies,
+)
+from src.retry_policy import (
+    CircuitOpenError,
+    LogoNotFound,
+    RetryableError,
+    classify_response,
+    failure_cause,
+    get_circuit_breaker,
+)
+from src.rate_limit import get_rate_limiter
+from src.settings import REQUEST_TIMEOUT_SECONDS
+from src.tracing import trace_span
+
+# Overall number of companies in flight at once
+DEFAULT_CONCURRENCY = 64
+
+# Concurrent requests allowed to a single upstream host
+DEFAULT_PER_HOST_LIMIT = 16
+
+# Marks the end of a company iterator pulled through a worker thread
+_END = object()
+
+
+async def download_logo_async(
+    session, company_url, company_name, backup_path, session_cache_path
+):
+    """
+    Downloads a company logo over the shared async session and saves it.
+
+    Args:
+        session (aiohttp.ClientSession): Session holding the keep-alive connection pool.
+        company_url (str): Company domain (e.g., 'example.com').
+        company_name (str): Clean name used for saving the logo.
+        backup_path (str): Path to store persistent logo backup.
+        session_cache_path (str): Path to store session-specific logo.
+
+    Raises:
+        LogoNotFound: If the CDN has no image logo for the domain.
+        RetryableError: If transient failures persist after the last attempt.
+        CircuitOpenError: If the CDN circuit breaker is open.
+    """
+    logo_url = brandfetch_logo_url(company_url)
+    breaker = get_circuit_breaker(urlparse(logo_url).netloc)
+
+    with trace_span(company_name, "download") as span:
+        for attempt in range(1, download_retry_policy.max_attempts + 1):
+            span.retries = attempt - 1
+            if not breaker.allow():
+                raise CircuitOpenError()
+
+            try:
+                await get_rate_limiter("brandfetch").acquire_async()
+                async with session.get(
+                    logo_url, headers=logo_request_headers()
+                ) as response:
+                    content_type = response.headers.get("Content-Type", "")
+                    classify_response(
+                        response.status,
+                        content_type,
+                        response.headers.get("Retry-After"),
+                    )
+                    content = await response.read()
+            except LogoNotFound:
+                breaker.record_success()  # The upstream answered; it is healthy
+                raise
+            except (RetryableError, aiohttp.ClientError, asyncio.TimeoutError) as e:
+                breaker.record_failure()
+                if not isinstance(e, RetryableError):
+                    e = RetryableError(
+                        str(e) or type(e).__name__, cause="connection_error"
+                    )
+                if attempt == download_retry_policy.max_attempts:
+                    raise e
+                await asyncio.sleep(download_retry_policy.delay(attempt, e.retry_after))
+                continue
+            except BaseException:
+                # Cancelled, or an error that says nothing about the upstream's health
+                breaker.release_trial()
+                raise
+
+            breaker.record_success()
+            span.bytes = len(content)
+            break
+
+    # File writes and the manifest update are blocking; keep them off the loop
+    await asyncio.to_thread(
+        save_logo,
+        content,
+        content_type,
+        company_url,
+        company_name,
+        backup_path,
+        session_cache_path,
+    )
+
+
+async def process_company_async(
+    session, search_limit, company, backup_path, session_cache_path
+):
+    """
+    Async counterpart of `process_single_logo`: backup lookup, domain resolution, download.
+
+    Fetches already under way for the same company, in this loop or any other
+    thread, are awaited and shared rather than repeated.
+
+    Args:
+        session (aiohttp.ClientSession): Shared async HTTP session.
+        search_limit (asyncio.Semaphore): Caps concurrent (blocking) web searches.
+        company (str): Company name to process.
+        backup_path (str): Directory for persistent logo storage.
+        session_cache_path (str): Directory for session-specific logo use.
+
+    Raises:
+        LogoFetchError: If the domain could not be resolved or the download failed.
+    """
+    # Reuse backup logo if available
+    if materialize_backup_logo(company, backup_path, session_cache_path):
+        return
+
+    # Share the outcome of a fetch already under way in another session or loop
+    key = logo_flight_key(company, backup_path)
+    flight, leader = logo_flights.begin(key)
+    if not leader:
+        await asyncio.wrap_future(flight)
+        link_shared_logo(company, backup_path, session_cache_path)
+        return
+
+    try:
+        # An earlier leader may have finished between the lookup above and `begin`
+        if not materialize_backup_logo(company, backup_path, session_cache_path):
+            # The search client is synchronous, so resolve domains in worker threads
+            async with search_limit:
+                domain = await asyncio.to_thread(resolve_domain, company, backup_path)
+            if not domain:
+                raise LogoNotFound("Could not resolve domain", cause="domain_not_found")
+
+            await download_logo_async(
+                session, domain, company, backup_path, session_cache_path
+            )
+    except Exception as e:
+        logo_flights.finish(key, flight, error=e)
+        raise
+    except BaseException:
+        # Cancelled: let waiting callers fail (and retry later) instead of hanging
+        logo_flights.finish(
+            key, flight, error=RetryableError("Shared fetch was cancelled")
+        )
+        raise
+    logo_flights.finish(key, flight)
+
+
+async def _iterate_companies(companies):
+    """
+    Yields companies from a list, or from a blocking iterator (e.g. names parsed from
+    a streamed LLM answer) pulled in a worker thread so fetching continues meanwhile.
+    """
+    if isinstance(companies, (list, tuple)):
+        for company in companies:
+            yield company
+        return
+
+    iterator = iter(companies)
+    while True:
+        company = await asyncio.to_thread(next, iterator, _END)
+        if company is _END:
+            return
+        yield company
+
+
+async def _pull_logos(
+    company_list,
+    backup_path,
+    session_cache_path,
+    concurrency,
+    per_host_limit,
+    search_concurrency,
+    on_progress,
+):
+    # The connector pools keep-alive connections and enforces the per-host cap
+    connector = aiohttp.TCPConnector(limit=concurrency, limit_per_host=per_host_limit)
+    timeout = aiohttp.ClientTimeout(total=REQUEST_TIMEOUT_SECONDS)
+    search_limit = asyncio.Semaphore(search_concurrency)
+    overall_limit = asyncio.Semaphore(concurrency)
+
+    tasks = []
+    failed_logos = {}
+    done = 0
+
+    async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+
+        async def run_one(company):
+            nonlocal done
+            try:
+                try:
+                    await process_company_async(
+                        session,
+                        search_limit,
+                        company,
+                        backup_path,
+                        session_cache_path,
+                    )
+                    cause = None
+                except Exception as e:
+                    cause = failure_cause(e)
+
+                # Runs on the loop (calling) thread, so callbacks may update the UI
+                done += 1
+                if cause:
+                    failed_logos[company] = cause
+                if on_progress:
+                    on_progress(done, len(tasks), company)
+            finally:
+                overall_limit.release()
+
+        # Start fetching each company as soon as it arrives and a slot is free.
+        # Slots are taken before the next company is pulled and freed only after
+        # its progress is reported, so an iterator that paces itself on progress
+        # (see `pipeline.fetch_and_process_logos`) sees every finished company.
+        await overall_limit.acquire()
+        async for company in _iterate_companies(company_list):
+            tasks.append(asyncio.create_task(run_one(company)))
+            await overall_limit.acquire()
+        overall_limit.release()
+        await asyncio.gather(*tasks)
+
+    return failed_logos
+
+
+def pull_logos_async(
+    company_list,
+    backup_path,
+    session_cache_path,
+    concurrency=DEFAULT_CONCURRENCY,
+    per_host_limit=DEFAULT_PER_HOST_LIMIT,
+    search_concurrency=8,
+    on_progress=None,
+):
+    """
+    Fetches company logos on an asyncio event loop with a pooled HTTP session.
+
+    All downloads share one keep-alive connection pool, so repeat requests to the
+    CDN skip the TCP/TLS handshake. Progress callbacks run on the calling thread,
+    which keeps Streamlit widgets updatable from them.
+
+    `company_list` may also be a (blocking) iterator such as
+    `chatbot.stream_company_names(...)`: each company starts fetching as soon as
+    it is yielded, and progress totals grow until the iterator is exhausted.
+    Variants of one company (see `normalize_company_name`) are fetched once, and
+    share its outcome.
+
+    Args:
+        company_list (iterable[str]): Company names to fetch.
+        backup_path (str): Directory for persistent logo storage.
+        session_cache_path (str): Directory for session-specific logo use.
+        concurrency (int): Maximum companies (and pooled connections) in flight.
+        per_host_limit (int): Maximum concurrent requests to any single host.
+        search_concurrency (int): Maximum concurrent web searches.
+        on_progress (callable, optional): Called as `on_progress(done, total, company)`
+            after each company completes.
+
+    Returns:
+        dict: Company name -> failure cause for logos that could not be fetched.
+    """
+    variants = {}
+    failed_logos = asyncio.run(
+        _pull_logos(
+            unique_companies(company_list, variants),
+            backup_path,
+            session_cache_path,
+            concurrency,
+            per_host_limit,
+            search_concurrency,
+            on_progress,
+        )
+    )
+    return spread_failures(failed_logos, variants)
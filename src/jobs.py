@@ -0,0 +1,382 @@
+import contextvars
+import json
+import os
+import threading
+import time
+import uuid
+
+from src.rate_limit import get_rate_limiter, rate_session
+from src.session_gc import get_session_sweeper
+from src.session_sync import record_session_companies
+from src.tracing import activate
+
+# Companies fetched between checkpoints (and between checks for cancellation)
+DEFAULT_CHUNK_SIZE = 25
+
+# Finished job files older than this are deleted when the runner starts
+FINISHED_JOB_TTL = 7 * 24 * 3600
+
+# Job states; "interrupted" jobs were running when the process stopped
+ACTIVE_STATES = ("pending", "running")
+RESUMABLE_STATES = ("interrupted", "cancelled", "failed")
+
+
+class JobRunner:
+    """
+    Runs logo fetches in background threads, off the Streamlit script thread.
+
+    Each job fetches a list of companies into a session folder in chunks. After
+    every chunk its state (done, failed and pending companies) is written to a
+    JSON file under `jobs_dir`, so pages can poll progress across reruns and
+    browser refreshes, and a job cut short by a restart or a cancellation can be
+    resumed with only its pending companies. Cancellation takes effect at the
+    next chunk boundary; `cancel` waits for it by default.
+
+    The session folder's manifest (see `session_sync`) is rewritten after every
+    chunk too, so it always covers the logos the job has placed in the folder.
+    """
+
+    def __init__(self, jobs_dir, backup_path, chunk_size=DEFAULT_CHUNK_SIZE):
+        """
+        Args:
+            jobs_dir (str): Folder holding one JSON state file per job.
+            backup_path (str): Directory for persistent logo storage.
+            chunk_size (int): Companies fetched between checkpoints.
+        """
+        self.jobs_dir = jobs_dir
+        self.backup_path = backup_path
+        self.chunk_size = chunk_size
+        self._lock = threading.Lock()
+        self._jobs = {}  # job id -> state dict, for jobs loaded in this process
+        self._cancel = {}  # job id -> threading.Event, for running jobs
+        self._threads = {}  # job id -> worker thread, for running jobs
+        os.makedirs(jobs_dir, exist_ok=True)
+        self._recover()
+
+    # ---------------------- #
+    #     Persistence        #
+    # ---------------------- #
+
+    def _path(self, job_id):
+        return os.path.join(self.jobs_dir, f"{job_id}.json")
+
+    def _save(self, job):
+        """
+        Writes a job's state atomically. Must be called with the lock held.
+        """
+        job["updated_at"] = time.time()
+        path = self._path(job["id"])
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(job, f, indent=1)
+        os.replace(tmp_path, path)
+
+    def _load(self, job_id):
+        try:
+            with open(self._path(job_id), encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def _recover(self):
+        """
+        Marks jobs left running by an earlier process as interrupted, and deletes
+        old finished ones.
+        """
+        now = time.time()
+        for name in os.listdir(self.jobs_dir):
+            if not name.endswith(".json"):
+                continue
+            job = self._load(name[: -len(".json")])
+            if job is None:
+                continue
+            if job["status"] in ACTIVE_STATES:
+                job["status"] = "interrupted"
+                with self._lock:
+                    self._save(job)
+            elif now - job["updated_at"] > FINISHED_JOB_TTL:
+                os.remove(self._path(job["id"]))
+
+    # ---------------------- #
+    #    Submit / Control    #
+    # ---------------------- #
+
+    def submit(
+        self,
+        session_id,
+        session_cache_path,
+        companies,
+        engine="async",
+        session_companies=None,
+        tracer=None,
+    ):
+        """
+        Starts fetching logos for `companies` in the background.
+
+        Args:
+            session_id (str): Session the job belongs to (for fair rate limiting and
+                for finding the job again after a refresh).
+            session_cache_path (str): Session-specific folder to fetch into.
+            companies (list[str]): Company names to fetch.
+            engine (str): "async" or "threads", as for `pull_logos_parallel`.
+            session_companies (list[str], optional): Companies the session folder
+                holds once the job is done, recorded in its manifest (see
+                `session_sync.record_session_companies`). Defaults to `companies`.
+            tracer (Tracer, optional): Receives the job's stage timings.
+
+        Returns:
+            str: The job ID.
+        """
+        job = {
+            "id": uuid.uuid4().hex,
+            "session_id": session_id,
+            "session_cache_path": session_cache_path,
+            "engine": engine,
+            "status": "pending",
+            "companies": list(companies),
+            "session_companies": list(session_companies or companies),
+            "done": [],
+            "failed": {},
+            "error": None,
+            "created_at": time.time(),
+            "updated_at": time.time(),
+        }
+        with self._lock:
+            self._jobs[job["id"]] = job
+            self._save(job)
+        self._start(job, tracer)
+        return job["id"]
+
+    def resume(self, job_id, tracer=None):
+        """
+        Restarts an interrupted, cancelled or failed job with its pending companies.
+
+        Args:
+            job_id (str): Job to resume.
+            tracer (Tracer, optional): Receives the job's stage timings.
+
+        Returns:
+            bool: False if the job does not exist or is not resumable.
+        """
+        with self._lock:
+            job = self._jobs.get(job_id) or self._load(job_id)
+            if job is None or job["status"] not in RESUMABLE_STATES:
+                return False
+            job["status"] = "pending"
+            job["error"] = None
+            self._jobs[job_id] = job
+            self._save(job)
+        self._start(job, tracer)
+        return True
+
+    def cancel(self, job_id, wait=True):
+        """
+        Asks a running job to stop after its current chunk.
+
+        Args:
+            job_id (str): Job to cancel.
+            wait (bool): Block until the job has stopped writing to its session
+                folder. Callers that change the folder next must wait.
+
+        Returns:
+            bool: True if the job was running.
+        """
+        with self._lock:
+            event = self._cancel.get(job_id)
+            thread = self._threads.get(job_id)
+        if event is None:
+            return False
+        event.set()
+        if wait and thread is not threading.current_thread():
+            thread.join()
+        return True
+
+    def cancel_session(self, session_id):
+        """
+        Cancels every running job of a session and waits for them to stop.
+
+        Returns:
+            int: Number of jobs that were running.
+        """
+        with self._lock:
+            job_ids = [
+                job_id
+                for job_id in self._cancel
+                if self._jobs[job_id]["session_id"] == session_id
+            ]
+        return sum(self.cancel(job_id) for job_id in job_ids)
+
+    def _start(self, job, tracer):
+        cancel = threading.Event()
+        # The job inherits the caller's context; tracing is re-activated explicitly
+        context = contextvars.copy_context()
+        thread = threading.Thread(
+            target=context.run,
+            args=(self._run, job, cancel, tracer),
+            name=f"logo-job-{job['id'][:8]}",
+            daemon=True,
+        )
+        with self._lock:
+            self._cancel[job["id"]] = cancel
+            self._threads[job["id"]] = thread
+        thread.start()
+
+    # ---------------------- #
+    #      Execution         #
+    # ---------------------- #
+
+    def _fetch(self, job, chunk, on_progress):
+        if job["engine"] == "async":
+            from src.fetch_async import pull_logos_async
+
+            return pull_logos_async(
+                chunk,
+                self.backup_path,
+                job["session_cache_path"],
+                per_host_limit=get_rate_limiter("brandfetch").share(),
+                search_concurrency=get_rate_limiter("search").share(),
+                on_progress=on_progress,
+            )
+
+        from src.logos import pull_logos_threaded
+
+        return pull_logos_threaded(
+            chunk,
+            self.backup_path,
+            job["session_cache_path"],
+            max_workers=get_rate_limiter("search").share(),
+            on_progress=on_progress,
+        )
+
+    def _record(self, job):
+        """
+        Records the session's companies, leaving out those the job has not reached.
+
+        Pending companies are then fetched as additions by a later refresh, and
+        failed ones (recorded without a file) are retried.
+        """
+        pending = set(pending_companies(job))
+        record_session_companies(
+            [c for c in job["session_companies"] if c not in pending],
+            self.backup_path,
+            job["session_cache_path"],
+        )
+
+    def _run(self, job, cancel, tracer):
+        sweeper = get_session_sweeper(os.path.dirname(job["session_cache_path"]))
+
+        def on_progress(done, total, company):
+            with self._lock:
+                job["done"].append(company)
+
+        with self._lock:
+            job["status"] = "running"
+            self._save(job)
+
+        error = None
+        try:
+            with activate(tracer), rate_session(job["session_id"]):
+                while True:
+                    pending = pending_companies(job)
+                    if not pending or cancel.is_set():
+                        break
+                    chunk = pending[: self.chunk_size]
+                    sweeper.touch(job["session_cache_path"])  # Keep the folder live
+                    failed = self._fetch(job, chunk, on_progress)
+                    with self._lock:
+                        # Progress counts failures as done, and variants collapsed
+                        # into another name report none; settle both per chunk
+                        reported = set(job["done"])
+                        job["done"] = [c for c in job["done"] if c not in failed]
+                        job["done"] += [
+                            c for c in chunk if c not in failed and c not in reported
+                        ]
+                        job["failed"].update(failed)
+                        self._save(job)
+                    self._record(job)
+
+            status = "cancelled" if pending_companies(job) else "done"
+        except Exception as e:
+            status = "failed"
+            error = f"{type(e).__name__}: {e}"
+            try:
+                self._record(job)  # Whatever the last complete chunks fetched
+            except Exception:
+                pass
+
+        with self._lock:
+            job["status"] = status
+            job["error"] = error
+            self._save(job)
+            self._cancel.pop(job["id"], None)
+            self._threads.pop(job["id"], None)
+
+    # ---------------------- #
+    #        Queries         #
+    # ---------------------- #
+
+    def get(self, job_id):
+        """
+        Returns a snapshot of a job's state, or None if it is unknown.
+
+        Returns:
+            dict or None: State with "status", "companies", "done", "failed",
+            "pending" and "error" among other fields.
+        """
+        with self._lock:
+            job = self._jobs.get(job_id) or self._load(job_id)
+            if job is None:
+                return None
+            snapshot = json.loads(json.dumps(job))
+        snapshot["pending"] = pending_companies(snapshot)
+        return snapshot
+
+    def latest_for_session(self, session_id):
+        """
+        Returns the most recently created job of a session, or None.
+        """
+        latest = None
+        for name in os.listdir(self.jobs_dir):
+            if not name.endswith(".json"):
+                continue
+            job = self.get(name[: -len(".json")])
+            if job and job["session_id"] == session_id:
+                if latest is None or job["created_at"] > latest["created_at"]:
+                    latest = job
+        return latest
+
+
+def pending_companies(job):
+    """
+    Lists the companies a job has not attempted yet, in submission order.
+
+    Args:
+        job (dict): Job state.
+
+    Returns:
+        list[str]: Companies neither done nor failed.
+    """
+    attempted = set(job["done"]) | set(job["failed"])
+    return [company for company in job["companies"] if company not in attempted]
+
+
+_runners = {}
+_runners_lock = threading.Lock()
+
+
+def get_job_runner(cache_root, backup_path):
+    """
+    Returns the process-wide job runner for a cache folder, creating it on first use.
+
+    Args:
+        cache_root (str): Logo cache folder; jobs are kept in its `_jobs` folder.
+        backup_path (str): Directory for persistent logo storage.
+
+    Returns:
+        JobRunner: Shared runner.
+    """
+    key = os.path.abspath(cache_root)
+    with _runners_lock:
+        if key not in _runners:
+            _runners[key] = JobRunner(os.path.join(cache_root, "_jobs"), backup_path)
+        return _runners[key]
@@ -0,0 +1,122 @@
+import json
+import os
+import threading
+
+# Journal lines always allowed before compacting, however small the store
+MIN_COMPACT_LINES = 1000
+
+
+class JsonJournal:
+    """
+    JSON snapshot plus an append-only journal for a keyed store of entries.
+
+    Each write appends one line to `<path>.journal` instead of rewriting the
+    whole snapshot, so a write costs the same however large the store grows.
+    Loading replays the journal over the snapshot. The journal is folded back
+    into the snapshot on load and once it holds more lines than the store has
+    entries, which keeps both files, and load times, proportional to the store.
+
+    Not thread-safe by itself; the owning store serializes calls with its lock.
+    """
+
+    def __init__(self, path):
+        """
+        Args:
+            path (str): Snapshot file; the journal sits next to it.
+        """
+        self.path = path
+        self.journal_path = f"{path}.journal"
+        self.lines = 0  # Journal lines since the last compaction
+
+    def load(self, key):
+        """
+        Reads the snapshot and replays the journal over it.
+
+        Args:
+            key (callable): Maps a company name to its entry key, applied on every
+                load so changes to the key rules reach old files.
+
+        Returns:
+            tuple: (dict of key -> entry or None if the snapshot is missing or
+            unreadable, list of journal records replayed)
+        """
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                stored = json.load(f)
+            entries = {
+                key(entry["company"]): entry for entry in stored.get("entries", [])
+            }
+        except (FileNotFoundError, json.JSONDecodeError, KeyError):
+            entries = None
+
+        records = []
+        try:
+            with open(self.journal_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        records.append(json.loads(line))
+                    except json.JSONDecodeError:
+                        continue  # Torn final line from an interrupted write
+        except FileNotFoundError:
+            pass
+        self.lines = len(records)
+        return entries, records
+
+    @staticmethod
+    def replay(entries, records, key):
+        """
+        Applies journal records, in order, to a dict of entries.
+
+        Args:
+            entries (dict): Key -> entry, updated in place.
+            records (list[dict]): Records returned by `load`.
+            key (callable): Maps a company name to its entry key.
+        """
+        for record in records:
+            if "put" in record:
+                entries[key(record["put"]["company"])] = record["put"]
+            elif "drop" in record:
+                entries.pop(key(record["drop"]), None)
+
+    def put(self, entry):
+        """
+        Journals an added or replaced entry.
+        """
+        self._append({"put": entry})
+
+    def drop(self, company):
+        """
+        Journals the removal of a company's entry.
+        """
+        self._append({"drop": company})
+
+    def _append(self, record):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with open(self.journal_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record) + "\n")  # One write per line
+        self.lines += 1
+
+    def compaction_due(self, entry_count):
+        """
+        Returns True once the journal has outgrown the store.
+        """
+        return self.lines > max(MIN_COMPACT_LINES, entry_count)
+
+    def compact(self, entries):
+        """
+        Writes the snapshot atomically, then empties the journal.
+
+        Replaying a journal over a snapshot that already includes it gives the
+        same entries, so a crash between the two steps loses nothing.
+
+        Args:
+            entries (iterable[dict]): Every entry in the store.
+        """
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = f"{self.path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"entries": list(entries)}, f, indent=1)
+        os.replace(tmp_path, self.path)
+        with open(self.journal_path, "w", encoding="utf-8"):
+            pass
+        self.lines = 0
@@ -1,19 +1,67 @@
 import os
 import requests
-import streamlit as st
 import random
-import shutil
 from urllib.parse import urlparse
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from googlesearch import search
-import retrying
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, as_completed, wait
+import contextvars
 import threading
+import time
+import uuid
+from src.backup_index import (
+    get_backup_index,
+    normalize_company_name,
+    session_file_name,
+)
+from src.domain_cache import MISS, get_domain_cache
+from src.materialize import materialize
+from src.reporting import get_reporter
+from src.retry_policy import (
+    CircuitOpenError,
+    LogoNotFound,
+    RetryableError,
+    RetryPolicy,
+    classify_response,
+    failure_cause,
+    get_circuit_breaker,
+    summarize_failures,
+)
+from src.settings import REQUEST_TIMEOUT_SECONDS, get_secret
+from src.rate_limit import get_rate_limiter, rate_limit_metrics
+from src.single_flight import SingleFlight
+from src.tracing import trace_span
+
+# Logo CDN base URL (overridable, e.g. to point benchmarks at a local stand-in)
+BRANDFETCH_CDN_URL = "https://cdn.brandfetch.io"
+
+# Shared HTTP session so threaded downloads reuse keep-alive connections
+http_session = requests.Session()
+
+# Coalesces concurrent fetches of the same company's logo across sessions and threads
+logo_flights = SingleFlight()
+
+# Retry policy for logo downloads
+download_retry_policy = RetryPolicy()
 
 # ---------------------- #
 #      Utilities         #
 # ---------------------- #
 
 
+def search(query):
+    """
+    Runs a Google search, importing the search client on first use.
+
+    Args:
+        query (str): Search query.
+
+    Returns:
+        iterable[str]: Result URLs.
+    """
+    from googlesearch import search as google_search
+
+    return google_search(query)
+
+
 def get_company_website(company_name):
     """
     Perform a Google search to retrieve the official website of the given company.
@@ -25,6 +73,7 @@ def get_company_website(company_name):
         str or None: First non-Wikipedia/LinkedIn URL found, or None if not found.
     """
     query = f"{company_name} official site"
+    get_rate_limiter("search").acquire()  # Shared with every session in the process
     for result in search(query):
         if "wikipedia" not in result.lower() and "linkedin" not in result.lower():
             return result
@@ -48,25 +97,54 @@ def extract_domain(url):
         return None
 
 
-@retrying.retry(stop_max_attempt_number=5, wait_fixed=2000)
-def download_logo(company_url, company_name, backup_path, session_cache_path):
+def resolve_domain(company_name, backup_path):
     """
-    Downloads the company logo using Brandfetch API and saves it to both backup and session folders.
+    Resolves a company's domain, consulting the persistent domain cache before searching.
+
+    Both found and "not found" search results are cached; search errors are not.
+
+    Args:
+        company_name (str): Name of the company.
+        backup_path (str): Backup folder holding the domain cache file.
+
+    Returns:
+        str or None: Company domain, or None if it could not be resolved.
+    """
+    domain_cache = get_domain_cache(backup_path)
+    domain = domain_cache.get(company_name)
+    if domain is not MISS:
+        return domain
+
+    with trace_span(company_name, "search"):
+        website = get_company_website(company_name)
+    with trace_span(company_name, "domain_extraction"):
+        domain = extract_domain(website) if website else None
+    domain_cache.set(company_name, domain or None)
+    return domain or None
+
+
+def brandfetch_logo_url(company_url):
+    """
+    Builds the Brandfetch CDN URL for a company's logo.
 
     Args:
         company_url (str): Company domain (e.g., 'example.com').
-        company_name (str): Clean name used for saving the logo.
-        backup_path (str): Path to store persistent logo backup.
-        session_cache_path (str): Path to store session-specific logo.
 
-    Raises:
-        Exception: If the logo request fails or no image is returned.
+    Returns:
+        str: Logo URL including the API key.
+    """
+    api_key = get_secret("BRANDFETCH_API_KEY")
+    return f"{BRANDFETCH_CDN_URL}/{company_url}/w/512/h/94/logo?c={api_key}"
+
+
+def logo_request_headers():
     """
-    api_key = st.secrets["BRANDFETCH_API_KEY"]
-    logo_url = f"https://cdn.brandfetch.io/{company_url}/w/512/h/94/logo?c={api_key}"
+    Builds request headers for the logo CDN, rotating user-agents to avoid bot detection.
 
-    # Rotate user-agents to avoid bot detection
-    headers = {
+    Returns:
+        dict: HTTP headers.
+    """
+    return {
         "User-Agent": random.choice(
             [
                 "Mozilla/5.0 (Windows NT 10.0; Win64; x64)",
@@ -80,113 +158,434 @@ def download_logo(company_url, company_name, backup_path, session_cache_path):
         "Pragma": "no-cache",
     }
 
-    response = requests.get(logo_url, headers=headers, stream=True)
 
-    if response.status_code == 200 and "image" in response.headers.get(
-        "Content-Type", ""
-    ):
-        extension = response.headers["Content-Type"].split("/")[-1]
-        if extension == "webp":
-            extension = "png"  # Normalize to PNG for compatibility
+def save_logo(
+    content, content_type, company_url, company_name, backup_path, session_cache_path
+):
+    """
+    Saves downloaded logo bytes to the backup folder, links them into the session
+    folder and indexes them.
 
-        file_name = f"{company_name}.{extension}"
-        file_path = os.path.join(backup_path, file_name)
-        cache_path = os.path.join(session_cache_path, file_name)
+    Args:
+        content (bytes): Image bytes.
+        content_type (str): Response content type (e.g. 'image/png').
+        company_url (str): Domain the logo was fetched for.
+        company_name (str): Clean name used for saving the logo.
+        backup_path (str): Path to store persistent logo backup.
+        session_cache_path (str): Path to store session-specific logo.
+    """
+    extension = content_type.split("/")[-1]
+    if extension == "webp":
+        extension = "png"  # Normalize to PNG for compatibility
 
-        # Save logo to both backup and session-specific folders
-        content = response.content
-        with open(file_path, "wb") as f:
-            f.write(content)
-        with open(cache_path, "wb") as f:
+    file_name = f"{company_name}.{extension}"
+    file_path = os.path.join(backup_path, file_name)
+    cache_path = os.path.join(session_cache_path, file_name)
+
+    with trace_span(company_name, "save") as span:
+        span.bytes = len(content)
+
+        # Write the bytes once to the backup folder. The temporary file + rename keeps
+        # readers (and session links to an older version) from seeing a partial file.
+        tmp_path = f"{file_path}.{uuid.uuid4().hex}.tmp"
+        with open(tmp_path, "wb") as f:
             f.write(content)
-    else:
-        raise Exception("Logo download failed")
+        os.replace(tmp_path, file_path)
+
+        # Link the session copy to the backup file instead of writing the bytes again
+        if os.path.lexists(cache_path):
+            os.unlink(cache_path)
+        materialize(file_path, cache_path)
+
+        # Keep the backup index in sync with the new file
+        get_backup_index(backup_path).record(
+            company_name,
+            file_name,
+            content,
+            domain=company_url,
+            content_type=content_type,
+        )
+
+
+def download_logo(company_url, company_name, backup_path, session_cache_path):
+    """
+    Downloads the company logo using Brandfetch API and saves it to both backup and session folders.
+
+    Definitive misses (404, non-image responses) fail immediately. Rate limits,
+    server errors and connection errors are retried with jittered exponential
+    backoff (honouring `Retry-After`), and the CDN's circuit breaker rejects calls
+    outright while it is unhealthy.
+
+    Args:
+        company_url (str): Company domain (e.g., 'example.com').
+        company_name (str): Clean name used for saving the logo.
+        backup_path (str): Path to store persistent logo backup.
+        session_cache_path (str): Path to store session-specific logo.
+
+    Raises:
+        LogoNotFound: If the CDN has no image logo for the domain.
+        RetryableError: If transient failures persist after the last attempt.
+        CircuitOpenError: If the CDN circuit breaker is open.
+    """
+    logo_url = brandfetch_logo_url(company_url)
+    breaker = get_circuit_breaker(urlparse(logo_url).netloc)
+
+    with trace_span(company_name, "download") as span:
+        for attempt in range(1, download_retry_policy.max_attempts + 1):
+            span.retries = attempt - 1
+            if not breaker.allow():
+                raise CircuitOpenError()
+
+            try:
+                get_rate_limiter("brandfetch").acquire()
+                # Reuse pooled keep-alive connections to the CDN across calls and threads
+                response = http_session.get(
+                    logo_url,
+                    headers=logo_request_headers(),
+                    timeout=REQUEST_TIMEOUT_SECONDS,
+                )
+                content_type = response.headers.get("Content-Type", "")
+                classify_response(
+                    response.status_code,
+                    content_type,
+                    response.headers.get("Retry-After"),
+                )
+            except LogoNotFound:
+                breaker.record_success()  # The upstream answered; it is healthy
+                raise
+            except (RetryableError, requests.RequestException) as e:
+                breaker.record_failure()
+                if not isinstance(e, RetryableError):
+                    e = RetryableError(str(e), cause="connection_error")
+                if attempt == download_retry_policy.max_attempts:
+                    raise e
+                time.sleep(download_retry_policy.delay(attempt, e.retry_after))
+                continue
+            except BaseException:
+                # Cancelled, or an error that says nothing about the upstream's health
+                breaker.release_trial()
+                raise
+
+            breaker.record_success()
+            span.bytes = len(response.content)
+            break
+
+    save_logo(
+        response.content,
+        content_type,
+        company_url,
+        company_name,
+        backup_path,
+        session_cache_path,
+    )
+
+
+def materialize_backup_logo(company, backup_path, session_cache_path):
+    """
+    Links (or, failing that, copies) a company's backed-up logo into the session folder.
+
+    Args:
+        company (str): Company name.
+        backup_path (str): Backup folder, looked up through its index.
+        session_cache_path (str): Session-specific folder for logo copies.
+
+    Returns:
+        bool: True if the logo was found in the backup store.
+    """
+    with trace_span(company, "backup_lookup"):
+        backup_index = get_backup_index(backup_path)
+        backup_entry = backup_index.lookup(company)
+        if not backup_entry:
+            return False
+
+        source = backup_index.path_for(backup_entry)
+        destination = os.path.join(
+            session_cache_path, session_file_name(company, backup_entry)
+        )
+        if not os.path.exists(destination):
+            materialize(source, destination)
+        return True
+
+
+def logo_flight_key(company, backup_path):
+    """
+    Identifies a company's logo fetch for `logo_flights`: one per backup store and company.
+    """
+    return os.path.abspath(backup_path), normalize_company_name(company)
+
+
+def _fetch_into_backup(company, backup_path, session_cache_path):
+    """
+    Resolves the domain and downloads the logo; run by the leader of a fetch only.
+    """
+    # An earlier leader may have finished between the caller's backup lookup and now
+    if materialize_backup_logo(company, backup_path, session_cache_path):
+        return
+
+    domain = resolve_domain(company, backup_path)
+    if not domain:
+        raise LogoNotFound("Could not resolve domain", cause="domain_not_found")
+    download_logo(domain, company, backup_path, session_cache_path)
+
+
+def link_shared_logo(company, backup_path, session_cache_path):
+    """
+    Links the logo another caller just fetched into this session's folder.
+
+    Raises:
+        LogoNotFound: If the logo has left the backup store since.
+    """
+    if not materialize_backup_logo(company, backup_path, session_cache_path):
+        raise LogoNotFound("Shared logo missing from backup", cause="not_found")
 
 
 def process_single_logo(company, backup_path, session_cache_path, failed_logos, lock):
     """
     Attempts to fetch a logo from cache or download it; logs failures in a thread-safe manner.
 
+    If another session or thread is already fetching the same company, waits for
+    it and shares its outcome instead of searching and downloading again.
+
     Args:
         company (str): Company name to process.
-        backup_path (str): Folder to check for cached logo.
+        backup_path (str): Backup folder, looked up through its index.
         session_cache_path (str): Session-specific folder for logo copies.
-        failed_logos (list): Shared list for tracking failures.
+        failed_logos (dict): Shared mapping of failed company -> failure cause.
         lock (threading.Lock): Lock for thread-safe access to `failed_logos`.
     """
     try:
-        # Reuse backup logo if available
-        backup_file = next(
-            (f for f in os.listdir(backup_path) if f.startswith(company)), None
-        )
-        if backup_file:
-            source = os.path.join(backup_path, backup_file)
-            destination = os.path.join(session_cache_path, backup_file)
-            if not os.path.exists(destination):
-                shutil.copy2(source, destination)
+        # Reuse backup logo if available (exact match on the normalized name)
+        if materialize_backup_logo(company, backup_path, session_cache_path):
             return
 
-        # Attempt fresh download if not in backup
-        website = get_company_website(company)
-        if website:
-            domain = extract_domain(website)
-            if domain:
-                download_logo(domain, company, backup_path, session_cache_path)
-            else:
-                raise Exception("Could not extract domain")
-        else:
-            raise Exception("Could not find website")
+        # Attempt fresh download if not in backup, unless one is already under way
+        _, leader = logo_flights.run(
+            logo_flight_key(company, backup_path),
+            _fetch_into_backup,
+            company,
+            backup_path,
+            session_cache_path,
+        )
+        if not leader:
+            link_shared_logo(company, backup_path, session_cache_path)
 
-    except Exception:
+    except Exception as e:
         with lock:
-            failed_logos.append(company)
+            failed_logos[company] = failure_cause(e)
 
 
 # ------------------------------- #
-#   Main Parallel Pull Function   #
+#   Main Parallel Pull Functions  #
 # ------------------------------- #
 
 
-def pull_logos_parallel(companies, backup_path, session_cache_path, max_workers=8):
+def unique_companies(company_list, variants):
+    """
+    Collapses variants of the same company so each entity is fetched once.
+
+    Args:
+        company_list (iterable[str]): Company names, possibly an iterator.
+        variants (dict): Filled with first name seen -> later names of the same
+            company, for `spread_failures`.
+
+    Returns:
+        iterable[str]: The first name seen for each company; a list for list input,
+        otherwise a generator that dedupes as names arrive.
+    """
+    first_seen = {}
+
+    def dedupe():
+        for company in company_list:
+            key = normalize_company_name(company)
+            if key in first_seen:
+                variants.setdefault(first_seen[key], []).append(company)
+                continue
+            first_seen[key] = company
+            yield company
+
+    if isinstance(company_list, (list, tuple)):
+        return list(dedupe())
+    return dedupe()
+
+
+def spread_failures(failed_logos, variants):
+    """
+    Marks the variants of each failed company as failed with the same cause.
+
+    Args:
+        failed_logos (dict): Company name -> failure cause; updated in place.
+        variants (dict): First name seen -> other names, from `unique_companies`.
+
+    Returns:
+        dict: `failed_logos`.
+    """
+    for company, others in variants.items():
+        if company in failed_logos:
+            for other in others:
+                failed_logos[other] = failed_logos[company]
+    return failed_logos
+
+
+def pull_logos_threaded(
+    company_list, backup_path, session_cache_path, max_workers=8, on_progress=None
+):
     """
-    Downloads company logos in parallel using thread pool execution.
+    Fetches company logos using a thread pool, one blocking request per thread.
+
+    An iterator is consumed as it yields, so fetching starts before it is exhausted.
+    At most `2 * max_workers` companies are submitted ahead of the threads, and
+    progress is reported as each completes, so a caller whose iterator waits on
+    those callbacks (see `pipeline.fetch_and_process_logos`) paces submission.
+    Progress totals grow until the iterator is exhausted. Variants of one company
+    (see `normalize_company_name`) are fetched once, and share its outcome.
 
     Args:
-        companies (pd.DataFrame): DataFrame containing a 'Company' column.
+        company_list (iterable[str]): Company names to fetch.
         backup_path (str): Directory for persistent logo storage.
         session_cache_path (str): Directory for session-specific logo use.
         max_workers (int): Number of parallel threads to use.
-    """
-    st.write(f"Downloading logos for {len(companies)} companies...")
-    bar = st.progress(0, text="Starting...")
+        on_progress (callable, optional): Called as `on_progress(done, total, company)`
+            after each company completes.
 
-    failed_logos = []
+    Returns:
+        dict: Company name -> failure cause for logos that could not be fetched.
+    """
+    failed_logos = {}
     lock = threading.Lock()
-
-    # Dispatch threads for each logo fetch
+    variants = {}
+    window = 2 * max_workers
+    pending = {}
+    submitted = done = 0
+
+    def report(futures):
+        nonlocal done
+        for future in futures:
+            done += 1
+            if on_progress:
+                on_progress(done, submitted, pending.pop(future))
+
+    # Dispatch threads for each logo fetch. Each task runs in a copy of the caller's
+    # context so the active tracer (if any) follows it into the worker thread.
     with ThreadPoolExecutor(max_workers=max_workers) as executor:
-        futures = {
-            executor.submit(
+        for company in unique_companies(company_list, variants):
+            while len(pending) >= window:
+                finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                report(finished)
+            future = executor.submit(
+                contextvars.copy_context().run,
                 process_single_logo,
                 company,
                 backup_path,
                 session_cache_path,
                 failed_logos,
                 lock,
-            ): company
-            for company in companies["Company"]
-        }
+            )
+            pending[future] = company
+            submitted += 1
+
+        # Report the rest as threads complete
+        report(as_completed(list(pending)))
 
-        # Update progress bar as threads complete
-        for i, future in enumerate(as_completed(futures), 1):
-            company = futures[future]
-            bar.progress(i / len(futures), text=f"Processed {company}")
+    return spread_failures(failed_logos, variants)
 
-    bar.empty()
-    st.success("✅ Logos processed")
 
-    # Display list of companies whose logos couldn't be found
+def pull_logos_parallel(
+    companies, backup_path, session_cache_path, max_workers=None, engine="async"
+):
+    """
+    Downloads company logos in parallel and reports progress through the active reporter.
+
+    Args:
+        companies (pd.DataFrame or iterable[str]): DataFrame containing a 'Company'
+            column, or company names. An iterator (e.g. a streamed LLM answer) is
+            fetched from as it yields.
+        backup_path (str): Directory for persistent logo storage.
+        session_cache_path (str): Directory for session-specific logo use.
+        max_workers (int, optional): Number of parallel threads for the "threads"
+            engine, or of concurrent web searches for the "async" engine. Defaults
+            to this session's share of the global search budget (see
+            `rate_limit.rate_session`).
+        engine (str): "async" for the pooled asyncio fetcher, "threads" for the
+            thread-pool fetcher.
+
+    Returns:
+        dict: Company name -> failure cause for logos that could not be fetched.
+    """
+    reporter = get_reporter()
+    if max_workers is None:
+        max_workers = get_rate_limiter("search").share()
+    if hasattr(companies, "columns"):
+        company_list = list(companies["Company"])
+    else:
+        company_list = companies
+    if isinstance(company_list, list):
+        reporter.write(f"Downloading logos for {len(company_list)} companies...")
+    else:
+        reporter.write("Downloading logos as companies arrive...")
+    bar = reporter.progress("Starting...")
+
+    def on_progress(done, total, company):
+        bar.update(done, total, f"Processed {company}")
+
+    if engine == "async":
+        from src.fetch_async import pull_logos_async
+
+        failed_logos = pull_logos_async(
+            company_list,
+            backup_path,
+            session_cache_path,
+            per_host_limit=get_rate_limiter("brandfetch").share(),
+            search_concurrency=max_workers,
+            on_progress=on_progress,
+        )
+    else:
+        failed_logos = pull_logos_threaded(
+            company_list,
+            backup_path,
+            session_cache_path,
+            max_workers=max_workers,
+            on_progress=on_progress,
+        )
+
+    bar.close()
+    reporter.success("✅ Logos processed")
+    report_fetch_summary(failed_logos, backup_path)
+    return failed_logos
+
+
+def report_fetch_summary(failed_logos, backup_path):
+    """
+    Reports domain cache effectiveness and the companies whose logos were not found.
+
+    Args:
+        failed_logos (dict): Company name -> failure cause.
+        backup_path (str): Backup folder holding the domain cache file.
+    """
+    reporter = get_reporter()
+    domain_stats = get_domain_cache(backup_path).stats()
+    reporter.caption(
+        f"🌐 Domain cache: {domain_stats['hits'] + domain_stats['negative_hits']} hits, "
+        f"{domain_stats['misses']} searches ({domain_stats['hit_rate']:.0%} hit rate)"
+    )
+    limits = [m for m in rate_limit_metrics() if m["granted"]]
+    if limits:
+        reporter.caption(
+            "⏳ Rate limits: "
+            + "; ".join(
+                f"{m['upstream']} {m['granted']} requests, "
+                f"p95 wait {m['wait_p95_s']:.2f} s, {m['queue_depth']} queued"
+                for m in limits
+            )
+        )
+
+    # Display list of companies whose logos couldn't be found, with per-cause counts
     if failed_logos:
         error_message = "⚠️ Logos could not be found for the following companies:\n\n"
-        error_message += "\n".join(f"- {name}" for name in failed_logos)
-        st.error(error_message)
+        error_message += "\n".join(
+            f"- {name} ({cause})" for name, cause in failed_logos.items()
+        )
+        error_message += "\n\nFailures by cause: " + ", ".join(
+            f"{cause}: {count}"
+            for cause, count in summarize_failures(failed_logos).most_common()
+        )
+        reporter.error(error_message)
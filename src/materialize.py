@@ -0,0 +1,86 @@
+import os
+import shutil
+import sys
+import threading
+from collections import Counter
+
+# Linux ioctl that clones a file's extents (btrfs, XFS with reflink, overlayfs on those)
+FICLONE = 0x40049409
+
+# Strategies tried in order; the first one the filesystem supports wins
+DEFAULT_STRATEGIES = ("hardlink", "reflink", "copy")
+
+# Number of files materialized with each strategy, for monitoring
+materialize_stats = Counter()
+_stats_lock = threading.Lock()
+
+
+def _hardlink(source, destination):
+    os.link(source, destination)
+
+
+def _reflink(source, destination):
+    """
+    Creates a copy-on-write clone of `source` at `destination`.
+
+    Raises:
+        OSError: If the platform or filesystem does not support reflinks.
+    """
+    if not sys.platform.startswith("linux"):
+        raise OSError("Reflinks are only supported on Linux")
+
+    import fcntl
+
+    with open(source, "rb") as src, open(destination, "wb") as dst:
+        try:
+            fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+        except OSError:
+            dst.close()
+            os.unlink(destination)
+            raise
+
+
+def _copy(source, destination):
+    shutil.copy2(source, destination)
+
+
+_STRATEGY_FUNCTIONS = {
+    "hardlink": _hardlink,
+    "reflink": _reflink,
+    "copy": _copy,
+}
+
+
+def materialize(source, destination, strategies=DEFAULT_STRATEGIES):
+    """
+    Makes `source` available at `destination` without duplicating its bytes if possible.
+
+    Hard links share the backup file's inode, so session folders cost no extra
+    space. That is safe because backup files are only ever replaced atomically
+    (written to a temporary file and renamed), never modified in place. Reflinks
+    are tried next, and a plain copy is the last resort (e.g. across filesystems).
+
+    Args:
+        source (str): Canonical file, typically in the backup folder.
+        destination (str): Path to create, typically in a session folder.
+        strategies (tuple): Strategy names to try in order.
+
+    Returns:
+        str: Name of the strategy that succeeded.
+
+    Raises:
+        OSError: If every strategy failed.
+    """
+    error = None
+    for strategy in strategies:
+        try:
+            _STRATEGY_FUNCTIONS[strategy](source, destination)
+        except OSError as e:
+            if isinstance(e, FileExistsError):
+                raise
+            error = e
+            continue
+        with _stats_lock:
+            materialize_stats[strategy] += 1
+        return strategy
+    raise error or OSError(f"Could not materialize {source}")
@@ -1,14 +1,26 @@
 from pptx import Presentation
+from pptx.opc.constants import RELATIONSHIP_TYPE as RT
+from pptx.opc.packuri import PackURI
+from pptx.parts.image import Image as PptxImage, ImagePart
 from pptx.util import Inches
 from PIL import Image
-from src.reformat import remove_white_background, auto_crop
+from io import BytesIO
+from src.reformat import process_logo_file
+from src.processed_cache import ProcessedLogoCache
+from src.tracing import trace_record, trace_span, tracing_enabled
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, as_completed, wait
+from concurrent.futures.process import BrokenProcessPool
+import hashlib
 import shutil
 import os
-import streamlit as st
+from itertools import chain, islice
+from src.reporting import get_reporter
 
 # Output configuration
-output_file = "logos_presentation.pptx"
-backup_path = "logo_backup"
+processed_cache_path = os.path.join("logo_cache", "_processed")
+
+# Shared cache of cleaned and resized logos, reused across generations and sessions
+processed_cache = ProcessedLogoCache(processed_cache_path)
 
 
 def clear_folder(cache_folder):
@@ -26,7 +38,7 @@ def clear_folder(cache_folder):
             elif os.path.isdir(file_path):
                 shutil.rmtree(file_path)
         except Exception as e:
-            st.error(f"Failed to delete {file_path}. Reason: {e}")
+            get_reporter().error(f"Failed to delete {file_path}. Reason: {e}")
 
 
 def configure_ppt_settings(logo_positions: tuple, slide_size: tuple):
@@ -73,6 +85,379 @@ def configure_ppt_settings(logo_positions: tuple, slide_size: tuple):
     }
 
 
+def _process_job(
+    source_path, logo_height, max_logo_width, traced, resize_first=False
+):
+    """
+    Processes one logo, returning its stage timings too when tracing is on.
+
+    Runs in worker processes, which cannot see the parent's tracer, so timings
+    travel back with the result and are recorded by `_record_timings`.
+
+    Returns:
+        tuple: (PNG bytes, width px, height px, timings dict or None)
+    """
+    timings = {} if traced else None
+    return (
+        *process_logo_file(
+            source_path, logo_height, max_logo_width, timings, resize_first
+        ),
+        timings,
+    )
+
+
+def _record_timings(logo, timings):
+    """Records a worker's stage timings for `logo` in the active tracer."""
+    if timings:
+        name = os.path.splitext(logo)[0]
+        for stage, (seconds, size) in timings.items():
+            trace_record(name, stage, seconds, bytes=size)
+
+
+def _process_serial(
+    jobs, logo_height, max_logo_width, failed_logos, resize_first=False
+):
+    """
+    Processes logos one after another in the current process.
+
+    Args:
+        jobs (iterable): (logo_name, source_path) tuples.
+        logo_height (int): Target logo height in pixels.
+        max_logo_width (int): Maximum allowed width for logos.
+        failed_logos (list): Collects names of logos that could not be processed.
+        resize_first (bool): Clean at close to the final size (see
+            `reformat.process_logo_file`) rather than at full resolution.
+
+    Returns:
+        list of tuples: (logo name, PNG bytes, resized width in px, resized height in px)
+    """
+    traced = tracing_enabled()
+    processed_logos = []
+    for logo, source_path in jobs:
+        try:
+            data, width, height, timings = _process_job(
+                source_path, logo_height, max_logo_width, traced, resize_first
+            )
+        except Exception:
+            failed_logos.append(logo)
+            continue
+        _record_timings(logo, timings)
+        processed_logos.append((logo, data, width, height))
+    return processed_logos
+
+
+def _process_parallel(
+    jobs, logo_height, max_logo_width, failed_logos, max_workers, resize_first=False
+):
+    """
+    Spreads logo processing across a pool of worker processes.
+
+    Falls back to serial processing for any logos left over if the pool cannot be
+    started or breaks (e.g. a worker is killed while decoding a malformed image).
+
+    Args:
+        jobs (list): List of (logo_name, source_path) tuples.
+        logo_height (int): Target logo height in pixels.
+        max_logo_width (int): Maximum allowed width for logos.
+        failed_logos (list): Collects names of logos that could not be processed.
+        max_workers (int): Number of worker processes.
+        resize_first (bool): As for `_process_serial`.
+
+    Returns:
+        list of tuples: (logo name, PNG bytes, resized width in px, resized height in px)
+    """
+    traced = tracing_enabled()
+    processed_logos = []
+    remaining = list(jobs)
+
+    try:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                executor.submit(
+                    _process_job,
+                    source_path,
+                    logo_height,
+                    max_logo_width,
+                    traced,
+                    resize_first,
+                ): (logo, source_path)
+                for logo, source_path in jobs
+            }
+            for future in as_completed(futures):
+                job = futures[future]
+                try:
+                    data, width, height, timings = future.result()
+                except BrokenProcessPool:
+                    continue  # Left in `remaining` and retried serially below
+                except Exception:
+                    failed_logos.append(job[0])
+                else:
+                    _record_timings(job[0], timings)
+                    processed_logos.append((job[0], data, width, height))
+                remaining.remove(job)
+    except (OSError, BrokenProcessPool):
+        pass  # Pool unavailable or broken; finish the rest in-process
+
+    processed_logos.extend(
+        _process_serial(
+            remaining, logo_height, max_logo_width, failed_logos, resize_first
+        )
+    )
+    return processed_logos
+
+
+def _cache_lookup(logo, source_path, logo_height, max_logo_width, resize_first):
+    """
+    Looks a logo up in `processed_cache` for the given sizing and processing mode.
+
+    Returns:
+        tuple: (cache key, processed logo tuple or None on a miss)
+
+    Raises:
+        OSError: If the source file cannot be read.
+    """
+    with trace_span(os.path.splitext(logo)[0], "cache_lookup") as span:
+        key = processed_cache.key(
+            source_path,
+            logo_height=logo_height,
+            max_logo_width=max_logo_width,
+            resize_first=resize_first,
+        )
+        data = processed_cache.get(key)
+        span.bytes = len(data) if data is not None else 0
+    if data is None:
+        return key, None
+    with Image.open(BytesIO(data)) as img:
+        return key, (logo, data, img.width, img.height)
+
+
+def list_logo_files(folder):
+    """
+    Lists the supported logo images in a folder, sorted case-insensitively.
+
+    Args:
+        folder (str): Folder holding original logos.
+
+    Returns:
+        list[str]: Logo file names.
+    """
+    logos = [
+        f for f in os.listdir(folder) if f.lower().endswith((".png", ".jpg", ".jpeg"))
+    ]
+    logos.sort(key=str.lower)
+    return logos
+
+
+def process_logo_batch(
+    folder,
+    logos,
+    logo_height,
+    max_logo_width,
+    max_workers=None,
+    use_cache=True,
+    resize_first=False,
+):
+    """
+    Cleans and resizes the given logos, reusing cached results where possible.
+
+    Args:
+        folder (str): Folder holding the original logos.
+        logos (list[str]): File names within `folder` to process.
+        logo_height (int): Target logo height in pixels.
+        max_logo_width (int): Maximum allowed width for logos.
+        max_workers (int, optional): Number of worker processes. Defaults to the CPU
+            count; 1 processes logos serially in the current process.
+        use_cache (bool): Reuse previously processed logos from `processed_cache`.
+        resize_first (bool): Clean and crop at close to the final size, trading
+            exact crops for speed (see `reformat.process_logo_file`).
+
+    Returns:
+        tuple: (processed logos sorted by name as (logo name, PNG bytes, width px,
+        height px) tuples, list of logo names that could not be processed)
+    """
+    # Logos already processed with the same source bytes and sizing come from the cache
+    processed_logos = []
+    failed_logos = []
+    jobs = []
+    cache_keys = {}
+    for logo in logos:
+        source_path = os.path.join(folder, logo)
+
+        if use_cache:
+            try:
+                key, cached = _cache_lookup(
+                    logo, source_path, logo_height, max_logo_width, resize_first
+                )
+            except OSError:
+                failed_logos.append(logo)
+                continue
+            if cached is not None:
+                processed_logos.append(cached)
+                continue
+            cache_keys[logo] = key
+
+        jobs.append((logo, source_path))
+
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    max_workers = min(max_workers, len(jobs))
+
+    if max_workers > 1:
+        newly_processed = _process_parallel(
+            jobs, logo_height, max_logo_width, failed_logos, max_workers, resize_first
+        )
+    else:
+        newly_processed = _process_serial(
+            jobs, logo_height, max_logo_width, failed_logos, resize_first
+        )
+
+    for logo, data, _, _ in newly_processed:
+        if logo in cache_keys:
+            processed_cache.put(cache_keys[logo], data)
+    processed_logos.extend(newly_processed)
+
+    # Sort logos alphabetically by filename for consistent ordering in output
+    processed_logos.sort(key=lambda x: x[0].lower())
+    return processed_logos, failed_logos
+
+
+def process_logo_stream(
+    folder,
+    logos,
+    logo_height,
+    max_logo_width,
+    max_workers=None,
+    max_pending=None,
+    use_cache=True,
+    resize_first=False,
+):
+    """
+    Cleans and resizes logos as their names arrive, e.g. while they are still being fetched.
+
+    Each logo is handed to a worker process as soon as `logos` yields it, so image
+    work overlaps with whatever produces the names. At most `max_pending` logos are
+    in flight; beyond that, pulling from `logos` waits for a worker to finish, which
+    in turn holds back a bounded producer.
+
+    Args:
+        folder (str): Folder holding the original logos.
+        logos (iterable[str]): File names within `folder`, possibly a blocking iterator.
+        logo_height (int): Target logo height in pixels.
+        max_logo_width (int): Maximum allowed width for logos.
+        max_workers (int, optional): Number of worker processes. Defaults to the CPU
+            count; 1 processes logos serially in the current thread.
+        max_pending (int, optional): Logos in flight at once. Defaults to twice the
+            worker count.
+        use_cache (bool): Reuse previously processed logos from `processed_cache`.
+        resize_first (bool): As for `process_logo_batch`.
+
+    Returns:
+        tuple: (processed logos sorted by name as (logo name, PNG bytes, width px,
+        height px) tuples, list of logo names that could not be processed)
+    """
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    if max_pending is None:
+        max_pending = 2 * max_workers
+
+    traced = tracing_enabled()
+    processed_logos = []
+    failed_logos = []
+    cache_keys = {}
+    leftover = []  # Jobs to finish in-process if the pool is unavailable or breaks
+
+    def finish(job, result):
+        data, width, height, timings = result
+        _record_timings(job[0], timings)
+        if job[0] in cache_keys:
+            processed_cache.put(cache_keys[job[0]], data)
+        processed_logos.append((job[0], data, width, height))
+
+    def collect(futures, done):
+        for future in done:
+            job = futures.pop(future)
+            try:
+                finish(job, future.result())
+            except BrokenProcessPool:
+                leftover.append(job)
+            except Exception:
+                failed_logos.append(job[0])
+
+    def jobs():
+        for logo in logos:
+            source_path = os.path.join(folder, logo)
+            if use_cache:
+                try:
+                    key, cached = _cache_lookup(
+                        logo, source_path, logo_height, max_logo_width, resize_first
+                    )
+                except OSError:
+                    failed_logos.append(logo)
+                    continue
+                if cached is not None:
+                    processed_logos.append(cached)
+                    continue
+                cache_keys[logo] = key
+            yield logo, source_path
+
+    pending = jobs()
+    if max_workers > 1:
+        futures = {}
+        try:
+            with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                for job in pending:
+                    if leftover:
+                        leftover.append(job)
+                        break  # Pool broke; stop submitting
+                    try:
+                        future = executor.submit(
+                            _process_job,
+                            job[1],
+                            logo_height,
+                            max_logo_width,
+                            traced,
+                            resize_first,
+                        )
+                    except (OSError, BrokenProcessPool):
+                        leftover.append(job)
+                        break  # Pool unavailable or broken
+                    futures[future] = job
+                    if len(futures) >= max_pending:
+                        done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                        collect(futures, done)
+                collect(futures, list(futures))
+        except (OSError, BrokenProcessPool):
+            leftover.extend(futures.values())  # Finish the rest in-process
+
+    for logo, data, width, height in _process_serial(
+        chain(leftover, pending),
+        logo_height,
+        max_logo_width,
+        failed_logos,
+        resize_first,
+    ):
+        if logo in cache_keys:
+            processed_cache.put(cache_keys[logo], data)
+        processed_logos.append((logo, data, width, height))
+
+    processed_logos.sort(key=lambda x: x[0].lower())
+    return processed_logos, failed_logos
+
+
+def report_processing_failures(failed_logos):
+    """
+    Reports logos that could not be processed through the active reporter.
+
+    Args:
+        failed_logos (list[str]): Logo file names.
+    """
+    if failed_logos:
+        get_reporter().error(
+            "⚠️ The following logos could not be processed:\n\n"
+            + "\n".join(f"- {name}" for name in sorted(failed_logos))
+        )
+
+
 def load_and_process_logos(
     folder,
     num_cols,
@@ -83,12 +468,18 @@ def load_and_process_logos(
     max_logo_width,
     column_centers,
     row_spacing,
+    max_workers=None,
+    use_cache=True,
+    resize_first=False,
 ):
     """
-    Loads, cleans, resizes, and saves logos for slide layout.
+    Loads, cleans and resizes logos for slide layout, keeping the results in memory.
+
+    The session folder is left untouched, so logos can be regenerated with
+    different layout settings without re-fetching them.
 
     Args:
-        folder (str): Path to folder where processed logos will be saved.
+        folder (str): Path to the session folder holding the original logos.
         num_cols (int): Number of logo columns per slide.
         num_rows (int): Number of logo rows per slide.
         slide_width (Inches): Slide width in inches.
@@ -97,60 +488,163 @@ def load_and_process_logos(
         max_logo_width (int): Maximum allowed width for logos.
         column_centers (list): List of horizontal positions (inches) for logo placement.
         row_spacing (float): Vertical spacing (inches) between rows.
+        max_workers (int, optional): Number of worker processes. Defaults to the CPU
+            count; 1 processes logos serially in the current process.
+        use_cache (bool): Reuse previously processed logos from `processed_cache`.
+        resize_first (bool): As for `process_logo_batch`.
 
     Returns:
-        list of tuples: (logo path, resized width in px, resized height in px)
+        list of tuples: (logo name, PNG bytes, resized width in px, resized height in px)
     """
+    processed_logos, failed_logos = process_logo_batch(
+        folder,
+        list_logo_files(folder),
+        logo_height,
+        max_logo_width,
+        max_workers=max_workers,
+        use_cache=use_cache,
+        resize_first=resize_first,
+    )
+    report_processing_failures(failed_logos)
+    return processed_logos
 
-    # Filter only supported image file types
-    logos = [
-        f for f in os.listdir(folder) if f.lower().endswith((".png", ".jpg", ".jpeg"))
-    ]
 
-    # Remove any previous content in the folder to avoid mixing outputs
-    clear_folder(folder)
-    processed_logos = []
+def iter_processed_logos(
+    folder,
+    logo_height,
+    max_logo_width,
+    batch_size=500,
+    max_workers=None,
+    use_cache=True,
+    on_progress=None,
+    resize_first=False,
+):
+    """
+    Streams processed logos in name order, `batch_size` files at a time.
 
-    for logo in logos:
-        # Load the original logo from backup
-        logo_path = os.path.join(backup_path, logo)
-        img = Image.open(logo_path)
+    Unlike `load_and_process_logos`, only one batch of processed images is held
+    at once, so memory stays flat however many logos the folder holds.
 
-        # Step 1: Clean up the logo
-        img = remove_white_background(
-            img
-        )  # Removes white pixels (optional transparency)
-        img = auto_crop(img)  # Crops surrounding whitespace to focus on the logo
+    Args:
+        folder (str): Folder holding the original logos.
+        logo_height (int): Target logo height in pixels.
+        max_logo_width (int): Maximum allowed width for logos.
+        batch_size (int): Logos processed (and held in memory) per batch.
+        max_workers (int, optional): Number of worker processes per batch.
+        use_cache (bool): Reuse previously processed logos from `processed_cache`.
+        on_progress (callable, optional): Called as `on_progress(done, total)` after
+            each batch.
+        resize_first (bool): As for `process_logo_batch`.
+
+    Yields:
+        tuple: (logo name, PNG bytes, resized width in px, resized height in px)
+    """
+    logos = list_logo_files(folder)
+    for start in range(0, len(logos), batch_size):
+        batch = logos[start : start + batch_size]
+        processed_logos, failed_logos = process_logo_batch(
+            folder,
+            batch,
+            logo_height,
+            max_logo_width,
+            max_workers=max_workers,
+            use_cache=use_cache,
+            resize_first=resize_first,
+        )
+        report_processing_failures(failed_logos)
+        if on_progress:
+            on_progress(start + len(batch), len(logos))
+        yield from processed_logos
+
+
+def _grid_cell_centers(num_cols, num_rows, column_centers, row_spacing):
+    """
+    Computes the centre point of every grid cell, in row-major order.
 
-        # Step 2: Determine new size based on fixed height and aspect ratio
-        aspect_ratio = img.width / img.height
-        new_width = int(logo_height * aspect_ratio)
-        new_height = logo_height
+    Args:
+        num_cols (int): Number of columns of logos.
+        num_rows (int): Number of rows of logos.
+        column_centers (list): X-coordinates of column centers.
+        row_spacing (float): Vertical spacing between rows.
 
-        # Step 3: Enforce a max width to prevent overly wide logos
-        if new_width > max_logo_width:
-            new_width = max_logo_width
-            new_height = int(
-                new_width / aspect_ratio
-            )  # Recalculate height to maintain proportions
+    Returns:
+        list of tuples: (center_x, center_y) for each cell on a slide.
+    """
+    return [
+        (column_centers[col], (row + 1) * row_spacing)
+        for row in range(num_rows)
+        for col in range(num_cols)
+    ]
 
-        # Step 4: Resize the image with new dimensions
-        img = img.resize((new_width, new_height))
 
-        # Step 5: Save cleaned and resized logo to output folder
-        save_path = os.path.join(folder, logo)
-        img.save(save_path, format="PNG")
+class _DeckImages:
+    """
+    Image parts of one deck, each distinct image stored once and named from a counter.
+
+    python-pptx finds both existing images (by SHA-1) and the next free
+    `/ppt/media/imageN` name by walking every part in the package on each
+    insert, which grows quadratically with the number of logos. Keeping our own
+    SHA-1 -> image part map and numbering new parts from a counter makes each
+    insert O(1); the package is scanned once, for the first free number.
+    """
 
-        # Record the final image path and its size for layout placement
-        processed_logos.append((save_path, new_width, new_height))
+    def __init__(self, package):
+        """
+        Args:
+            package (pptx.package.Package): Package the deck's images belong to.
+        """
+        self._package = package
+        self._parts = {}
+        self._next_idx = package.next_image_partname("png").idx
+
+    def part_for(self, image_bytes):
+        """
+        Returns the image part holding `image_bytes`, adding it on first use.
+
+        Args:
+            image_bytes (bytes): Encoded image.
+
+        Returns:
+            ImagePart: Part to relate slides to.
+        """
+        sha1 = hashlib.sha1(image_bytes).hexdigest()
+        image_part = self._parts.get(sha1)
+        if image_part is None:
+            image = PptxImage.from_blob(image_bytes)
+            partname = PackURI(f"/ppt/media/image{self._next_idx}.{image.ext}")
+            self._next_idx += 1
+            image_part = ImagePart(
+                partname, image.content_type, self._package, image.blob, image.filename
+            )
+            self._parts[sha1] = image_part
+        return image_part
+
+
+def _add_logo_picture(slide, images, image_bytes, x, y, width, height):
+    """
+    Adds a picture to a slide, storing each distinct image only once in the package.
 
-    # Optional: sort logos alphabetically by filename for consistent ordering in output
-    processed_logos.sort(key=lambda x: os.path.basename(x[0]).lower())
+    Attaching a shared part relies on python-pptx's private
+    `_add_pic_from_image_part`, which is why requirements.txt pins python-pptx. If
+    a different version lacks it, the public `add_picture` is used instead: slower
+    on large decks, but the output is the same.
 
-    return processed_logos
+    Args:
+        slide (pptx.slide.Slide): Slide to add the picture to.
+        images (_DeckImages): Image parts shared across the deck.
+        image_bytes (bytes): Encoded image.
+        x, y, width, height (Length): Picture position and size.
+    """
+    if not hasattr(slide.shapes, "_add_pic_from_image_part"):
+        slide.shapes.add_picture(BytesIO(image_bytes), x, y, width, height)
+        return
+
+    image_part = images.part_for(image_bytes)
+    rId = slide.part.relate_to(image_part, RT.IMAGE)
+    slide.shapes._add_pic_from_image_part(image_part, rId, x, y, width, height)
 
 
-def create_powerpoint(
+def build_presentation(
     processed_logos,
     num_cols,
     num_rows,
@@ -160,12 +654,16 @@ def create_powerpoint(
     max_logo_width,
     column_centers,
     row_spacing,
+    paginate=False,
 ):
     """
-    Creates a PowerPoint presentation with logos arranged in a grid layout.
+    Builds a presentation with logos arranged in a grid layout.
+
+    Logos are consumed one at a time, so `processed_logos` may be a generator
+    (see `iter_processed_logos`) for decks too large to process up front.
 
     Args:
-        processed_logos (list): List of (logo_path, width_px, height_px) tuples.
+        processed_logos (iterable): (logo_name, png_bytes, width_px, height_px) tuples.
         num_cols (int): Number of columns of logos.
         num_rows (int): Number of rows of logos.
         slide_width (Inches): Width of the slide.
@@ -174,26 +672,59 @@ def create_powerpoint(
         max_logo_width (int): Maximum logo width in pixels.
         column_centers (list): X-coordinates of column centers.
         row_spacing (float): Vertical spacing between rows.
+        paginate (bool): Add as many grid slides as needed for all logos. When False,
+            only the first slide is filled and logos beyond the grid are dropped.
+
+    Returns:
+        pptx.Presentation: The populated presentation.
     """
     prs = Presentation()
-    slide = prs.slides.add_slide(prs.slide_layouts[5])  # Add blank slide
-
-    for idx, (logo_path, width_px, height_px) in enumerate(processed_logos):
-        col = idx % num_cols
-        row = idx // num_cols
 
+    # The grid is the same on every slide, so compute it once
+    cell_centers = _grid_cell_centers(num_cols, num_rows, column_centers, row_spacing)
+    per_slide = len(cell_centers)
+    if not paginate:
         # Prevent overflow beyond the grid
-        if row >= num_rows:
-            break
+        processed_logos = islice(processed_logos, per_slide)
+
+    images = _DeckImages(prs.part.package)
+    slide = None
+    for idx, (logo, image_bytes, width_px, height_px) in enumerate(processed_logos):
+        if idx % per_slide == 0:
+            slide = prs.slides.add_slide(prs.slide_layouts[5])  # Add blank slide
 
         # Convert dimensions from pixels to inches
         width_in = Inches(width_px / 96)
         height_in = Inches(height_px / 96)
 
         # Calculate placement coordinates
-        x = column_centers[col] - (width_in / 2)
-        y = (row + 1) * row_spacing - height_in / 2
+        center_x, center_y = cell_centers[idx % per_slide]
+        x = center_x - (width_in / 2)
+        y = center_y - height_in / 2
+
+        with trace_span(os.path.splitext(logo)[0], "slide_insert") as span:
+            span.bytes = len(image_bytes)
+            _add_logo_picture(
+                slide, images, image_bytes, x, y, width_in, height_in
+            )
 
-        slide.shapes.add_picture(logo_path, x, y, width=width_in, height=height_in)
+    if slide is None:
+        prs.slides.add_slide(prs.slide_layouts[5])  # Keep an empty deck valid
 
-    prs.save(output_file)
+    return prs
+
+
+def create_powerpoint(processed_logos, *args, **kwargs):
+    """
+    Creates a PowerPoint presentation with logos arranged in a grid layout.
+
+    The deck is built entirely in memory; nothing is written to disk. Takes the
+    same arguments as `build_presentation`.
+
+    Returns:
+        bytes: The .pptx file contents.
+    """
+    prs = build_presentation(processed_logos, *args, **kwargs)
+    output = BytesIO()
+    prs.save(output)
+    return output.getvalue()
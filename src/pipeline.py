@@ -0,0 +1,180 @@
+import contextvars
+import queue
+import threading
+
+from src.backup_index import get_backup_index, session_file_name
+from src.output import process_logo_stream
+
+# Fetched logos waiting for a processing worker before new fetches are held back
+DEFAULT_QUEUE_SIZE = 32
+
+# Marks the end of the fetched-logo queue
+_END = object()
+
+
+def fetch_and_process_logos(
+    company_list,
+    backup_path,
+    session_cache_path,
+    logo_height,
+    max_logo_width,
+    engine="async",
+    search_concurrency=8,
+    concurrency=None,
+    per_host_limit=None,
+    max_workers=None,
+    queue_size=DEFAULT_QUEUE_SIZE,
+    use_cache=True,
+    on_progress=None,
+    resize_first=False,
+):
+    """
+    Fetches logos and cleans, crops and resizes each one as soon as it lands.
+
+    Downloads run on the calling thread (so progress callbacks can update the UI)
+    while a processing thread feeds finished logos to worker processes. The two
+    stages are joined by a queue: once `queue_size` fetched logos are waiting for
+    processing, no further company is started until it catches up (the async
+    engine waits for that off its event loop, so downloads in flight carry on;
+    the threads engine reports each download as it completes and submits only
+    a bounded window ahead of them), and at most `2 * max_workers` logos are
+    being processed at once. The CPU works during network waits instead of
+    after them, and the result is ready-to-place images.
+
+    Args:
+        company_list (iterable[str]): Company names to fetch.
+        backup_path (str): Directory for persistent logo storage.
+        session_cache_path (str): Directory for session-specific logo use.
+        logo_height (int): Target logo height in pixels.
+        max_logo_width (int): Maximum allowed width for logos.
+        engine (str): "async" for the pooled asyncio fetcher, "threads" for the
+            thread-pool fetcher.
+        search_concurrency (int): Concurrent web searches (threads for "threads").
+        concurrency (int, optional): Companies in flight at once (async engine).
+            Defaults to `fetch_async.DEFAULT_CONCURRENCY`.
+        per_host_limit (int, optional): Concurrent requests per host (async
+            engine). Defaults to `fetch_async.DEFAULT_PER_HOST_LIMIT`.
+        max_workers (int, optional): Image processing processes. Defaults to the
+            CPU count.
+        queue_size (int): Fetched logos buffered ahead of processing.
+        use_cache (bool): Reuse previously processed logos from `processed_cache`.
+        on_progress (callable, optional): Called as `on_progress(done, total, company)`
+            after each company is fetched.
+        resize_first (bool): Clean and crop at close to the final size, trading
+            exact crops for speed (see `reformat.process_logo_file`).
+
+    Returns:
+        tuple: (processed logos sorted by name as (logo name, PNG bytes, width px,
+        height px) tuples, dict of company -> fetch failure cause, list of logo
+        names that could not be processed)
+    """
+    backup_index = get_backup_index(backup_path)
+    fetched = queue.Queue()  # Never blocks the fetch side; the gate below bounds it
+    queued = set()
+    result = {}
+    backlog = threading.Condition()
+    waiting = 0  # Fetched logos not yet taken by processing
+    stopped = False  # Processing has ended, so the gate must not wait for it
+
+    def drain():
+        # Yields logo file names from the queue until the end marker arrives
+        nonlocal waiting
+        while True:
+            logo = fetched.get()
+            if logo is _END:
+                return
+            with backlog:
+                waiting -= 1
+                backlog.notify_all()
+            yield logo
+
+    def admit(companies):
+        # Hands out the next company only while processing keeps up. The async
+        # engine pulls iterators in a worker thread (see `_iterate_companies`), so
+        # waiting here stalls no download in flight; the threads engine calls
+        # `on_fetched` between submissions, so `waiting` is current here.
+        for company in companies:
+            with backlog:
+                backlog.wait_for(lambda: waiting < queue_size or stopped)
+            yield company
+
+    def process():
+        nonlocal stopped
+        try:
+            result["processed"] = process_logo_stream(
+                session_cache_path,
+                drain(),
+                logo_height,
+                max_logo_width,
+                max_workers=max_workers,
+                use_cache=use_cache,
+                resize_first=resize_first,
+            )
+        except BaseException as e:
+            result["error"] = e
+        finally:
+            with backlog:
+                stopped = True  # Let the fetch side finish instead of waiting
+                backlog.notify_all()
+
+    def on_fetched(done, total, company):
+        # Both a fresh download and a backup hit leave the logo indexed under the
+        # company; failed companies have no entry and are skipped
+        nonlocal waiting
+        entry = backup_index.lookup(company)
+        if entry is not None:
+            logo = session_file_name(company, entry)
+            if logo not in queued:
+                queued.add(logo)
+                with backlog:
+                    waiting += 1
+                fetched.put(logo)
+        if on_progress:
+            on_progress(done, total, company)
+
+    # The processing thread records stage timings into the caller's tracer
+    worker = threading.Thread(
+        target=contextvars.copy_context().run,
+        args=(process,),
+        name="logo-processing",
+        daemon=True,
+    )
+    worker.start()
+
+    try:
+        if engine == "async":
+            from src.fetch_async import (
+                DEFAULT_CONCURRENCY,
+                DEFAULT_PER_HOST_LIMIT,
+                pull_logos_async,
+            )
+
+            failed_fetches = pull_logos_async(
+                admit(company_list),
+                backup_path,
+                session_cache_path,
+                concurrency=DEFAULT_CONCURRENCY if concurrency is None else concurrency,
+                per_host_limit=(
+                    DEFAULT_PER_HOST_LIMIT if per_host_limit is None else per_host_limit
+                ),
+                search_concurrency=search_concurrency,
+                on_progress=on_fetched,
+            )
+        else:
+            from src.logos import pull_logos_threaded
+
+            failed_fetches = pull_logos_threaded(
+                admit(company_list),
+                backup_path,
+                session_cache_path,
+                max_workers=search_concurrency,
+                on_progress=on_fetched,
+            )
+    finally:
+        fetched.put(_END)
+        worker.join()
+
+    if "error" in result:
+        raise result["error"]
+    processed_logos, failed_processing = result["processed"]
+    return processed_logos, failed_fetches, failed_processing
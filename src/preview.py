@@ -0,0 +1,135 @@
+import os
+from io import BytesIO
+
+from PIL import Image, ImageDraw
+
+from src.processed_cache import ProcessedLogoCache
+
+# Largest thumbnail edge lengths in pixels (width, height)
+THUMBNAIL_SIZE = (160, 80)
+
+# Contact-sheet cell padding and caption strip height, in pixels
+SHEET_PADDING = 12
+CAPTION_HEIGHT = 16
+
+# Thumbnails are tiny, so a small budget holds tens of thousands of them
+thumbnail_cache = ProcessedLogoCache(
+    os.path.join("logo_cache", "_thumbnails"), max_bytes=64 * 1024 * 1024
+)
+
+
+def make_thumbnail(source_path, size=THUMBNAIL_SIZE):
+    """
+    Shrinks a logo to fit within `size`, keeping its aspect ratio.
+
+    Args:
+        source_path (str): Path of the original logo.
+        size (tuple): (max width, max height) in pixels.
+
+    Returns:
+        bytes: PNG-encoded thumbnail.
+    """
+    with Image.open(source_path) as img:
+        img.draft("RGB", size)  # Lets JPEG decoding skip straight to a smaller scale
+        thumb = img.convert("RGBA")
+    thumb.thumbnail(size)
+
+    buffer = BytesIO()
+    thumb.save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def get_thumbnail(source_path, size=THUMBNAIL_SIZE):
+    """
+    Returns a logo's thumbnail, generating it only once per source content and size.
+
+    Args:
+        source_path (str): Path of the original logo.
+        size (tuple): (max width, max height) in pixels.
+
+    Returns:
+        bytes: PNG-encoded thumbnail.
+    """
+    key = thumbnail_cache.key(source_path, thumbnail=list(size))
+    data = thumbnail_cache.get(key)
+    if data is None:
+        data = make_thumbnail(source_path, size)
+        thumbnail_cache.put(key, data)
+    return data
+
+
+def caption_for(logo_file):
+    """
+    Turns a logo file name into a display caption (e.g. 'acme corp.png' -> 'Acme Corp').
+    """
+    return os.path.splitext(logo_file)[0].title()
+
+
+def page_of(items, page, per_page):
+    """
+    Returns one page of `items` and the page count.
+
+    Args:
+        items (list): Items to page through.
+        page (int): 1-based page number, clamped to the valid range.
+        per_page (int): Items per page.
+
+    Returns:
+        tuple: (items on the page, total number of pages)
+    """
+    pages = max(1, -(-len(items) // per_page))
+    page = min(max(page, 1), pages)
+    start = (page - 1) * per_page
+    return items[start : start + per_page], pages
+
+
+def contact_sheet(folder, logo_files, cols, size=THUMBNAIL_SIZE):
+    """
+    Composites thumbnails of the given logos into a single captioned grid image.
+
+    Args:
+        folder (str): Folder holding the original logos.
+        logo_files (list[str]): File names within `folder`, in display order.
+        cols (int): Thumbnails per row.
+        size (tuple): (max width, max height) of each thumbnail in pixels.
+
+    Returns:
+        bytes: PNG-encoded contact sheet.
+    """
+    cell_width = size[0] + 2 * SHEET_PADDING
+    cell_height = size[1] + CAPTION_HEIGHT + 2 * SHEET_PADDING
+    rows = max(1, -(-len(logo_files) // cols))
+
+    sheet = Image.new("RGB", (cols * cell_width, rows * cell_height), "white")
+    draw = ImageDraw.Draw(sheet)
+    for idx, logo_file in enumerate(logo_files):
+        left = (idx % cols) * cell_width
+        top = (idx // cols) * cell_height
+        try:
+            data = get_thumbnail(os.path.join(folder, logo_file), size)
+            with Image.open(BytesIO(data)) as thumb:
+                thumb.load()
+                # Centre the thumbnail in its cell, above the caption
+                x = left + (cell_width - thumb.width) // 2
+                y = top + SHEET_PADDING + (size[1] - thumb.height) // 2
+                sheet.paste(thumb, (x, y), thumb)
+        except OSError:
+            pass  # Unreadable logo: leave the cell blank but keep its caption
+
+        caption = caption_for(logo_file)
+        text_width = draw.textlength(caption)
+        if text_width > cell_width - 4:
+            # Trim long names to the cell
+            while caption and draw.textlength(caption + "...") > cell_width - 4:
+                caption = caption[:-1]
+            caption += "..."
+            text_width = draw.textlength(caption)
+        draw.text(
+            (left + (cell_width - text_width) / 2, top + SHEET_PADDING + size[1] + 2),
+            caption,
+            fill=(80, 80, 80),
+        )
+
+    buffer = BytesIO()
+    sheet.save(buffer, format="PNG", optimize=True)
+    return buffer.getvalue()
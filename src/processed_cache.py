@@ -0,0 +1,219 @@
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+
+from src.reformat import WHITE_THRESHOLD
+
+# Bump when the clean/crop/resize pipeline changes so stale entries are never reused
+PROCESSING_VERSION = 2
+
+# Default on-disk budget for processed logos
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+# Eviction trims down to this fraction of the budget so it doesn't run on every put
+EVICTION_LOW_WATER = 0.9
+
+# Source files whose content hash is memoized, least recently used dropped first
+SOURCE_HASH_MEMO_SIZE = 4096
+
+
+class ProcessedLogoCache:
+    """
+    Persistent, content-addressed cache of cleaned and resized logos.
+
+    Entries are keyed by the SHA-256 of the source image plus every parameter that
+    affects the processed pixels, so a cached PNG is only reused when it would be
+    byte-for-byte what the pipeline produces. The cache is bounded by total size and
+    evicts least-recently-used entries (tracked through file modification times, so
+    recency survives restarts).
+    """
+
+    def __init__(self, cache_dir, max_bytes=DEFAULT_MAX_BYTES):
+        """
+        Args:
+            cache_dir (str): Directory holding the cached PNG files.
+            max_bytes (int): Maximum total size of cached files before eviction.
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        # path -> (size, mtime, sha256 of file contents), in LRU order
+        self._source_hashes = OrderedDict()
+        self._total_bytes = None  # Computed lazily from the directory contents
+
+    # ---------------------- #
+    #        Keys            #
+    # ---------------------- #
+
+    def _hash_source(self, source_path):
+        """
+        Returns the SHA-256 of a source file, memoized on its path, size and mtime.
+
+        One memo entry is kept per path, and only for the `SOURCE_HASH_MEMO_SIZE`
+        most recently hashed paths, so session folders that come and go on a
+        long-running server don't grow it without bound.
+
+        Args:
+            source_path (str): Path of the original logo.
+
+        Returns:
+            str: Hex digest of the file contents.
+        """
+        stat = os.stat(source_path)
+        with self._lock:
+            memo = self._source_hashes.get(source_path)
+            if memo is not None and memo[:2] == (stat.st_size, stat.st_mtime_ns):
+                self._source_hashes.move_to_end(source_path)
+                return memo[2]
+
+        with open(source_path, "rb") as f:
+            digest = hashlib.sha256(f.read()).hexdigest()
+        with self._lock:
+            self._source_hashes[source_path] = (stat.st_size, stat.st_mtime_ns, digest)
+            self._source_hashes.move_to_end(source_path)
+            while len(self._source_hashes) > SOURCE_HASH_MEMO_SIZE:
+                self._source_hashes.popitem(last=False)
+        return digest
+
+    def key(self, source_path, **params):
+        """
+        Builds the cache key for a source file and its processing parameters.
+
+        Args:
+            source_path (str): Path of the original logo.
+            **params: Processing parameters (e.g. logo_height, max_logo_width).
+
+        Returns:
+            str: Hex digest identifying the processed output.
+        """
+        material = {
+            "source": self._hash_source(source_path),
+            "white_threshold": WHITE_THRESHOLD,
+            "version": PROCESSING_VERSION,
+            **params,
+        }
+        encoded = json.dumps(material, sort_keys=True).encode("utf-8")
+        return hashlib.sha256(encoded).hexdigest()
+
+    def _entry_path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.png")
+
+    # ---------------------- #
+    #     Get / Put          #
+    # ---------------------- #
+
+    def get(self, key):
+        """
+        Returns a cached processed logo if present.
+
+        Args:
+            key (str): Cache key from `key()`.
+
+        Returns:
+            bytes or None: PNG bytes on a cache hit, None on a miss.
+        """
+        entry = self._entry_path(key)
+        try:
+            with open(entry, "rb") as f:
+                data = f.read()
+            os.utime(entry)  # Mark as recently used
+        except FileNotFoundError:
+            with self._lock:
+                self.misses += 1
+            return None
+
+        with self._lock:
+            self.hits += 1
+        return data
+
+    def put(self, key, data):
+        """
+        Stores a processed logo in the cache and evicts old entries if over budget.
+
+        Args:
+            key (str): Cache key from `key()`.
+            data (bytes): Processed PNG bytes.
+        """
+        os.makedirs(self.cache_dir, exist_ok=True)
+        entry = self._entry_path(key)
+        tmp_path = f"{entry}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, entry)  # Atomic, so readers never see partial files
+
+        with self._lock:
+            self._ensure_total()
+            self._total_bytes += len(data)
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+
+    # ---------------------- #
+    #      Eviction          #
+    # ---------------------- #
+
+    def _entries(self):
+        """
+        Lists cached files with their size and last-use time.
+
+        Returns:
+            list of tuples: (path, size_bytes, mtime) for every cached PNG.
+        """
+        if not os.path.isdir(self.cache_dir):
+            return []
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith(".png"):
+                continue
+            path = os.path.join(self.cache_dir, name)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            entries.append((path, stat.st_size, stat.st_mtime))
+        return entries
+
+    def _ensure_total(self):
+        if self._total_bytes is None:
+            self._total_bytes = sum(size for _, size, _ in self._entries())
+
+    def _evict(self):
+        """
+        Removes least-recently-used entries until the cache is back under its
+        low-water mark. Must be called with the lock held.
+        """
+        target = self.max_bytes * EVICTION_LOW_WATER
+        entries = sorted(self._entries(), key=lambda e: e[2])
+        self._total_bytes = sum(size for _, size, _ in entries)
+        for path, size, _ in entries:
+            if self._total_bytes <= target:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            self._total_bytes -= size
+            self.evictions += 1
+
+    def stats(self):
+        """
+        Returns cache counters for display or monitoring.
+
+        Returns:
+            dict: hits, misses, hit_rate, evictions, entries and total bytes.
+        """
+        with self._lock:
+            entries = self._entries()
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "entries": len(entries),
+                "bytes": sum(size for _, size, _ in entries),
+            }
@@ -0,0 +1,289 @@
+import asyncio
+import contextvars
+import threading
+import time
+from collections import Counter, OrderedDict, deque
+from contextlib import contextmanager
+
+# Sustainable request rate (per second), burst size and concurrency budget per
+# upstream, shared by every session in the process
+DEFAULT_LIMITS = {
+    "search": {"rate": 2.0, "burst": 4, "max_concurrency": 8},
+    "brandfetch": {"rate": 25.0, "burst": 50, "max_concurrency": 32},
+}
+
+# Recent waits kept per limiter for the latency percentiles in `metrics()`
+WAIT_SAMPLES = 1000
+
+# Session whose requests are being made; set with `rate_session`
+_current_session = contextvars.ContextVar("logobot_rate_session", default="default")
+
+# Sessions currently running a fetch, counted per session id
+_active_sessions = Counter()
+_active_lock = threading.Lock()
+
+
+@contextmanager
+def rate_session(session_id):
+    """
+    Attributes requests made inside the block to a session and counts it as active.
+
+    Worker threads started with `contextvars.copy_context()` and asyncio tasks
+    inherit the session, so fair queuing follows the work wherever it runs.
+
+    Args:
+        session_id (str): Identifies the user session (or CLI run).
+    """
+    token = _current_session.set(session_id)
+    with _active_lock:
+        _active_sessions[session_id] += 1
+    try:
+        yield
+    finally:
+        with _active_lock:
+            _active_sessions[session_id] -= 1
+            if _active_sessions[session_id] <= 0:
+                del _active_sessions[session_id]
+        _current_session.reset(token)
+
+
+def active_session_count():
+    with _active_lock:
+        return len(_active_sessions)
+
+
+class _Waiter:
+    __slots__ = ("session", "enqueued_at", "granted", "notify")
+
+    def __init__(self, session, notify=None):
+        self.session = session
+        self.enqueued_at = time.monotonic()
+        self.granted = False
+        self.notify = notify  # Wakes an async waiter on its own loop
+
+
+class FairRateLimiter:
+    """
+    Token bucket for one upstream, handing out tokens round-robin across sessions.
+
+    Tokens accrue at `rate` per second up to `burst`. Callers queue per session,
+    and each free token goes to the next session in turn, so one session's large
+    batch cannot starve another's few requests while total throughput stays at the
+    upstream's sustainable rate. `max_concurrency` is the upstream's worker budget,
+    split evenly between active sessions by `share()`.
+    """
+
+    def __init__(self, name, rate, burst, max_concurrency):
+        """
+        Args:
+            name (str): Upstream name, for metrics.
+            rate (float): Tokens added per second.
+            burst (int): Bucket capacity, i.e. requests allowed back to back.
+            max_concurrency (int): Workers the upstream may keep busy in total.
+        """
+        self.name = name
+        self.rate = rate
+        self.burst = burst
+        self.max_concurrency = max_concurrency
+        self.granted = 0
+        self.total_wait = 0.0
+        self._waits = deque(maxlen=WAIT_SAMPLES)
+        self._cond = threading.Condition()
+        self._tokens = float(burst)
+        self._refilled_at = time.monotonic()
+        self._queues = OrderedDict()  # session -> deque of waiters, in turn order
+
+    # ---------------------- #
+    #     Token Handout      #
+    # ---------------------- #
+
+    def _refill(self, now):
+        self._tokens = min(
+            self.burst, self._tokens + (now - self._refilled_at) * self.rate
+        )
+        self._refilled_at = now
+
+    def _dispatch(self):
+        """
+        Grants available tokens to queued waiters, one session at a time.
+        Must be called with the condition held.
+
+        Returns:
+            float: Seconds until the next token, or 0 if none is awaited.
+        """
+        now = time.monotonic()
+        self._refill(now)
+        granted_any = False
+        while self._queues and self._tokens >= 1:
+            session, queue = next(iter(self._queues.items()))
+            waiter = queue.popleft()
+            if queue:
+                self._queues.move_to_end(session)  # Next session's turn
+            else:
+                del self._queues[session]
+
+            self._tokens -= 1
+            waiter.granted = True
+            wait = now - waiter.enqueued_at
+            self.granted += 1
+            self.total_wait += wait
+            self._waits.append(wait)
+            if waiter.notify:
+                waiter.notify()
+            granted_any = True
+
+        if granted_any:
+            self._cond.notify_all()
+        if not self._queues:
+            return 0.0
+        return (1 - self._tokens) / self.rate
+
+    def _enqueue(self, notify=None):
+        waiter = _Waiter(_current_session.get(), notify)
+        self._queues.setdefault(waiter.session, deque()).append(waiter)
+        return waiter
+
+    def acquire(self):
+        """
+        Blocks until the current session's turn comes up and a token is available.
+        """
+        with self._cond:
+            waiter = self._enqueue()
+            while True:
+                delay = self._dispatch()
+                if waiter.granted:
+                    return
+                self._cond.wait(delay)
+
+    async def acquire_async(self):
+        """
+        Awaits the current session's turn and a token without blocking the loop.
+        """
+        loop = asyncio.get_running_loop()
+        granted = loop.create_future()
+
+        def notify():
+            loop.call_soon_threadsafe(
+                lambda: granted.done() or granted.set_result(None)
+            )
+
+        with self._cond:
+            waiter = self._enqueue(notify)
+        while True:
+            with self._cond:
+                delay = self._dispatch()
+                if waiter.granted:
+                    return
+            try:
+                # Woken early if another caller's dispatch grants our token
+                await asyncio.wait_for(asyncio.shield(granted), delay)
+                return
+            except asyncio.TimeoutError:
+                continue
+            except asyncio.CancelledError:
+                with self._cond:
+                    if not waiter.granted:
+                        self._remove(waiter)
+                raise
+
+    def _remove(self, waiter):
+        queue = self._queues.get(waiter.session)
+        if queue and waiter in queue:
+            queue.remove(waiter)
+            if not queue:
+                del self._queues[waiter.session]
+
+    # ---------------------- #
+    #   Shares and Metrics   #
+    # ---------------------- #
+
+    def share(self):
+        """
+        Returns this session's share of the upstream's concurrency budget.
+
+        Returns:
+            int: `max_concurrency` divided by the number of active sessions, at least 1.
+        """
+        return max(1, self.max_concurrency // max(1, active_session_count()))
+
+    def metrics(self):
+        """
+        Returns queue depth and wait-time metrics for display or monitoring.
+
+        Returns:
+            dict: queue_depth (requests waiting), waiting_sessions, granted,
+            total_wait_s, wait_p50_s / wait_p95_s / wait_max_s over recent
+            requests, and the configured rate and burst.
+        """
+        with self._cond:
+            waits = sorted(self._waits)
+            depth = sum(len(queue) for queue in self._queues.values())
+
+            def pct(p):
+                if not waits:
+                    return 0.0
+                return waits[min(len(waits) - 1, int(p * len(waits)))]
+
+            return {
+                "upstream": self.name,
+                "queue_depth": depth,
+                "waiting_sessions": len(self._queues),
+                "granted": self.granted,
+                "total_wait_s": self.total_wait,
+                "wait_p50_s": pct(0.5),
+                "wait_p95_s": pct(0.95),
+                "wait_max_s": waits[-1] if waits else 0.0,
+                "rate": self.rate,
+                "burst": self.burst,
+            }
+
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(upstream):
+    """
+    Returns the process-wide limiter for an upstream, created from `DEFAULT_LIMITS`.
+
+    Args:
+        upstream (str): Upstream name, e.g. "search" or "brandfetch".
+
+    Returns:
+        FairRateLimiter: Shared limiter instance.
+    """
+    with _limiters_lock:
+        if upstream not in _limiters:
+            limits = DEFAULT_LIMITS[upstream]
+            _limiters[upstream] = FairRateLimiter(upstream, **limits)
+        return _limiters[upstream]
+
+
+def configure_rate_limiter(upstream, rate, burst, max_concurrency):
+    """
+    Replaces an upstream's limits, e.g. from CLI flags or for benchmarks.
+
+    Args:
+        upstream (str): Upstream name.
+        rate (float): Tokens added per second.
+        burst (int): Bucket capacity.
+        max_concurrency (int): Workers the upstream may keep busy in total.
+
+    Returns:
+        FairRateLimiter: The new shared limiter.
+    """
+    with _limiters_lock:
+        _limiters[upstream] = FairRateLimiter(upstream, rate, burst, max_concurrency)
+        return _limiters[upstream]
+
+
+def rate_limit_metrics():
+    """
+    Returns `metrics()` for every limiter created so far.
+
+    Returns:
+        list[dict]: One metrics dict per upstream.
+    """
+    with _limiters_lock:
+        limiters = list(_limiters.values())
+    return [limiter.metrics() for limiter in limiters]
@@ -1,6 +1,52 @@
+import io
+import os
+import time
+
+import numpy as np
+from PIL import Image
+
 # Threshold above which a pixel is considered "white"
 WHITE_THRESHOLD = 230
 
+# The resize-first path cleans logos at this multiple of their final size; the
+# final resize downsamples from there, so edges stay smooth
+OVERSAMPLE = 2
+
+# Largest image (in decoded pixels) the resize-first path will hold in memory.
+# JPEGs are decoded straight at a reduced scale, so only their reduced size counts.
+MAX_SOURCE_PIXELS = 50_000_000
+
+
+def _white_mask(pixels):
+    """
+    Builds a boolean mask of near-white pixels from an RGBA pixel array.
+
+    Args:
+        pixels (np.ndarray): Array of shape (height, width, 4) with dtype uint8.
+
+    Returns:
+        np.ndarray: Boolean array of shape (height, width), True where all RGB channels exceed the threshold.
+    """
+    return (pixels[..., :3] > WHITE_THRESHOLD).all(axis=-1)
+
+
+def _bbox_from_alpha(alpha):
+    """
+    Finds the bounding box of non-transparent pixels, matching `Image.getbbox`.
+
+    Args:
+        alpha (np.ndarray): Alpha channel array of shape (height, width).
+
+    Returns:
+        tuple or None: (left, upper, right, lower) box, or None if every pixel is transparent.
+    """
+    opaque = alpha != 0
+    cols = np.flatnonzero(opaque.any(axis=0))
+    if cols.size == 0:
+        return None
+    rows = np.flatnonzero(opaque.any(axis=1))
+    return (int(cols[0]), int(rows[0]), int(cols[-1]) + 1, int(rows[-1]) + 1)
+
 
 def remove_white_background(image):
     """
@@ -12,23 +58,12 @@ def remove_white_background(image):
     Returns:
         PIL.Image: The image with white or near-white pixels made transparent.
     """
-    image = image.convert("RGBA")  # Convert image to include alpha channel
-    data = image.getdata()  # Get pixel data as a list of RGBA tuples
+    pixels = np.array(image.convert("RGBA"))  # Copy pixel data into an (H, W, 4) array
 
-    new_data = []
-    for item in data:
-        # Identify pixels that are close to white across all RGB channels
-        if (
-            item[0] > WHITE_THRESHOLD
-            and item[1] > WHITE_THRESHOLD
-            and item[2] > WHITE_THRESHOLD
-        ):
-            new_data.append((255, 255, 255, 0))  # Set to transparent
-        else:
-            new_data.append(item)  # Retain original pixel
+    # Identify pixels that are close to white across all RGB channels and make them transparent
+    pixels[_white_mask(pixels)] = (255, 255, 255, 0)
 
-    image.putdata(new_data)  # Update image with new pixel data
-    return image
+    return Image.fromarray(pixels, "RGBA")
 
 
 def auto_crop(image):
@@ -45,3 +80,232 @@ def auto_crop(image):
     if bbox:
         return image.crop(bbox)  # Crop to bounding box if found
     return image  # Return original if no non-transparent content found
+
+
+def _clean_and_find_box(image):
+    """
+    Removes the white background and crops transparent borders, returning the box too.
+
+    Returns:
+        tuple: (cleaned and cropped RGBA image, crop box in `image` coordinates or
+        None if every pixel is transparent)
+    """
+    pixels = np.array(image.convert("RGBA"))
+    pixels[_white_mask(pixels)] = (255, 255, 255, 0)
+
+    bbox = _bbox_from_alpha(pixels[..., 3])
+    if bbox:
+        left, upper, right, lower = bbox
+        pixels = pixels[upper:lower, left:right]
+
+    return Image.fromarray(np.ascontiguousarray(pixels), "RGBA"), bbox
+
+
+def clean_and_crop(image):
+    """
+    Removes the white background and crops transparent borders in a single array pass.
+
+    Equivalent to `auto_crop(remove_white_background(image))`, but the alpha mask and
+    crop box are derived from the same pixel array instead of re-scanning the image.
+
+    Args:
+        image (PIL.Image): An input image in any mode (converted to RGBA).
+
+    Returns:
+        PIL.Image: Cleaned RGBA image cropped to its visible content.
+    """
+    return _clean_and_find_box(image)[0]
+
+
+def fit_to_box(image, logo_height, max_logo_width):
+    """
+    Resizes an image to a fixed height, capping the width while keeping the aspect ratio.
+
+    Args:
+        image (PIL.Image): Cleaned and cropped logo.
+        logo_height (int): Target logo height in pixels.
+        max_logo_width (int): Maximum allowed width in pixels.
+
+    Returns:
+        PIL.Image: Resized image.
+    """
+    # Determine new size based on fixed height and aspect ratio
+    aspect_ratio = image.width / image.height
+    new_width = int(logo_height * aspect_ratio)
+    new_height = logo_height
+
+    # Enforce a max width to prevent overly wide logos
+    if new_width > max_logo_width:
+        new_width = max_logo_width
+        new_height = int(new_width / aspect_ratio)  # Keep proportions
+
+    return image.resize((new_width, new_height))
+
+
+def reduction_factor(size, logo_height, max_logo_width):
+    """
+    Returns how many times an image can be shrunk while staying `OVERSAMPLE` times
+    larger than its final size.
+
+    Args:
+        size (tuple): (width, height) of the content in pixels.
+        logo_height (int): Target logo height in pixels.
+        max_logo_width (int): Maximum allowed width in pixels.
+
+    Returns:
+        int: Integer reduction factor, at least 1.
+    """
+    width, height = size
+    # Largest of the two downscales `fit_to_box` may apply, i.e. the sharper one
+    scale = max(height / logo_height, width / max_logo_width)
+    return max(1, int(scale / OVERSAMPLE))
+
+
+def _decode(source_path, factor):
+    """
+    Decodes an image, letting JPEGs decode straight at a reduced scale.
+
+    Args:
+        source_path (str): Path of the image.
+        factor (int): Reduction the caller will apply; JPEG decoding skips up to
+            this much detail (by 1/2, 1/4 or 1/8) instead of decoding it all.
+
+    Returns:
+        tuple: (RGB or RGBA image, reduction already applied by the decoder)
+
+    Raises:
+        PIL.Image.DecompressionBombError: If the decoded image would exceed
+            `MAX_SOURCE_PIXELS`.
+    """
+    with Image.open(source_path) as img:
+        full_width = img.width
+        if factor > 1 and img.format == "JPEG":
+            img.draft("RGB", (img.width // factor, img.height // factor))
+        if img.width * img.height > MAX_SOURCE_PIXELS:
+            raise Image.DecompressionBombError(
+                f"{source_path} is {img.width}x{img.height} pixels, over the "
+                f"{MAX_SOURCE_PIXELS} pixel limit"
+            )
+        img.load()
+        decoded_by = max(1, round(full_width / img.width))
+        if img.mode not in ("RGB", "RGBA"):
+            return img.convert("RGBA"), decoded_by
+        return img.copy(), decoded_by
+
+
+def load_reduced(source_path, logo_height, max_logo_width, timings=None):
+    """
+    Decodes, cleans and crops a logo at close to its final resolution.
+
+    The image is first reduced to `OVERSAMPLE` times the size it would have if its
+    content filled it, and cleaned there. When the content turns out to be a
+    small part of the image, the crop box found on the reduced image is mapped
+    back and only that region is reduced again, less, so the final logo keeps
+    the same detail as cleaning at full resolution would give it.
+
+    Args:
+        source_path (str): Path of the original logo.
+        logo_height (int): Target logo height in pixels.
+        max_logo_width (int): Maximum allowed width in pixels.
+        timings (dict, optional): If given, filled with the seconds spent in
+            "decode" (decoding and reducing) and "clean_crop", summed over both
+            passes.
+
+    Returns:
+        PIL.Image: Cleaned RGBA image cropped to its visible content, ready for
+        `fit_to_box`.
+    """
+    last = time.perf_counter()
+
+    def lap(stage):
+        # Adds the time since the previous lap to `stage`
+        nonlocal last
+        now = time.perf_counter()
+        if timings is not None:
+            timings[stage] = timings.get(stage, 0.0) + now - last
+        last = now
+
+    with Image.open(source_path) as img:
+        size = img.size
+    factor = reduction_factor(size, logo_height, max_logo_width)
+    img, decoded_by = _decode(source_path, factor)
+    applied = decoded_by * max(1, factor // decoded_by)
+    reduced = img.reduce(applied // decoded_by)
+    lap("decode")
+    cleaned, bbox = _clean_and_find_box(reduced)
+    lap("clean_crop")
+    if bbox is None:
+        return cleaned
+
+    content = ((bbox[2] - bbox[0]) * applied, (bbox[3] - bbox[1]) * applied)
+    content_factor = reduction_factor(content, logo_height, max_logo_width)
+    if content_factor >= applied:
+        return cleaned
+
+    # The content needs more detail than the reduced image kept
+    if decoded_by > content_factor:
+        img, decoded_by = _decode(source_path, content_factor)
+    # Map the box back, with one reduced pixel of margin for edges lost to averaging
+    scale = applied // decoded_by
+    box = (
+        max(0, (bbox[0] - 1) * scale),
+        max(0, (bbox[1] - 1) * scale),
+        min(img.width, (bbox[2] + 1) * scale),
+        min(img.height, (bbox[3] + 1) * scale),
+    )
+    region_factor = max(1, content_factor // decoded_by)
+    reduced = img.reduce(region_factor, box)
+    lap("decode")
+    cleaned = clean_and_crop(reduced)
+    lap("clean_crop")
+    return cleaned
+
+
+def process_logo_file(
+    source_path, logo_height, max_logo_width, timings=None, resize_first=False
+):
+    """
+    Opens, cleans, crops and resizes a single logo and encodes it as PNG.
+
+    Kept at module level (and free of Streamlit imports) so it can run in worker processes.
+
+    Args:
+        source_path (str): Path of the original logo.
+        logo_height (int): Target logo height in pixels.
+        max_logo_width (int): Maximum allowed width in pixels.
+        timings (dict, optional): If given, filled with stage -> (seconds, bytes) for
+            "decode", "clean_crop", "resize" and "encode".
+        resize_first (bool): Clean and crop at close to the final size (see
+            `load_reduced`) instead of at full resolution. Much faster on large
+            sources, but a noisy near-white background averages out when
+            reduced, so the crop and output size can differ; off by default.
+
+    Returns:
+        tuple: (png_bytes, width_px, height_px) of the processed logo.
+    """
+    start = time.perf_counter()
+    if resize_first:
+        stages = {}
+        img = load_reduced(source_path, logo_height, max_logo_width, stages)
+        cleaned = time.perf_counter()
+        decode_seconds, clean_seconds = stages["decode"], stages["clean_crop"]
+    else:
+        with Image.open(source_path) as img:
+            img.load()
+            decoded = time.perf_counter()
+            img = clean_and_crop(img)
+        cleaned = time.perf_counter()
+        decode_seconds, clean_seconds = decoded - start, cleaned - decoded
+    img = fit_to_box(img, logo_height, max_logo_width)
+    resized = time.perf_counter()
+
+    buffer = io.BytesIO()
+    img.save(buffer, format="PNG")
+    data = buffer.getvalue()
+
+    if timings is not None:
+        timings["decode"] = (decode_seconds, os.path.getsize(source_path))
+        timings["clean_crop"] = (clean_seconds, 0)
+        timings["resize"] = (resized - cleaned, 0)
+        timings["encode"] = (time.perf_counter() - resized, len(data))
+    return data, img.width, img.height
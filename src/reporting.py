@@ -0,0 +1,178 @@
+import sys
+import threading
+import time
+
+
+class Reporter:
+    """
+    Where pipeline code sends user-facing messages and progress.
+
+    The base class prints nothing. Use `StreamlitReporter` in the app and
+    `ConsoleReporter` for headless runs, so modules under `src/` never need to
+    import Streamlit themselves.
+    """
+
+    def write(self, message):
+        pass
+
+    def success(self, message):
+        pass
+
+    def caption(self, message):
+        pass
+
+    def error(self, message):
+        pass
+
+    def progress(self, text):
+        """
+        Starts a progress indicator.
+
+        Args:
+            text (str): Initial label.
+
+        Returns:
+            object: Handle with `update(done, total, text)` and `close()`.
+        """
+        return _NullProgress()
+
+
+class _NullProgress:
+    def update(self, done, total, text):
+        pass
+
+    def close(self):
+        pass
+
+
+# ---------------------- #
+#       Streamlit        #
+# ---------------------- #
+
+
+class _StreamlitProgress:
+    def __init__(self, st, text):
+        self.bar = st.progress(0, text=text)
+
+    def update(self, done, total, text):
+        self.bar.progress(done / total, text=text)
+
+    def close(self):
+        self.bar.empty()
+
+
+class StreamlitReporter(Reporter):
+    """
+    Renders messages as Streamlit elements in the current script run.
+    """
+
+    def __init__(self):
+        import streamlit as st  # Only imported when the app actually reports
+
+        self.st = st
+
+    def write(self, message):
+        self.st.write(message)
+
+    def success(self, message):
+        self.st.success(message)
+
+    def caption(self, message):
+        self.st.caption(message)
+
+    def error(self, message):
+        self.st.error(message)
+
+    def progress(self, text):
+        return _StreamlitProgress(self.st, text)
+
+
+# ---------------------- #
+#        Console         #
+# ---------------------- #
+
+
+class _ConsoleProgress:
+    def __init__(self, reporter, text):
+        self.reporter = reporter
+        self.reporter._print(text)
+
+    def update(self, done, total, text):
+        width = len(str(total))
+        self.reporter._print(f"[{done:>{width}}/{total}] {text}")
+
+    def close(self):
+        pass
+
+
+class ConsoleReporter(Reporter):
+    """
+    Streams messages and progress lines to a text stream (stdout by default).
+
+    Each line is prefixed with the elapsed time and flushed immediately, so
+    long unattended runs can be followed with `tail -f`.
+    """
+
+    def __init__(self, stream=None):
+        """
+        Args:
+            stream (file, optional): Text stream to write to. Defaults to sys.stdout.
+        """
+        self.stream = stream or sys.stdout
+        self.started = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _print(self, message):
+        elapsed = time.monotonic() - self.started
+        with self._lock:
+            for line in str(message).splitlines() or [""]:
+                print(f"{elapsed:8.1f}s {line}", file=self.stream, flush=True)
+
+    def write(self, message):
+        self._print(message)
+
+    def success(self, message):
+        self._print(message)
+
+    def caption(self, message):
+        self._print(message)
+
+    def error(self, message):
+        self._print(message)
+
+    def progress(self, text):
+        return _ConsoleProgress(self, text)
+
+
+# ---------------------- #
+#    Active Reporter     #
+# ---------------------- #
+
+_reporter = None
+_reporter_lock = threading.Lock()
+
+
+def set_reporter(reporter):
+    """
+    Replaces the process-wide reporter (e.g. with a ConsoleReporter for the CLI).
+
+    Args:
+        reporter (Reporter): Reporter to use from now on.
+    """
+    global _reporter
+    with _reporter_lock:
+        _reporter = reporter
+
+
+def get_reporter():
+    """
+    Returns the process-wide reporter, defaulting to Streamlit for the app.
+
+    Returns:
+        Reporter: The active reporter.
+    """
+    global _reporter
+    with _reporter_lock:
+        if _reporter is None:
+            _reporter = StreamlitReporter()
+        return _reporter
@@ -0,0 +1,273 @@
+import random
+import threading
+import time
+from collections import Counter
+from email.utils import parsedate_to_datetime
+
+# ---------------------- #
+#      Exceptions        #
+# ---------------------- #
+
+
+class LogoFetchError(Exception):
+    """
+    Base error for logo fetch failures, tagged with a short cause for reporting.
+    """
+
+    def __init__(self, message, cause="other"):
+        super().__init__(message)
+        self.cause = cause
+
+
+class LogoNotFound(LogoFetchError):
+    """
+    Definitive miss (e.g. 404 or a non-image response); retrying will not help.
+    """
+
+
+class RetryableError(LogoFetchError):
+    """
+    Transient failure (429, 5xx, connection error) worth retrying after a delay.
+    """
+
+    def __init__(self, message, cause="other", retry_after=None):
+        super().__init__(message, cause)
+        self.retry_after = retry_after
+
+
+class CircuitOpenError(LogoFetchError):
+    """
+    Raised without contacting the upstream while its circuit breaker is open.
+    """
+
+    def __init__(self, message="Upstream circuit open"):
+        super().__init__(message, cause="circuit_open")
+
+
+# ---------------------- #
+#   Response Triage      #
+# ---------------------- #
+
+
+def parse_retry_after(value):
+    """
+    Parses a `Retry-After` header given either as seconds or as an HTTP date.
+
+    Args:
+        value (str or None): Header value.
+
+    Returns:
+        float or None: Seconds to wait, or None if absent or unparseable.
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def classify_response(status, content_type, retry_after=None):
+    """
+    Raises the appropriate error for a logo response, or returns if it holds an image.
+
+    Args:
+        status (int): HTTP status code.
+        content_type (str): Response `Content-Type` header.
+        retry_after (str, optional): Response `Retry-After` header.
+
+    Raises:
+        RetryableError: On 408, 429 or 5xx responses.
+        LogoNotFound: On other non-200 responses or a non-image content type.
+    """
+    if status == 200:
+        if "image" not in content_type:
+            raise LogoNotFound("Response is not an image", cause="not_image")
+        return
+    if status == 429:
+        raise RetryableError(
+            "Rate limited",
+            cause="rate_limited",
+            retry_after=parse_retry_after(retry_after),
+        )
+    if status == 408 or status >= 500:
+        raise RetryableError(
+            f"Upstream error {status}",
+            cause="server_error",
+            retry_after=parse_retry_after(retry_after),
+        )
+    if status in (404, 410):
+        raise LogoNotFound("Logo not found", cause="not_found")
+    raise LogoNotFound(f"Unexpected status {status}", cause=f"http_{status}")
+
+
+# ---------------------- #
+#     Retry Policy       #
+# ---------------------- #
+
+
+class RetryPolicy:
+    """
+    Jittered exponential backoff that honours `Retry-After` hints.
+    """
+
+    def __init__(self, max_attempts=4, base_delay=0.5, max_delay=30.0):
+        """
+        Args:
+            max_attempts (int): Total attempts, including the first request.
+            base_delay (float): Backoff ceiling for the first retry, in seconds.
+            max_delay (float): Upper bound on any single wait, in seconds.
+        """
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def delay(self, attempt, retry_after=None):
+        """
+        Returns how long to wait before the next attempt.
+
+        Args:
+            attempt (int): Number of the attempt that just failed (1-based).
+            retry_after (float, optional): Server-provided wait in seconds.
+
+        Returns:
+            float: Seconds to sleep.
+        """
+        if retry_after is not None:
+            return min(retry_after, self.max_delay)
+        # "Full jitter" spreads retries from concurrent workers apart
+        ceiling = min(self.max_delay, self.base_delay * 2 ** (attempt - 1))
+        return random.uniform(0, ceiling)
+
+
+# ---------------------- #
+#    Circuit Breaker     #
+# ---------------------- #
+
+
+class CircuitBreaker:
+    """
+    Fails fast while an upstream is unhealthy.
+
+    After `failure_threshold` consecutive transient failures the circuit opens and
+    every call is rejected for `reset_timeout` seconds. A single trial call is then
+    let through (half-open); its success closes the circuit, its failure re-opens it.
+    """
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.0):
+        """
+        Args:
+            failure_threshold (int): Consecutive failures that open the circuit.
+            reset_timeout (float): Seconds to stay open before a trial call.
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at = None
+        self._trial_in_flight = False
+
+    @property
+    def state(self):
+        with self._lock:
+            if self._opened_at is None:
+                return "closed"
+            if time.monotonic() - self._opened_at >= self.reset_timeout:
+                return "half_open"
+            return "open"
+
+    def allow(self):
+        """
+        Returns whether a call may go to the upstream now.
+
+        Returns:
+            bool: False while open, or while a half-open trial call is in flight.
+        """
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if time.monotonic() - self._opened_at < self.reset_timeout:
+                return False
+            if self._trial_in_flight:
+                return False
+            self._trial_in_flight = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._trial_in_flight or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+            self._trial_in_flight = False
+
+    def release_trial(self):
+        """
+        Gives up a call allowed by `allow()` without recording an outcome.
+
+        Call when the call ends without the upstream answering or failing, e.g. it
+        was cancelled or hit an unrelated error, so a half-open trial it held goes
+        to the next caller instead of blocking the breaker for good.
+        """
+        with self._lock:
+            self._trial_in_flight = False
+
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+
+def get_circuit_breaker(host):
+    """
+    Returns the process-wide circuit breaker for an upstream host.
+
+    Args:
+        host (str): Upstream host name, e.g. "cdn.brandfetch.io".
+
+    Returns:
+        CircuitBreaker: Shared breaker instance.
+    """
+    with _breakers_lock:
+        if host not in _breakers:
+            _breakers[host] = CircuitBreaker()
+        return _breakers[host]
+
+
+# ---------------------- #
+#    Failure Counts      #
+# ---------------------- #
+
+
+def failure_cause(error):
+    """
+    Returns the reporting cause for an exception raised while fetching a logo.
+
+    Args:
+        error (Exception): The raised exception.
+
+    Returns:
+        str: Short cause label, "other" for untagged errors.
+    """
+    return getattr(error, "cause", "other")
+
+
+def summarize_failures(failed_logos):
+    """
+    Counts failures per cause.
+
+    Args:
+        failed_logos (dict): Company name -> failure cause.
+
+    Returns:
+        collections.Counter: Cause -> number of companies.
+    """
+    return Counter(failed_logos.values())
@@ -0,0 +1,289 @@
+import logging
+import os
+import shutil
+import threading
+import time
+
+from src.reporting import get_reporter
+
+logger = logging.getLogger(__name__)
+
+# Marker file whose mtime records a session's last access (survives restarts)
+LAST_ACCESS_MARKER = ".last_access"
+
+# Defaults: evict after a day idle, keep unshared bytes under 1 GB, sweep every 10 min
+DEFAULT_TTL = 24 * 3600
+DEFAULT_MAX_BYTES = 1024 * 1024 * 1024
+DEFAULT_INTERVAL = 600
+
+# Sessions accessed this recently are considered live and are never evicted
+DEFAULT_LIVE_WINDOW = 30 * 60
+
+
+class SessionSweeper:
+    """
+    Background garbage collector for per-session folders under the logo cache.
+
+    Session folders idle for longer than `ttl` are removed. If the remaining
+    folders still hold more than `max_bytes`, the least recently accessed ones
+    are removed until the cache fits. Sessions accessed within `live_window`,
+    and sessions held open with `hold` (e.g. a browser tab left idle), are
+    always kept. Folders whose name starts with "_" or "." (shared caches
+    such as `_processed`) are never touched.
+
+    Sizes count only bytes not shared with other paths (link count of 1), since
+    logos hard-linked from the backup store free nothing when a session goes.
+    """
+
+    def __init__(
+        self,
+        cache_root,
+        ttl=DEFAULT_TTL,
+        max_bytes=DEFAULT_MAX_BYTES,
+        interval=DEFAULT_INTERVAL,
+        live_window=DEFAULT_LIVE_WINDOW,
+    ):
+        """
+        Args:
+            cache_root (str): Folder holding one sub-folder per session.
+            ttl (float): Seconds of inactivity after which a session is evicted.
+            max_bytes (int): Byte quota across all session folders.
+            interval (float): Seconds between background sweeps.
+            live_window (float): Sessions accessed within this many seconds are kept.
+        """
+        self.cache_root = cache_root
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.interval = interval
+        self.live_window = min(live_window, ttl)
+        self.dirs_evicted = 0
+        self.bytes_reclaimed = 0
+        self.sweeps = 0
+        self._holds = {}  # Absolute session path -> list of `is_open` callables
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    # ---------------------- #
+    #    Session Tracking    #
+    # ---------------------- #
+
+    def touch(self, session_path):
+        """
+        Records that a session was just accessed. Call on every script run.
+
+        Args:
+            session_path (str): The session's folder.
+        """
+        os.makedirs(session_path, exist_ok=True)
+        marker = os.path.join(session_path, LAST_ACCESS_MARKER)
+        with open(marker, "a"):
+            pass
+        os.utime(marker)
+
+    def hold(self, session_path, is_open):
+        """
+        Keeps a session folder from being evicted while its owner is still open.
+
+        Args:
+            session_path (str): The session's folder.
+            is_open (callable): Returns True while the owner (e.g. a Streamlit
+                session) is still open; the hold is dropped once it returns False.
+        """
+        with self._lock:
+            self._holds.setdefault(os.path.abspath(session_path), []).append(is_open)
+
+    def _held(self, session_path):
+        """
+        Returns True if any open owner holds the folder, dropping closed ones.
+        Must be called with the lock held.
+        """
+        key = os.path.abspath(session_path)
+        checks = [check for check in self._holds.get(key, ()) if check()]
+        if checks:
+            self._holds[key] = checks
+        else:
+            self._holds.pop(key, None)
+        return bool(checks)
+
+    def _last_access(self, session_path):
+        try:
+            return os.path.getmtime(os.path.join(session_path, LAST_ACCESS_MARKER))
+        except FileNotFoundError:
+            return os.path.getmtime(session_path)
+
+    @staticmethod
+    def _unshared_bytes(session_path):
+        total = 0
+        for root, _, files in os.walk(session_path):
+            for name in files:
+                try:
+                    stat = os.lstat(os.path.join(root, name))
+                except FileNotFoundError:
+                    continue
+                if stat.st_nlink == 1:
+                    total += stat.st_size
+        return total
+
+    def _sessions(self):
+        """
+        Lists session folders with their last access time and unshared size.
+
+        Returns:
+            list of tuples: (path, last_access, unshared_bytes), oldest first.
+        """
+        sessions = []
+        if not os.path.isdir(self.cache_root):
+            return sessions
+        for name in os.listdir(self.cache_root):
+            path = os.path.join(self.cache_root, name)
+            if name.startswith(("_", ".")) or not os.path.isdir(path):
+                continue
+            try:
+                sessions.append(
+                    (path, self._last_access(path), self._unshared_bytes(path))
+                )
+            except FileNotFoundError:
+                continue  # Removed while scanning
+        sessions.sort(key=lambda s: s[1])
+        return sessions
+
+    # ---------------------- #
+    #       Sweeping         #
+    # ---------------------- #
+
+    def _evict(self, path, size):
+        shutil.rmtree(path, ignore_errors=True)
+        self.dirs_evicted += 1
+        self.bytes_reclaimed += size
+        logger.info("Evicted session folder %s (%d bytes)", path, size)
+
+    def sweep(self, now=None):
+        """
+        Runs one eviction pass.
+
+        Args:
+            now (float, optional): Current time, for testing. Defaults to time.time().
+
+        Returns:
+            dict: Folders evicted and bytes reclaimed by this pass.
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            evicted_before = self.dirs_evicted
+            reclaimed_before = self.bytes_reclaimed
+
+            remaining = []
+            for path, last_access, size in self._sessions():
+                if self._held(path):
+                    continue  # Still open; never evicted, not counted to the quota
+                if now - last_access > self.ttl:
+                    self._evict(path, size)
+                else:
+                    remaining.append((path, last_access, size))
+
+            # Enforce the quota oldest first, never touching live sessions
+            total = sum(size for _, _, size in remaining)
+            for path, last_access, size in remaining:
+                if total <= self.max_bytes:
+                    break
+                if now - last_access <= self.live_window:
+                    break  # Sorted oldest first, so every later session is live too
+                self._evict(path, size)
+                total -= size
+
+            self.sweeps += 1
+            return {
+                "dirs_evicted": self.dirs_evicted - evicted_before,
+                "bytes_reclaimed": self.bytes_reclaimed - reclaimed_before,
+            }
+
+    def metrics(self):
+        """
+        Returns cumulative sweeper metrics.
+
+        Returns:
+            dict: sweeps, dirs_evicted, bytes_reclaimed, live session count and bytes in use.
+        """
+        sessions = self._sessions()
+        with self._lock:
+            now = time.time()
+            return {
+                "sweeps": self.sweeps,
+                "dirs_evicted": self.dirs_evicted,
+                "bytes_reclaimed": self.bytes_reclaimed,
+                "sessions": len(sessions),
+                "live_sessions": sum(
+                    1
+                    for path, last, _ in sessions
+                    if now - last <= self.live_window or self._held(path)
+                ),
+                "bytes_in_use": sum(size for _, _, size in sessions),
+            }
+
+    # ---------------------- #
+    #   Background Thread    #
+    # ---------------------- #
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.sweep()
+            except Exception:
+                logger.exception("Session sweep failed")
+
+    def start(self):
+        """
+        Starts the background sweep thread if it is not already running.
+        """
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(
+                target=self._run, name="session-sweeper", daemon=True
+            )
+            self._thread.start()
+
+    def stop(self):
+        """
+        Stops the background sweep thread.
+        """
+        self._stop.set()
+
+
+_sweepers = {}
+_sweepers_lock = threading.Lock()
+
+
+def get_session_sweeper(cache_root):
+    """
+    Returns the process-wide sweeper for a cache folder, starting it on first use.
+
+    Args:
+        cache_root (str): Folder holding one sub-folder per session.
+
+    Returns:
+        SessionSweeper: Shared, running sweeper.
+    """
+    key = os.path.abspath(cache_root)
+    with _sweepers_lock:
+        if key not in _sweepers:
+            _sweepers[key] = SessionSweeper(cache_root)
+            _sweepers[key].start()
+        return _sweepers[key]
+
+
+def report_sweeper_metrics(cache_root):
+    """
+    Reports the session sweeper's reclaimed space and current usage.
+
+    Args:
+        cache_root (str): Folder holding one sub-folder per session.
+    """
+    metrics = get_session_sweeper(cache_root).metrics()
+    get_reporter().caption(
+        f"🧹 Session cleanup: {metrics['dirs_evicted']} folders evicted, "
+        f"{metrics['bytes_reclaimed'] / 1e6:.1f} MB reclaimed; "
+        f"{metrics['sessions']} sessions ({metrics['live_sessions']} live) "
+        f"using {metrics['bytes_in_use'] / 1e6:.1f} MB"
+    )
+
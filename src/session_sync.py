@@ -0,0 +1,193 @@
+import hashlib
+import json
+import os
+
+from src.backup_index import (
+    get_backup_index,
+    normalize_company_name,
+    session_file_name,
+)
+
+# Records which company each logo in a session folder belongs to
+SESSION_MANIFEST = ".companies.json"
+
+
+def _in_session(session_cache_path, file_name):
+    return os.path.exists(os.path.join(session_cache_path, file_name))
+
+
+def load_session_companies(session_cache_path):
+    """
+    Reads the companies recorded for a session folder.
+
+    Args:
+        session_cache_path (str): Session-specific logo folder.
+
+    Returns:
+        dict or None: Normalized company name -> {"company", "file"} (file is None
+        for companies without a logo), or None if the folder has no record, e.g.
+        after it was cleared.
+    """
+    try:
+        with open(
+            os.path.join(session_cache_path, SESSION_MANIFEST), encoding="utf-8"
+        ) as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def record_session_companies(company_list, backup_path, session_cache_path):
+    """
+    Records which logo file in the session folder belongs to each company.
+
+    Call after fetching; both downloads and backup hits leave the logo indexed
+    under the company name.
+
+    Args:
+        company_list (list[str]): Companies now in the session.
+        backup_path (str): Backup folder, looked up through its index.
+        session_cache_path (str): Session-specific logo folder.
+    """
+    backup_index = get_backup_index(backup_path)
+    companies = {}
+    for company in company_list:
+        entry = backup_index.lookup(company)
+        file_name = session_file_name(company, entry) if entry else None
+        if file_name and not _in_session(session_cache_path, file_name):
+            file_name = None
+        companies[normalize_company_name(company)] = {
+            "company": company,
+            "file": file_name,
+        }
+
+    path = os.path.join(session_cache_path, SESSION_MANIFEST)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(companies, f, indent=1)
+    os.replace(tmp_path, path)
+
+
+def plan_session_refresh(company_list, session_cache_path):
+    """
+    Removes logos of companies no longer listed and works out what to fetch.
+
+    Companies are compared by normalized name, so variants such as "Apple Inc."
+    and "Apple" count as one. Logos of removed companies, and any logo the record
+    does not account for, are deleted; added companies (and earlier ones whose
+    logo is missing) are returned for fetching, and all other logos are left
+    untouched. A folder without a record of its companies is cleared, so
+    everything is fetched.
+
+    Args:
+        company_list (list[str]): Companies the session should hold.
+        session_cache_path (str): Session-specific logo folder.
+
+    Returns:
+        dict: "companies" (the session's company list, one name per company),
+        and "added", "removed", "kept" and "fetched" (added plus re-fetched)
+        company name lists.
+    """
+    from src.output import clear_folder
+
+    previous = load_session_companies(session_cache_path)
+    if previous is None:
+        clear_folder(session_cache_path)
+        previous = {}
+
+    # One name per company; a company already in the session keeps its old spelling,
+    # which is what its logo file is named after
+    current = {}
+    for company in company_list:
+        key = normalize_company_name(company)
+        if key not in current:
+            current[key] = previous[key]["company"] if key in previous else company
+
+    removed = [item for key, item in previous.items() if key not in current]
+    kept_files = {
+        item["file"]
+        for key, item in previous.items()
+        if key in current and item["file"]
+    }
+    # Every logo not recorded for a kept company goes: those of removed companies
+    # (unless a kept name shares the file, e.g. a backup hit) and any a cancelled
+    # or interrupted fetch left behind
+    for file_name in os.listdir(session_cache_path):
+        path = os.path.join(session_cache_path, file_name)
+        if file_name.startswith(".") or file_name in kept_files:
+            continue
+        try:
+            if os.path.isfile(path):
+                os.unlink(path)
+        except FileNotFoundError:
+            pass
+
+    added = [company for key, company in current.items() if key not in previous]
+    missing = [
+        company
+        for key, company in current.items()
+        if key in previous
+        and not (
+            previous[key]["file"]
+            and _in_session(session_cache_path, previous[key]["file"])
+        )
+    ]
+
+    return {
+        "companies": list(current.values()),
+        "added": added,
+        "removed": [item["company"] for item in removed],
+        "kept": [company for key, company in current.items() if key in previous],
+        "fetched": added + missing,
+    }
+
+
+def refresh_session(company_list, backup_path, session_cache_path, fetch):
+    """
+    Brings a session folder in line with a new company list, fetching only the delta.
+
+    See `plan_session_refresh` for how the delta is worked out.
+
+    Args:
+        company_list (list[str]): Companies the session should hold.
+        backup_path (str): Directory for persistent logo storage.
+        session_cache_path (str): Session-specific logo folder.
+        fetch (callable): Called as `fetch(companies)` with the companies to fetch;
+            returns a dict of company -> failure cause.
+
+    Returns:
+        dict: The plan's "added", "removed", "kept" and "fetched" lists, and
+        "failed", the fetch failures.
+    """
+    delta = plan_session_refresh(company_list, session_cache_path)
+    companies = delta.pop("companies")
+    fetched = delta["fetched"]
+    delta["failed"] = fetch(fetched) if fetched else {}
+    record_session_companies(companies, backup_path, session_cache_path)
+    return delta
+
+
+def folder_fingerprint(session_cache_path):
+    """
+    Summarizes a session folder's logos, for keying results derived from them.
+
+    Built from each file's name, inode, size and modification time, so it changes
+    whenever a logo is added, removed or replaced (including re-links of a newer
+    backup file) and survives restarts and browser refreshes, unlike an in-memory
+    counter.
+
+    Args:
+        session_cache_path (str): Session-specific logo folder.
+
+    Returns:
+        str: Hex digest of the folder listing.
+    """
+    entries = []
+    with os.scandir(session_cache_path) as it:
+        for entry in it:
+            if entry.name.startswith(".") or not entry.is_file():
+                continue
+            stat = entry.stat()
+            entries.append((entry.name, stat.st_ino, stat.st_size, stat.st_mtime_ns))
+    entries.sort()
+    return hashlib.sha256(json.dumps(entries).encode("utf-8")).hexdigest()
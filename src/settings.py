@@ -0,0 +1,95 @@
+import os
+
+# Per-request timeout (seconds) for logo downloads, shared by both fetch engines
+REQUEST_TIMEOUT_SECONDS = 30.0
+
+
+def environment_secrets(name):
+    """
+    Secret source reading environment variables.
+
+    Raises:
+        KeyError: If the variable is not set.
+    """
+    return os.environ[name]
+
+
+def streamlit_secrets(name):
+    """
+    Secret source reading Streamlit secrets (`.streamlit/secrets.toml`).
+
+    Streamlit is imported only when this source is consulted.
+
+    Raises:
+        KeyError: If the secret is not configured.
+    """
+    import streamlit as st
+
+    try:
+        return st.secrets[name]
+    except FileNotFoundError:
+        raise KeyError(name)
+
+
+def toml_secrets(path):
+    """
+    Builds a secret source reading a TOML file such as `.streamlit/secrets.toml`.
+
+    Args:
+        path (str): Path of the TOML file.
+
+    Returns:
+        callable: Secret source raising KeyError for missing names.
+    """
+    try:
+        import tomllib
+
+        with open(path, "rb") as f:
+            secrets = tomllib.load(f)
+    except ImportError:  # Python < 3.11; toml ships with Streamlit
+        import toml
+
+        with open(path, encoding="utf-8") as f:
+            secrets = toml.load(f)
+
+    def source(name):
+        return secrets[name]
+
+    return source
+
+
+# Sources consulted in order. Environment variables take precedence so scripts
+# and benchmarks can run without a `.streamlit/secrets.toml`.
+secret_sources = [environment_secrets, streamlit_secrets]
+
+
+def set_secret_sources(sources):
+    """
+    Replaces the secret sources, e.g. to keep Streamlit out of headless runs.
+
+    Args:
+        sources (list[callable]): Functions taking a secret name and returning its
+            value, raising KeyError if they do not have it.
+    """
+    secret_sources[:] = sources
+
+
+def get_secret(name):
+    """
+    Reads a secret from the first configured source that has it.
+
+    Args:
+        name (str): Secret name, e.g. "BRANDFETCH_API_KEY".
+
+    Returns:
+        str: The secret value.
+
+    Raises:
+        KeyError: If the secret is not configured anywhere.
+    """
+    for source in secret_sources:
+        try:
+            return source(name)
+        except KeyError:
+            continue
+    raise KeyError(name)
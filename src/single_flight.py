@@ -0,0 +1,99 @@
+import threading
+from concurrent.futures import Future
+
+
+class SingleFlight:
+    """
+    Process-wide in-flight deduplication of identical work.
+
+    The first caller for a key becomes its leader and does the work; callers
+    arriving while it runs get the same future and wait for it instead of
+    repeating the work. The key is released when the leader finishes, so a later
+    call starts afresh. Futures are thread-safe, so followers may wait from any
+    thread or event loop (with `asyncio.wrap_future`).
+    """
+
+    def __init__(self):
+        self.leaders = 0
+        self.coalesced = 0
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def begin(self, key):
+        """
+        Joins the in-flight call for `key`, or starts one.
+
+        A leader must call `finish` once done, whatever the outcome, or later
+        callers for the key would wait forever.
+
+        Args:
+            key (hashable): Identifies the work.
+
+        Returns:
+            tuple: (concurrent.futures.Future, True if the caller is the leader)
+        """
+        with self._lock:
+            future = self._calls.get(key)
+            if future is not None:
+                self.coalesced += 1
+                return future, False
+            future = Future()
+            self._calls[key] = future
+            self.leaders += 1
+            return future, True
+
+    def finish(self, key, future, result=None, error=None):
+        """
+        Releases `key` and hands the leader's outcome to every waiting caller.
+
+        Args:
+            key (hashable): Key passed to `begin`.
+            future (Future): Future returned to the leader by `begin`.
+            result: Value for the followers.
+            error (BaseException, optional): Raised in the followers instead.
+        """
+        with self._lock:
+            if self._calls.get(key) is future:
+                del self._calls[key]
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+    def run(self, key, fn, *args, **kwargs):
+        """
+        Calls `fn(*args, **kwargs)` unless a call for `key` is already running, in
+        which case its outcome is shared instead.
+
+        Returns:
+            tuple: (result of the call, True if this caller ran it)
+
+        Raises:
+            Exception: Whatever the call raised, in the leader and every follower.
+        """
+        future, leader = self.begin(key)
+        if not leader:
+            return future.result(), False
+
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException as e:
+            self.finish(key, future, error=e)
+            raise
+        self.finish(key, future, result=result)
+        return result, True
+
+    def stats(self):
+        """
+        Returns counters for display or monitoring.
+
+        Returns:
+            dict: leaders (calls that did the work), coalesced (calls that shared
+            another's result) and in_flight.
+        """
+        with self._lock:
+            return {
+                "leaders": self.leaders,
+                "coalesced": self.coalesced,
+                "in_flight": len(self._calls),
+            }
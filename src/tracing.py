@@ -0,0 +1,253 @@
+import contextvars
+import json
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+# Tracer for the current run; None (the default) disables tracing
+_current_tracer = contextvars.ContextVar("logobot_tracer", default=None)
+
+
+class Span:
+    """
+    Timing record for one company in one pipeline stage.
+
+    Code inside the span can set `retries` and `bytes` before it closes.
+    """
+
+    __slots__ = ("tracer", "company", "stage", "retries", "bytes", "start")
+
+    def __init__(self, tracer, company, stage):
+        self.tracer = tracer
+        self.company = company
+        self.stage = stage
+        self.retries = 0
+        self.bytes = 0
+        self.start = None
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.tracer.record(
+            self.company,
+            self.stage,
+            time.perf_counter() - self.start,
+            retries=self.retries,
+            bytes=self.bytes,
+            ok=exc_type is None,
+        )
+        return False
+
+
+class _NullSpan:
+    """
+    Shared do-nothing span used while tracing is disabled.
+    """
+
+    __slots__ = ()
+    retries = 0
+    bytes = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def __setattr__(self, name, value):
+        pass  # Discard retries/bytes updates
+
+
+NULL_SPAN = _NullSpan()
+
+
+class Tracer:
+    """
+    Collects per-company, per-stage timings for a pipeline run.
+
+    Each record holds the stage's wall time, retry count, bytes handled and
+    whether it succeeded. Records can be summarised per stage for display and
+    exported as JSON or Prometheus text.
+    """
+
+    def __init__(self):
+        self.records = []
+        self._lock = threading.Lock()
+
+    def span(self, company, stage):
+        return Span(self, company, stage)
+
+    def record(self, company, stage, wall_s, retries=0, bytes=0, ok=True):
+        """
+        Adds a finished stage measurement.
+
+        Args:
+            company (str): Company (or logo) name.
+            stage (str): Stage name, e.g. "search" or "resize".
+            wall_s (float): Wall time in seconds.
+            retries (int): Retries performed within the stage.
+            bytes (int): Bytes downloaded, read or written by the stage.
+            ok (bool): Whether the stage completed without raising.
+        """
+        with self._lock:
+            self.records.append(
+                {
+                    "company": company,
+                    "stage": stage,
+                    "wall_s": wall_s,
+                    "retries": retries,
+                    "bytes": bytes,
+                    "ok": ok,
+                }
+            )
+
+    # ---------------------- #
+    #       Reporting        #
+    # ---------------------- #
+
+    def summary(self):
+        """
+        Aggregates records per stage.
+
+        Returns:
+            list[dict]: One row per stage (in first-seen order) with calls, errors,
+            total/mean/p50/p95/max wall time in ms, retries and bytes.
+        """
+        with self._lock:
+            records = list(self.records)
+
+        by_stage = defaultdict(list)
+        for record in records:
+            by_stage[record["stage"]].append(record)
+
+        rows = []
+        for stage, stage_records in by_stage.items():
+            walls = sorted(r["wall_s"] for r in stage_records)
+
+            def pct(p):
+                return walls[min(len(walls) - 1, int(p / 100 * len(walls)))] * 1000
+
+            rows.append(
+                {
+                    "stage": stage,
+                    "calls": len(walls),
+                    "errors": sum(1 for r in stage_records if not r["ok"]),
+                    "total_ms": round(sum(walls) * 1000, 2),
+                    "mean_ms": round(sum(walls) * 1000 / len(walls), 2),
+                    "p50_ms": round(pct(50), 2),
+                    "p95_ms": round(pct(95), 2),
+                    "max_ms": round(walls[-1] * 1000, 2),
+                    "retries": sum(r["retries"] for r in stage_records),
+                    "bytes": sum(r["bytes"] for r in stage_records),
+                }
+            )
+        return rows
+
+    def to_json(self):
+        """
+        Exports the summary and every raw record as a JSON string.
+
+        Returns:
+            str: JSON document with "summary" and "records" keys.
+        """
+        with self._lock:
+            records = list(self.records)
+        return json.dumps({"summary": self.summary(), "records": records}, indent=2)
+
+    def to_prometheus(self):
+        """
+        Exports per-stage totals in the Prometheus text exposition format.
+
+        Returns:
+            str: Prometheus metrics text.
+        """
+        metrics = [
+            ("logobot_stage_calls_total", "calls", "Stage executions.", 1),
+            (
+                "logobot_stage_errors_total",
+                "errors",
+                "Stage executions that failed.",
+                1,
+            ),
+            (
+                "logobot_stage_seconds_total",
+                "total_ms",
+                "Wall time spent per stage.",
+                1e-3,
+            ),
+            ("logobot_stage_retries_total", "retries", "Retries within a stage.", 1),
+            ("logobot_stage_bytes_total", "bytes", "Bytes handled per stage.", 1),
+        ]
+        summary = self.summary()
+        lines = []
+        for name, key, help_text, scale in metrics:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} counter")
+            for row in summary:
+                lines.append(f'{name}{{stage="{row["stage"]}"}} {row[key] * scale:g}')
+        return "\n".join(lines) + "\n"
+
+
+# ---------------------- #
+#    Active Tracer       #
+# ---------------------- #
+
+
+@contextmanager
+def activate(tracer):
+    """
+    Makes `tracer` the active tracer for the enclosed code (None disables tracing).
+
+    Asyncio tasks and `asyncio.to_thread` inherit it automatically; thread pools
+    must submit work through `contextvars.copy_context().run`.
+
+    Args:
+        tracer (Tracer or None): Tracer to record into.
+    """
+    token = _current_tracer.set(tracer)
+    try:
+        yield tracer
+    finally:
+        _current_tracer.reset(token)
+
+
+def tracing_enabled():
+    """
+    Returns whether a tracer is active in the current context.
+    """
+    return _current_tracer.get() is not None
+
+
+def trace_span(company, stage):
+    """
+    Returns a span context manager for the active tracer, or a shared no-op span.
+
+    Args:
+        company (str): Company (or logo) name.
+        stage (str): Stage name.
+
+    Returns:
+        Span or _NullSpan: Context manager timing the enclosed block.
+    """
+    tracer = _current_tracer.get()
+    if tracer is None:
+        return NULL_SPAN
+    return Span(tracer, company, stage)
+
+
+def trace_record(company, stage, wall_s, **kwargs):
+    """
+    Records an already-measured stage (e.g. timed in a worker process) if tracing is on.
+
+    Args:
+        company (str): Company (or logo) name.
+        stage (str): Stage name.
+        wall_s (float): Wall time in seconds.
+        **kwargs: retries, bytes and ok, as for `Tracer.record`.
+    """
+    tracer = _current_tracer.get()
+    if tracer is not None:
+        tracer.record(company, stage, wall_s, **kwargs)